@@ -28,6 +28,9 @@ def create_app():
     csrf.init_app(app)
     limiter.init_app(app)
 
+    from .services import counters_service
+    counters_service.register()
+
     @login_manager.user_loader
     def load_user(user_id):
         return db.session.get(User, int(user_id))
@@ -51,6 +54,9 @@ def create_app():
     app.register_blueprint(web_bp)
     app.register_blueprint(banker_bp, url_prefix="/api/banker")
 
+    from .cli import register_cli
+    register_cli(app)
+
     @app.get("/api")
     def api_index():
         return jsonify({
@@ -58,8 +64,8 @@ def create_app():
             "status": "ok",
             "endpoints": [
                 "/api/auth/register", "/api/auth/login", "/api/auth/logout",
-                "/api/loan/save-draft", "/api/loan/my", "/api/kyc/start", "/api/kyc/finalize", "/api/kyc/me", "/api/kyc/me/pdf",
-                "/api/banker/kyc/<kyc_id>", "/api/banker/kyc/qr-scan", "/api/banker/kyc/validate-pdf", "/api/banker/analytics/summary"
+                "/api/loan/save-draft", "/api/loan/eligibility/batch", "/api/loan/schedule", "/api/loan/<id>/schedule", "/api/loan/my", "/api/kyc/start", "/api/kyc/finalize", "/api/kyc/me", "/api/kyc/me/pdf",
+                "/api/banker/kyc/<kyc_id>", "/api/banker/kyc/lookup-batch", "/api/banker/kyc/qr-scan", "/api/banker/kyc/validate-pdf", "/api/banker/kyc/validate-batch", "/api/banker/analytics/summary", "/api/banker/dashboard", "/api/banker/stream", "/api/banker/export.csv"
             ]
         })
 
@@ -74,7 +80,4 @@ def create_app():
             }
         }
 
-    with app.app_context():
-        db.create_all()
-
     return app
@@ -1,18 +1,32 @@
-import json
 import os
-import hashlib
-from flask import Blueprint, jsonify, request, send_file
+import time
+from flask import Blueprint, Response, current_app, jsonify, make_response, request, stream_with_context
 from datetime import datetime, timedelta
-from collections import defaultdict
 from flask import session
+from werkzeug.exceptions import RequestEntityTooLarge, RequestedRangeNotSatisfiable, UnsupportedMediaType
 from werkzeug.utils import secure_filename
 from ..extensions import db, limiter
-from ..models import KycRecord, KycPdf, LoanApplication, User
-from sqlalchemy import func
+from ..models import BankerEligibleQueue, KycRecord, KycPdf, LoanApplication, User
+from sqlalchemy import or_
+from ..services import counters_service as counters
+from ..services import events_service as events
+from ..services import export_service as exports
+from ..services import kyc_lookup_service as kyc_lookup
+from ..services import kyc_validation_service as validation
+from ..services import rollup_service as rollups
+from ..services import storage_service as storage
+from ..services import upload_service as uploads
 from ..services.id_service import sign_payload
+from ..services.pagination_service import encode_cursor, keyset_before, parse_limit
 
 bp = Blueprint("banker", __name__)
 
+SERIES_WINDOWS = (7, 14, 30, 90, 365)
+MAX_LOOKUP_BATCH = 300
+# Streams are closed after this long; EventSource reconnects with Last-Event-ID
+STREAM_MAX_SECONDS = 600
+STREAM_RETRY_MS = 3000
+
 @bp.before_request
 def require_banker_session():
     # Protect all banker APIs; allow GET to /banker page (rendered in web.py) only
@@ -32,106 +46,89 @@ def me():
 @bp.get("/kyc/<string:kyc_id>")
 @limiter.limit("30/minute")
 def lookup(kyc_id: str):
+    if not kyc_lookup.normalize(kyc_id):
+        return jsonify({"error": "Invalid KYC ID"}), 400
     try:
-        raw = (kyc_id or "").strip()
-        norm_id = raw.replace(" ", "").replace("-", "").upper()
-        if not norm_id:
-            return jsonify({"error": "Invalid KYC ID"}), 400
-        kyc = None
-        # If the input looks like a numeric internal ID, resolve it first
-        if norm_id.isdigit():
-            # Primary key lookup is unique; use session.get for safety
-            kyc = db.session.get(KycRecord, int(norm_id))
-            if kyc and kyc.kyc_id:
-                norm_id = kyc.kyc_id
-        if kyc is None:
-            # Be robust against accidental duplicates: pick the most recent
-            query = db.select(KycRecord).filter_by(kyc_id=norm_id).order_by(KycRecord.created_at.desc())
-            kyc = db.session.execute(query).scalars().first()
-        if not kyc:
-            return jsonify({"error": "KYC not found"}), 404
-        
-        # Get user information for genuine user verification
-        user = db.session.get(User, kyc.user_id) if kyc.user_id else None
-        
-        # Get PDF information
-        pdf = db.session.execute(
-            db.select(KycPdf).filter_by(kyc_id=norm_id).order_by(KycPdf.id.desc())
-        ).scalars().first()
-        
-        payload = {"kyc_id": kyc.kyc_id, "issued_at": kyc.verified_at.isoformat() + "Z" if kyc.verified_at else "", "pdf_checksum": pdf.pdf_checksum if pdf else ""}
-        sig = sign_payload(payload)
+        # One joined query, then served from the per-worker cache until finalize or TTL
+        view = kyc_lookup.resolve(kyc_id)
+    except Exception as e:
+        return jsonify({"error": f"Lookup failed: {str(e) or 'unknown'}"}), 400
+    if view is None:
+        return jsonify({"error": "KYC not found"}), 404
 
-        return jsonify({
-            "kyc_id": kyc.kyc_id,
-            "full_name": kyc.name,
-            "email": user.email if user else "",
-            "phone": user.phone if user else "",
-            "dob": kyc.dob,
-            "status": kyc.status,
-            "verified": kyc.status == "verified",
-            "created_at": kyc.created_at.isoformat() + "Z" if kyc.created_at else "",
-            "pdf_checksum": pdf.pdf_checksum if pdf else "",
-            "verification_signature": sig,
-            "loan_id": (db.session.execute(db.select(LoanApplication).filter_by(user_id=kyc.user_id).order_by(LoanApplication.created_at.desc()).limit(1)).scalars().first().id if kyc.user_id else None)
-        })
+    if view.etag in request.if_none_match:
+        resp = make_response("", 304)
+    else:
+        resp = jsonify(view.to_json())
+    resp.set_etag(view.etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+@bp.post("/kyc/lookup-batch")
+@limiter.limit("10/minute")
+def lookup_batch():
+    """Look up many applicants in one call; accepts KYC IDs or numeric internal ids."""
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids:
+        return jsonify({"error": "ids must be a non-empty list"}), 400
+    if len(ids) > MAX_LOOKUP_BATCH:
+        return jsonify({"error": f"Too many ids. Maximum is {MAX_LOOKUP_BATCH}"}), 400
+
+    # Booleans are ints in Python but never an id
+    norm = [kyc_lookup.normalize(str(raw)) if isinstance(raw, (str, int)) and not isinstance(raw, bool) else "" for raw in ids]
+    norm = [n if kyc_lookup.is_valid(n) else "" for n in norm]
+    try:
+        views = kyc_lookup.resolve_many([n for n in norm if n])
     except Exception as e:
         return jsonify({"error": f"Lookup failed: {str(e) or 'unknown'}"}), 400
 
+    results, not_found, invalid = {}, [], []
+    for raw, norm_id in zip(ids, norm):
+        if not norm_id:
+            invalid.append(raw)
+        elif views.get(norm_id) is None:
+            not_found.append(raw)
+        else:
+            results[str(raw)] = views[norm_id].to_json()
+    return jsonify({"count": len(results), "results": results, "not_found": not_found, "invalid": invalid})
+
 @bp.get("/kyc/<string:kyc_id>/pdf")
 @limiter.limit("30/minute")
 def download_pdf(kyc_id: str):
-    # Normalize and resolve
-    raw = (kyc_id or "").strip()
-    norm_id = raw.replace(" ", "").replace("-", "").upper()
-    if not norm_id:
+    if not kyc_lookup.normalize(kyc_id):
         return jsonify({"error": "Invalid KYC ID"}), 400
-    kyc = None
-    if norm_id.isdigit():
-        kyc = db.session.get(KycRecord, int(norm_id))
-        if kyc and kyc.kyc_id:
-            norm_id = kyc.kyc_id
-    if kyc is None:
-        kyc = db.session.execute(
-            db.select(KycRecord).filter_by(kyc_id=norm_id).order_by(KycRecord.created_at.desc())
-        ).scalars().first()
-    if not kyc:
+    view = kyc_lookup.resolve(kyc_id)
+    if view is None:
         return jsonify({"error": "KYC not found"}), 404
-    pdf = db.session.execute(
-        db.select(KycPdf).filter_by(kyc_id=norm_id).order_by(KycPdf.id.desc())
-    ).scalars().first()
-    if not pdf or not pdf.pdf_url:
+    if not view.pdf_url:
         return jsonify({"error": "KYC PDF not found"}), 404
     try:
-        return send_file(pdf.pdf_url, as_attachment=True, download_name=f"{norm_id}.pdf")
+        return storage.send(view.pdf_url, f"{view.kyc_id}.pdf", etag=view.pdf_checksum)
+    except RequestedRangeNotSatisfiable:
+        raise
     except Exception as e:
         return jsonify({"error": f"Failed to send PDF: {str(e) or 'unknown'}"}), 400
 
 # ----- Analytics for banker dashboard -----
 
-@bp.get("/analytics/summary")
-def analytics_summary():
-    total_kyc = db.session.execute(db.select(func.count()).select_from(KycRecord)).scalar() or 0
-    verified_kyc = db.session.execute(
-        db.select(func.count()).select_from(KycRecord).filter(KycRecord.status == "verified")
-    ).scalar() or 0
-    total_loans = db.session.execute(db.select(func.count()).select_from(LoanApplication)).scalar() or 0
-    approved_loans = db.session.execute(
-        db.select(func.count()).select_from(LoanApplication).filter(LoanApplication.status == "approved")
-    ).scalar() or 0
-    return jsonify({
-        "total_kyc": int(total_kyc),
-        "verified_kyc": int(verified_kyc),
-        "total_loans": int(total_loans),
-        "approved_loans": int(approved_loans),
-    })
+SUMMARY_COUNTERS = ["kyc:total", "kyc:status:verified", "loan:total", "loan:status:approved"]
 
 
-@bp.get("/analytics/recent-kyc")
-def analytics_recent_kyc():
+def _summary_section(c: dict) -> dict:
+    return {
+        "total_kyc": c["kyc:total"],
+        "verified_kyc": c["kyc:status:verified"],
+        "total_loans": c["loan:total"],
+        "approved_loans": c["loan:status:approved"],
+    }
+
+
+def _recent_kyc_items() -> list:
     rows = db.session.execute(
-        db.select(KycRecord).order_by(KycRecord.created_at.desc()).limit(10)
-    ).scalars().all()
+        db.select(KycRecord.kyc_id, KycRecord.name, KycRecord.status, KycRecord.created_at)
+        .order_by(KycRecord.created_at.desc()).limit(10)
+    ).all()
     items = []
     for r in rows:
         items.append({
@@ -140,49 +137,14 @@ def analytics_recent_kyc():
             "status": r.status,
             "created_at": r.created_at.isoformat() + "Z" if r.created_at else "",
         })
-    return jsonify({"items": items})
+    return items
 
 
-@bp.get("/eligible-kyc")
-@limiter.limit("30/minute")
-def eligible_kyc_list():
-    # Users with prediction == 'eligible' and KYC status verified, with latest KYC PDF
-    # Strategy: get recent verified KYC, check eligible loan for same user, attach latest KycPdf
+def _recent_loan_items() -> list:
     rows = db.session.execute(
-        db.select(KycRecord).where(KycRecord.status == "verified").order_by(KycRecord.created_at.desc()).limit(200)
-    ).scalars().all()
-    out = []
-    for k in rows:
-        # latest eligible loan for this user
-        la = db.session.execute(
-            db.select(LoanApplication).where(LoanApplication.user_id == k.user_id, LoanApplication.prediction == 'eligible').order_by(LoanApplication.created_at.desc())
-        ).scalars().first()
-        if not la:
-            continue
-        pdf = db.session.execute(
-            db.select(KycPdf).filter_by(kyc_id=k.kyc_id).order_by(KycPdf.id.desc())
-        ).scalars().first()
-        if not pdf:
-            continue
-        u = db.session.get(User, k.user_id)
-        out.append({
-            "kyc_id": k.kyc_id,
-            "name": k.name,
-            "email": (u.email if u else ""),
-            "status": k.status,
-            "pdf_url": f"/api/banker/kyc/{k.kyc_id}/pdf",
-            "loan_id": la.id,
-            "loan_prediction": la.prediction,
-            "created_at": k.created_at.isoformat() + "Z" if k.created_at else "",
-        })
-    return jsonify({"items": out})
-
-
-@bp.get("/analytics/recent-loans")
-def analytics_recent_loans():
-    rows = db.session.execute(
-        db.select(LoanApplication).order_by(LoanApplication.created_at.desc()).limit(10)
-    ).scalars().all()
+        db.select(LoanApplication.id, LoanApplication.status, LoanApplication.created_at)
+        .order_by(LoanApplication.created_at.desc()).limit(10)
+    ).all()
     items = []
     for a in rows:
         items.append({
@@ -190,40 +152,63 @@ def analytics_recent_loans():
             "status": a.status,
             "created_at": a.created_at.isoformat() + "Z" if a.created_at else "",
         })
-    return jsonify({"items": items})
+    return items
 
 
-@bp.get("/applications")
-def applications():
-    q = db.select(LoanApplication).order_by(LoanApplication.created_at.desc())
-    status = (request.args.get("status") or "").strip()
-    if status:
-        q = q.filter(LoanApplication.status == status)
-    # Optional date filters (YYYY-MM-DD)
-    dt_from = (request.args.get("from") or "").strip()
-    dt_to = (request.args.get("to") or "").strip()
-    # Lightweight date filtering using string compare to keep simple (SQLite)
-    if dt_from:
-        q = q.filter(func.date(LoanApplication.created_at) >= dt_from)
-    if dt_to:
-        q = q.filter(func.date(LoanApplication.created_at) <= dt_to)
-
-    rows = db.session.execute(q.limit(200)).scalars().all()
-    items = []
-    for a in rows:
-        u = db.session.get(User, a.user_id)
-        dj = a.data_json or {}
-        items.append({
-            "id": a.id,
-            "status": a.status,
-            "created_at": a.created_at.isoformat() + "Z" if a.created_at else "",
-            "full_name": (dj.get("full_name") or dj.get("name") or "").strip(),
-            "email": (u.email if u else ""),
-            "amount": dj.get("amount"),
-            "term": dj.get("term"),
-            "prediction": a.prediction,
+@bp.get("/analytics/summary")
+def analytics_summary():
+    # Maintained in the same transaction as each KYC/loan write (services.counters_service)
+    return jsonify(_summary_section(counters.read(SUMMARY_COUNTERS)))
+
+
+@bp.get("/analytics/recent-kyc")
+def analytics_recent_kyc():
+    return jsonify({"items": _recent_kyc_items()})
+
+
+def _eligible_page(args) -> tuple[list, str | None]:
+    """One page of the eligible work list; raises ``ValueError`` on a bad cursor."""
+    limit = parse_limit(args.get("limit"), default=200, maximum=500)
+    q = db.select(BankerEligibleQueue).order_by(
+        BankerEligibleQueue.kyc_created_at.desc(), BankerEligibleQueue.kyc_record_id.desc()
+    )
+    cursor = (args.get("cursor") or "").strip()
+    if cursor:
+        q = q.where(keyset_before(BankerEligibleQueue.kyc_created_at, BankerEligibleQueue.kyc_record_id, cursor))
+    rows = db.session.execute(q.limit(limit + 1)).scalars().all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    out = []
+    for e in rows:
+        out.append({
+            "kyc_id": e.kyc_id,
+            "name": e.name,
+            "email": e.email or "",
+            "status": e.kyc_status,
+            "pdf_url": f"/api/banker/kyc/{e.kyc_id}/pdf",
+            "loan_id": e.loan_id,
+            "loan_prediction": e.loan_prediction,
+            "created_at": e.kyc_created_at.isoformat() + "Z" if e.kyc_created_at else "",
         })
-    return jsonify({"items": items})
+    next_cursor = encode_cursor(rows[-1].kyc_created_at, rows[-1].kyc_record_id) if more else None
+    return out, next_cursor
+
+
+@bp.get("/eligible-kyc")
+@limiter.limit("30/minute")
+def eligible_kyc_list():
+    # Verified KYC users with an eligible loan and a signed KYC PDF, read from the
+    # maintained banker_eligible_queue (see services.eligible_queue_service)
+    try:
+        items, next_cursor = _eligible_page(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+
+@bp.get("/analytics/recent-loans")
+def analytics_recent_loans():
+    return jsonify({"items": _recent_loan_items()})
 
 
 @bp.post("/verify")
@@ -235,23 +220,28 @@ def verify_qr():
     kyc_id = (payload.get("kyc_id") or data.get("kyc_id") or "").strip()
     pdf_checksum = (payload.get("pdf_checksum") or data.get("pdf_checksum") or "").strip()
     issued_at = (payload.get("issued_at") or data.get("issued_at") or "").strip()
+    data_hash = (payload.get("data_hash") or data.get("data_hash") or "").strip()
     if not kyc_id or not sig:
         return jsonify({"ok": False, "error": "Missing fields"}), 400
     # Verify signature
-    expected = sign_payload({"kyc_id": kyc_id, "pdf_checksum": pdf_checksum, "issued_at": issued_at})
+    expected = sign_payload({"kyc_id": kyc_id, "pdf_checksum": pdf_checksum, "issued_at": issued_at, "data_hash": data_hash})
     if expected != sig:
         return jsonify({"ok": False, "error": "Signature mismatch"}), 400
     # Verify KYC and checksum
     kyc = db.session.execute(db.select(KycRecord).filter_by(kyc_id=kyc_id)).scalar_one_or_none()
     if not kyc:
         return jsonify({"ok": False, "error": "KYC not found"}), 404
-    pdf = db.session.execute(db.select(KycPdf).filter_by(kyc_id=kyc_id)).scalar_one_or_none()
+    pdf = db.session.execute(
+        db.select(KycPdf).filter_by(kyc_id=kyc_id).order_by(KycPdf.id.desc()).limit(1)
+    ).scalars().first()
     if not pdf:
         return jsonify({"ok": False, "error": "KYC PDF not found"}), 404
     checksum_ok = (not pdf_checksum) or (pdf.pdf_checksum == pdf_checksum)
+    # QR codes from single-pass renders sign the field data instead of the PDF bytes
+    data_ok = (not data_hash) or (pdf.data_hash == data_hash)
     return jsonify({
         "ok": True,
-        "checksum_ok": checksum_ok,
+        "checksum_ok": checksum_ok and data_ok,
         "kyc": {
             "kyc_id": kyc.kyc_id,
             "name": kyc.name,
@@ -267,119 +257,223 @@ def verify_qr():
 @bp.get("/analytics/series")
 @limiter.limit("30/minute")
 def analytics_series():
-    # last 14 days, per day counts
-    days = 14
-    today = datetime.utcnow().date()
-    start = today - timedelta(days=days-1)
-
-    def daterange(d0, d1):
-        d = d0
-        while d <= d1:
-            yield d
-            d += timedelta(days=1)
-
-    # KYC per day
-    kyc_rows = db.session.execute(
-        db.select(KycRecord.created_at).where(KycRecord.created_at >= datetime.combine(start, datetime.min.time()))
-    ).scalars().all()
-    kyc_counts = defaultdict(int)
-    for ts in kyc_rows:
-        d = ts.date()
-        kyc_counts[d] += 1
-
-    # Loans per day
-    loan_rows = db.session.execute(
-        db.select(LoanApplication.created_at).where(LoanApplication.created_at >= datetime.combine(start, datetime.min.time()))
-    ).scalars().all()
-    loan_counts = defaultdict(int)
-    for ts in loan_rows:
-        d = ts.date()
-        loan_counts[d] += 1
-
-    series = []
-    for d in daterange(start, today):
-        series.append({
-            "date": d.isoformat(),
-            "kyc": kyc_counts.get(d, 0),
-            "loans": loan_counts.get(d, 0),
-        })
-
-    return jsonify({"series": series})
-
-
-@bp.get("/analytics/recent-kyc")
-@limiter.limit("30/minute")
-def recent_kyc():
-    rows = db.session.execute(
-        db.select(KycRecord).order_by(KycRecord.created_at.desc()).limit(10)
-    ).scalars().all()
-    out = []
-    for k in rows:
-        out.append({
-            "kyc_id": k.kyc_id,
-            "name": k.name,
-            "status": k.status,
-            "created_at": k.created_at.isoformat() + "Z" if k.created_at else "",
-        })
-    return jsonify({"items": out})
-
-
-@bp.get("/applications")
-@limiter.limit("30/minute")
-def applications_tracker():
-    # Filters: status, from (YYYY-MM-DD), to (YYYY-MM-DD)
-    status = (request.args.get('status') or '').strip().lower()
-    d_from = (request.args.get('from') or '').strip()
-    d_to = (request.args.get('to') or '').strip()
-
-    stmt = db.select(LoanApplication)
-    if status:
-        stmt = stmt.filter_by(status=status)
-    # Date range on created_at
+    # Per-day counts; closed days come from daily_rollup, only today is counted live
     try:
-        if d_from:
-            d0 = datetime.fromisoformat(d_from)
-            stmt = stmt.where(LoanApplication.created_at >= d0)
-        if d_to:
+        days = int(request.args.get("days") or 14)
+    except ValueError:
+        days = 0
+    if days not in SERIES_WINDOWS:
+        return jsonify({"error": f"days must be one of {', '.join(map(str, SERIES_WINDOWS))}"}), 400
+    return jsonify({"series": rollups.series(days)})
+
+
+def _created_between(stmt, col, d_from, d_to):
+    """Apply ``from``/``to`` ISO filters; raises ``ValueError`` on a bad date."""
+    d_from = (d_from or "").strip()
+    d_to = (d_to or "").strip()
+    if d_from:
+        stmt = stmt.where(col >= datetime.fromisoformat(d_from))
+    if d_to:
+        if len(d_to) == 10:
             # include entire day if only date provided
-            if len(d_to) == 10:
-                d1 = datetime.fromisoformat(d_to + 'T23:59:59')
-            else:
-                d1 = datetime.fromisoformat(d_to)
-            stmt = stmt.where(LoanApplication.created_at <= d1)
-    except Exception:
-        pass
-
-    stmt = stmt.order_by(LoanApplication.created_at.desc()).limit(100)
-    rows = db.session.execute(stmt).scalars().all()
+            stmt = stmt.where(col < datetime.fromisoformat(d_to) + timedelta(days=1))
+        else:
+            stmt = stmt.where(col <= datetime.fromisoformat(d_to))
+    return stmt
+
+
+def _applications_page(args) -> tuple[list, str | None]:
+    """One tracker page; raises ``ValueError`` on a malformed filter or cursor."""
+    limit = parse_limit(args.get("limit"), default=100, maximum=500)
+    status = (args.get("status") or "").strip().lower()
+    d_from = args.get("from")
+    d_to = args.get("to")
+    min_amount = (args.get("min_amount") or "").strip()
+    max_amount = (args.get("max_amount") or "").strip()
+    search = (args.get("q") or "").strip()
+    cursor = (args.get("cursor") or "").strip()
+
+    stmt = (
+        db.select(
+            LoanApplication.id, LoanApplication.status, LoanApplication.created_at,
+            LoanApplication.full_name, LoanApplication.email, LoanApplication.amount,
+            LoanApplication.term, LoanApplication.prediction, User.email.label("user_email"),
+        )
+        .outerjoin(User, User.id == LoanApplication.user_id)
+        .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
+    )
+    if status:
+        stmt = stmt.where(LoanApplication.status == status)
+    stmt = _created_between(stmt, LoanApplication.created_at, d_from, d_to)
+    if min_amount:
+        stmt = stmt.where(LoanApplication.amount >= float(min_amount))
+    if max_amount:
+        stmt = stmt.where(LoanApplication.amount <= float(max_amount))
+    if search:
+        stmt = stmt.where(or_(
+            LoanApplication.full_name.istartswith(search, autoescape=True),
+            LoanApplication.email.istartswith(search, autoescape=True),
+            User.email.istartswith(search, autoescape=True),
+        ))
+    if cursor:
+        stmt = stmt.where(keyset_before(LoanApplication.created_at, LoanApplication.id, cursor))
+
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
     items = []
     for a in rows:
         items.append({
-            'id': a.id,
-            'status': a.status,
-            'created_at': a.created_at.isoformat() + 'Z' if a.created_at else '',
-            'amount': (a.data_json or {}).get('amount'),
-            'term': (a.data_json or {}).get('term'),
-            'email': (a.data_json or {}).get('email'),
-            'full_name': (a.data_json or {}).get('full_name'),
+            "id": a.id,
+            "status": a.status,
+            "created_at": a.created_at.isoformat() + "Z" if a.created_at else "",
+            "full_name": a.full_name or "",
+            "email": a.user_email or a.email or "",
+            "amount": a.amount,
+            "term": a.term,
+            "prediction": a.prediction,
         })
-    return jsonify({'items': items})
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if more else None
+    return items, next_cursor
 
 
-@bp.get("/analytics/recent-loans")
+@bp.get("/applications")
 @limiter.limit("30/minute")
-def recent_loans():
-    rows = db.session.execute(
-        db.select(LoanApplication).order_by(LoanApplication.created_at.desc()).limit(10)
-    ).scalars().all()
-    out = []
-    for a in rows:
-        out.append({
-            "id": a.id,
-            "status": a.status,
-            "created_at": a.created_at.isoformat() + "Z" if a.created_at else "",
+def applications():
+    """Application tracker with keyset pagination and server-side filters.
+
+    Filters: status, from/to (YYYY-MM-DD or ISO datetime; a bare ``to`` date
+    includes that whole day), min_amount/max_amount, q (name or email prefix).
+    """
+    try:
+        items, next_cursor = _applications_page(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid filter or cursor"}), 400
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+
+@bp.get("/dashboard")
+@limiter.limit("60/minute")
+def dashboard():
+    """Everything the banker dashboard renders on load, in one response.
+
+    The ETag is the ``data:version`` counter, bumped by every KYC/loan/PDF
+    write, so an unchanged dashboard costs one primary-key read and a 304.
+    """
+    c = counters.read(SUMMARY_COUNTERS + [counters.VERSION_KEY])
+    etag = f"dash-{c[counters.VERSION_KEY]}"
+    if etag in request.if_none_match:
+        resp = make_response("", 304)
+    else:
+        eligible, eligible_next = _eligible_page({"limit": request.args.get("eligible_limit")})
+        apps, apps_next = _applications_page({"limit": request.args.get("applications_limit")})
+        resp = jsonify({
+            "summary": _summary_section(c),
+            "recent_kyc": {"items": _recent_kyc_items()},
+            "recent_loans": {"items": _recent_loan_items()},
+            "eligible_kyc": {"items": eligible, "next_cursor": eligible_next},
+            "applications": {"items": apps, "next_cursor": apps_next},
         })
-    return jsonify({"items": out})
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+@bp.get("/stream")
+def stream():
+    """Server-Sent Events feed of dashboard changes.
+
+    Events: ``kyc.finalized``, ``loan.prediction``, ``counters`` (deltas keyed
+    by counter name) and ``resync`` (the client missed too much and should
+    reload ``/dashboard``). Reconnects resume after ``Last-Event-ID``.
+    """
+    raw = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    bus = events.get_bus(current_app._get_current_object())
+    if raw:
+        try:
+            last_id = int(raw)
+        except ValueError:
+            return jsonify({"error": "Invalid Last-Event-ID"}), 400
+    else:
+        last_id = None
+    # Every open stream holds a worker thread; past the cap, send clients elsewhere instead of starving other requests
+    if not bus.subscribe(current_app.config.get("BANKER_STREAM_LIMIT")):
+        resp = jsonify({"error": "Too many open streams, retry shortly"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = str(STREAM_RETRY_MS // 1000)
+        return resp
+    # Read the position only once subscribed: the first listener resets the bus to the table's head
+    try:
+        if last_id is not None:
+            backlog, after, resync = bus.replay(last_id)
+        else:
+            backlog, after, resync = [], bus.cursor, False
+    except Exception:
+        bus.unsubscribe()
+        raise
+    # The stream itself never touches the database; don't pin a pooled connection
+    db.session.remove()
+
+    def generate():
+        nonlocal after
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        if resync:
+            yield events.format_sse(after, "resync", {})
+        for e in backlog:
+            yield events.format_sse(*e)
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            fresh = bus.wait(after, events.HEARTBEAT_INTERVAL)
+            if fresh is None:
+                # Fell behind this worker's buffer while connected
+                after = bus.cursor
+                yield events.format_sse(after, "resync", {})
+            elif fresh:
+                for e in fresh:
+                    yield events.format_sse(*e)
+                after = fresh[-1][0]
+            else:
+                yield ": ping\n\n"
+
+    resp = Response(generate(), mimetype="text/event-stream")
+    # Runs when the server closes the response, even if the generator never started
+    resp.call_on_close(bus.unsubscribe)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@bp.get("/export.csv")
+@bp.get("/export.ndjson")
+@limiter.limit("5/minute")
+def export_applications():
+    """Stream every application in the ``dataset.csv`` shape, oldest first.
+
+    Filters: ``from``/``to`` (loan created_at), ``status``, ``prediction``
+    and ``kyc_status``. Rows are streamed from a server-side cursor, so
+    memory stays flat however large the export.
+    """
+    stmt = exports.export_statement()
+    try:
+        stmt = _created_between(stmt, LoanApplication.created_at, request.args.get("from"), request.args.get("to"))
+    except ValueError:
+        return jsonify({"error": "Invalid from/to date"}), 400
+    for param, col in (("status", LoanApplication.status), ("prediction", LoanApplication.prediction),
+                       ("kyc_status", KycRecord.status)):
+        value = (request.args.get(param) or "").strip().lower()
+        if value:
+            stmt = stmt.where(col == value)
+
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    if request.path.endswith(".ndjson"):
+        body, mimetype, name = exports.iter_ndjson(exports.iter_records(stmt)), "application/x-ndjson", f"applications-{stamp}.ndjson"
+    else:
+        body, mimetype, name = exports.iter_csv(exports.iter_records(stmt)), "text/csv", f"applications-{stamp}.csv"
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f"attachment; filename={name}"
+    resp.headers["Cache-Control"] = "private, no-store"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 
 @bp.post("/kyc/qr-scan")
@@ -425,59 +519,64 @@ def qr_scan():
 @limiter.limit("30/minute")
 def validate_pdf():
     """Validate uploaded PDF document"""
+    max_mb = validation.MAX_PDF_BYTES // (1024 * 1024)
     try:
-        if 'pdf_document' not in request.files:
-            return jsonify({"error": "No PDF document uploaded"}), 400
-        
-        file = request.files['pdf_document']
-        if file.filename == '':
+        # Streamed to a temp file and hashed as it arrives; oversize or non-PDF bodies stop early
+        upload = uploads.receive_multipart(request.environ, "pdf_document", validation.MAX_PDF_BYTES, magic=b"%PDF")
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"File too large. Maximum size is {max_mb}MB"}), 413
+    except UnsupportedMediaType:
+        return jsonify({"error": "Invalid PDF format"}), 400
+    if upload is None:
+        return jsonify({"error": "No PDF document uploaded"}), 400
+    try:
+        if not upload.filename:
             return jsonify({"error": "No file selected"}), 400
-        
-        if not file.filename.lower().endswith('.pdf'):
+        if not upload.filename.lower().endswith('.pdf'):
             return jsonify({"error": "Invalid file format. Only PDF files are allowed"}), 400
-        
-        # Read file content
-        file_content = file.read()
-        file_size = len(file_content)
-        
-        # Calculate checksum
-        checksum = hashlib.sha256(file_content).hexdigest()
-        
-        # Basic PDF validation
-        if file_size > 10 * 1024 * 1024:  # 10MB limit
-            return jsonify({"error": "File too large. Maximum size is 10MB"}), 400
-        
-        if file_size < 1024:  # 1KB minimum
-            return jsonify({"error": "File too small. May be corrupted"}), 400
-        
-        # Check PDF header
-        if not file_content.startswith(b'%PDF'):
-            return jsonify({"error": "Invalid PDF format"}), 400
-        
-        # Simulate KYC ID extraction from PDF
-        # In production, implement PDF text extraction here
-        simulated_kyc_id = f"KYC{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # Check if this PDF exists in database
-        existing_pdf = db.session.execute(
-            db.select(KycPdf).filter_by(pdf_checksum=checksum).limit(1)
-        ).scalars().first()
-        
-        issues = []
-        if not existing_pdf:
-            issues.append("PDF not found in database")
-        
-        return jsonify({
-            "valid": existing_pdf is not None,
-            "filename": file.filename,
-            "file_size": file_size,
-            "document_type": "KYC Document",
-            "extracted_kyc_id": simulated_kyc_id,
-            "checksum": checksum,
-            "checksum_valid": existing_pdf is not None,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "issues": issues
-        })
-        
-    except Exception as e:
-        return jsonify({"error": f"PDF validation failed: {str(e)}"}), 500
+        # The signed QR payload rides in the document info; one metadata read, no rendering
+        item = validation.inspect_pdf(0, upload.filename, upload, size=upload.size, checksum=upload.sha256)
+    finally:
+        upload.close()
+    if item.error:
+        return jsonify({"error": item.error}), 400
+    return jsonify(validation.verdict(item, validation.stored_pdfs([item.checksum]).get(item.checksum)))
+
+
+@bp.post("/kyc/validate-batch")
+@limiter.limit("5/minute")
+def validate_batch():
+    """Validate many PDFs (multipart files and/or zip archives) and stream NDJSON results."""
+    try:
+        if request.mimetype == "multipart/form-data":
+            files = uploads.receive_multipart_files(request.environ, validation.MAX_BATCH_BYTES)
+        elif request.mimetype in ("application/zip", "application/x-zip-compressed", "application/octet-stream"):
+            archive = uploads.receive_raw(request.stream, validation.MAX_BATCH_BYTES, request.content_length)
+            archive.filename = "upload.zip"
+            files = [archive]
+        else:
+            return jsonify({"error": "Send multipart/form-data files or an application/zip body"}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"Upload too large. Maximum is {validation.MAX_BATCH_BYTES // (1024 * 1024)}MB"}), 413
+    if not files:
+        return jsonify({"error": "No files uploaded"}), 400
+    try:
+        jobs, archives = validation.batch_sources(files)
+    except ValueError as e:
+        for f in files:
+            f.close()
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        try:
+            yield from validation.iter_batch(jobs)
+        finally:
+            for zf in archives:
+                zf.close()
+            for f in files:
+                f.close()
+
+    resp = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    resp.headers["Cache-Control"] = "private, no-store"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
@@ -1,14 +1,18 @@
-import json
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app, send_file, session
+from flask import Blueprint, request, jsonify, current_app, session, url_for
 from flask_login import login_required, current_user
+from werkzeug.exceptions import RequestEntityTooLarge
 from ..extensions import db
-from ..models import KycRecord, KycPdf, LoanApplication
-from ..services.id_service import generate_kyc_id, qr_payload, sign_payload
+from ..models import KycRecord, KycPdf, KycRenderJob, LoanApplication
+from ..services.id_service import data_hash, generate_kyc_id
 from ..services.pdf_service import generate_kyc_pdf
-import os
+from ..services import image_service as images
+from ..services import kyc_document_service as documents
+from ..services import kyc_lookup_service as kyc_lookup
+from ..services import render_job_service as render_jobs
+from ..services import storage_service as storage
+from ..services import upload_service as uploads
 import base64
-import hashlib
 import io
 import smtplib
 from email.message import EmailMessage
@@ -46,15 +50,6 @@ def finalize():
     dob_iso = (data.get("dob") or "").strip()
     gov_id = (data.get("gov_id") or "").strip()
     address = (data.get("address") or "").strip()
-    # extra fields (not persisted in DB columns; included in PDF for record)
-    email = (data.get("email") or "").strip()
-    phone = (data.get("phone") or "").strip()
-    address2 = (data.get("address2") or "").strip()
-    city = (data.get("city") or "").strip()
-    state = (data.get("state") or "").strip()
-    pincode = (data.get("pincode") or "").strip()
-    id_issuer = (data.get("id_issuer") or "").strip()
-    id_expiry = (data.get("id_expiry") or "").strip()
 
     kyc = db.session.execute(db.select(KycRecord).filter_by(user_id=current_user.id)).scalar_one_or_none()
     if not kyc:
@@ -77,99 +72,113 @@ def finalize():
     # Refresh the record to get the latest selfie_ref (in case it was updated after upload)
     db.session.refresh(kyc)
     
+    selfie = storage.read(kyc.selfie_ref)
     print(f"KYC finalize: Selfie ref = {kyc.selfie_ref}")
-    print(f"KYC finalize: File exists = {os.path.exists(kyc.selfie_ref) if kyc.selfie_ref else False}")
-
-    # First render a provisional PDF to compute checksum; then re-render with checksum in QR
-    provisional_pdf_bytes, _ = generate_kyc_pdf({
-        "KYC ID": kyc.kyc_id,
-        "Name": name,
-        "DOB": dob_iso,
-        "Gov ID Type": kyc.gov_id_type,
-        "Gov ID (last4)": kyc.gov_id_last4,
-        "Email": email,
-        "Phone": phone,
-        "Address": address,
-        "Address 2": address2,
-        "City": city,
-        "State": state,
-        "Pincode": pincode,
-        "ID Issuer": id_issuer,
-        "ID Expiry": id_expiry,
-    }, json.dumps({"note":"provisional"}), selfie_path=kyc.selfie_ref)
-
-    # Now compute checksum of final PDF content with QR including checksum
-    payload = qr_payload(kyc.kyc_id, "")
-    payload["pdf_checksum"] = hashlib.sha256(provisional_pdf_bytes).hexdigest()
-    signature = sign_payload(payload)
-    qr_text = json.dumps({"payload": payload, "sig": signature})
-
-    pdf_bytes, checksum = generate_kyc_pdf({
-        "KYC ID": kyc.kyc_id,
-        "Name": name,
-        "DOB": dob_iso,
-        "Gov ID Type": kyc.gov_id_type,
-        "Gov ID (last4)": kyc.gov_id_last4,
-        "Email": email,
-        "Phone": phone,
-        "Address": address,
-        "Address 2": address2,
-        "City": city,
-        "State": state,
-        "Pincode": pincode,
-        "ID Issuer": id_issuer,
-        "ID Expiry": id_expiry,
-    }, qr_text, selfie_path=kyc.selfie_ref)
-
-    payload["pdf_checksum"] = checksum
-    signature = sign_payload(payload)
-    qr_text = json.dumps({"payload": payload, "sig": signature})
-
-    storage_dir = os.path.abspath(current_app.config.get("STORAGE_DIR", "storage"))
-    os.makedirs(storage_dir, exist_ok=True)
-    pdf_path = os.path.join(storage_dir, f"kyc_{kyc.kyc_id}.pdf")
-    with open(pdf_path, "wb") as f:
-        f.write(pdf_bytes)
-
-    pdf = KycPdf(kyc_id=kyc.kyc_id, pdf_url=pdf_path, pdf_checksum=checksum, qr_payload_hash=signature)
-    db.session.add(pdf)
+    print(f"KYC finalize: Selfie found = {selfie is not None}")
+
+    # extra fields (not persisted in DB columns; included in PDF for record)
+    fields = documents.printed_fields(kyc, data)
+    dh = data_hash(fields, selfie)
+
+    if current_app.config.get("KYC_RENDER_ASYNC"):
+        # Render in the kyc-worker process pool; the client polls the job
+        job = render_jobs.enqueue(kyc, fields, dh)
+        status_url = url_for("kyc.job_status", job_id=job.id)
+        resp = jsonify({"message": "KYC finalize queued", "kyc_id": kyc.kyc_id, "job_id": job.id,
+                        "status": job.status, "status_url": status_url})
+        resp.headers["Location"] = status_url
+        return resp, 202
+
+    dh, signature, qr_text = documents.sign_fields(kyc.kyc_id, fields, selfie, dh)
+    pdf_bytes, checksum = generate_kyc_pdf(fields, qr_text, selfie=selfie)
+    documents.store_pdf(kyc, pdf_bytes, checksum, signature, dh, fields)
     db.session.commit()
+    kyc_lookup.invalidate(kyc_id=kyc.kyc_id, user_id=current_user.id)
 
-    return jsonify({"message": "KYC finalized", "kyc_id": kyc.kyc_id, "pdf_url": pdf_path})
+    return jsonify({"message": "KYC finalized", "kyc_id": kyc.kyc_id, "pdf_url": url_for("kyc.my_pdf")})
+
+
+@bp.get("/jobs/<int:job_id>")
+@login_required
+def job_status(job_id: int):
+    job = db.session.get(KycRenderJob, job_id)
+    kyc = db.session.get(KycRecord, job.kyc_record_id) if job else None
+    if not kyc or kyc.user_id != current_user.id:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify(render_jobs.to_json(job))
+
+
+def _selfie_too_large():
+    return jsonify({"error": f"Image too large. Maximum is {images.MAX_SELFIE_BYTES // (1024 * 1024)}MB"}), 413
 
 
 @bp.post("/upload-selfie")
 @login_required
 def upload_selfie():
-    data = request.get_json(silent=True) or {}
-    b64 = data.get("image_data") or ""
-    if not b64:
-        return jsonify({"error": "No image data"}), 400
-    # Accept data URL or plain base64
-    if b64.startswith("data:image"):
-        try:
-            b64 = b64.split(",", 1)[1]
-        except Exception:
-            return jsonify({"error": "Invalid data URL"}), 400
-    try:
-        raw = base64.b64decode(b64)
-    except Exception:
-        return jsonify({"error": "Invalid base64"}), 400
-
     kyc = db.session.execute(db.select(KycRecord).filter_by(user_id=current_user.id)).scalar_one_or_none()
     if not kyc:
         return jsonify({"error": "KYC not started"}), 400
 
-    storage_dir = os.path.abspath(current_app.config.get("STORAGE_DIR", "storage"))
-    os.makedirs(storage_dir, exist_ok=True)
-    fname = f"selfie_{current_user.id}_{kyc.id}.png"
-    path = os.path.join(storage_dir, fname)
-    with open(path, "wb") as f:
-        f.write(raw)
+    mimetype = request.mimetype or ""
+    upload = None
+    if mimetype == "multipart/form-data" or mimetype.startswith("image/") or mimetype == "application/octet-stream":
+        # Streamed to a temp file in chunks, hashed and size-checked as it arrives
+        try:
+            if mimetype == "multipart/form-data":
+                upload = uploads.receive_multipart(request.environ, "image", images.MAX_SELFIE_BYTES)
+                if upload is None:
+                    return jsonify({"error": "No image file (expected form field 'image')"}), 400
+            else:
+                upload = uploads.receive_raw(request.stream, images.MAX_SELFIE_BYTES, request.content_length)
+        except RequestEntityTooLarge:
+            return _selfie_too_large()
+        if not upload.size:
+            upload.close()
+            return jsonify({"error": "No image data"}), 400
+        expected = (request.headers.get("X-Content-SHA256") or "").strip().lower()
+        if expected and expected != upload.sha256:
+            upload.close()
+            return jsonify({"error": "Checksum mismatch"}), 400
+        source = upload
+    else:
+        # Legacy clients: base64 data URL in a JSON body
+        # base64 inflates by 4/3; refuse oversize bodies before parsing the JSON
+        max_body = images.MAX_SELFIE_BYTES * 4 // 3 + 1024
+        if request.content_length and request.content_length > max_body:
+            return _selfie_too_large()
+        data = request.get_json(silent=True) or {}
+        b64 = data.get("image_data") or ""
+        if not b64:
+            return jsonify({"error": "No image data"}), 400
+        # Accept data URL or plain base64
+        if b64.startswith("data:image"):
+            try:
+                b64 = b64.split(",", 1)[1]
+            except Exception:
+                return jsonify({"error": "Invalid data URL"}), 400
+        if len(b64) > max_body:
+            return _selfie_too_large()
+        try:
+            source = base64.b64decode(b64)
+        except Exception:
+            return jsonify({"error": "Invalid base64"}), 400
 
-    kyc.selfie_ref = path
+    try:
+        selfie, thumb = images.ingest_selfie(source)
+    except images.ImageRejected as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        if upload is not None:
+            upload.close()
+
+    # Content-addressed: written once under a temp name and renamed, deduplicated by hash
+    kyc.selfie_ref = storage.put(selfie, "image/jpeg")
+    kyc.selfie_thumb_ref = storage.put(thumb, "image/jpeg")
     db.session.commit()
-    return jsonify({"message": "Selfie uploaded", "path": path})
+    out = {"message": "Selfie uploaded", "path": kyc.selfie_ref, "thumbnail": kyc.selfie_thumb_ref, "size": len(selfie)}
+    if upload is not None:
+        out["upload_sha256"], out["upload_size"] = upload.sha256, upload.size
+    return jsonify(out)
 
 
 # ---- OTP utilities ----
@@ -261,11 +270,7 @@ def my_pdf():
     ).scalars().first()
     if not pdf:
         return jsonify({"error": "No KYC PDF"}), 404
-    path = pdf.pdf_url
-    if not os.path.isabs(path):
-        path = os.path.abspath(path)
-    filename = f"kyc_{kyc.kyc_id}.pdf"
-    return send_file(path, mimetype="application/pdf", as_attachment=True, download_name=filename)
+    return storage.send(pdf.pdf_url, f"kyc_{kyc.kyc_id}.pdf", etag=pdf.pdf_checksum)
 
 
 @bp.get("/me")
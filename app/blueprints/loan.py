@@ -1,10 +1,23 @@
-from flask import Blueprint, request, jsonify
+import json
+import math
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
-from ..extensions import db
+from ..extensions import db, limiter
 from ..models import LoanApplication
+from ..services import eligible_queue_service as eligible_queue
+from ..services import events_service as events
+from ..services import kyc_lookup_service as kyc_lookup
+from ..services.eligibility_service import score_application, score_batch
+from ..services.policy_service import get_policy
+from ..services.pagination_service import encode_cursor, keyset_before, parse_limit
+from ..services.amortization_service import MAX_TERM, iter_schedule, summarize
 
 bp = Blueprint("loan", __name__)
 
+MAX_BATCH_ROWS = 10000
+# Schedules longer than this are streamed as NDJSON unless format=json is requested
+SCHEDULE_STREAM_THRESHOLD = 120
+
 
 @bp.post("/save-draft")
 @login_required
@@ -20,86 +33,124 @@ def save_draft():
         loan = LoanApplication(user_id=current_user.id)
         db.session.add(loan)
 
-    loan.data_json = payload.get("data") or {}
+    is_new = loan.id is None
+    previous = loan.prediction
+    loan.set_data(payload.get("data") or {})
     loan.status = "draft"
     # Compute simple eligibility and store in prediction
-    try:
-        d = loan.data_json or {}
-        amount = float(d.get("amount") or 0)
-        term = int(d.get("term") or 0)
-        income = float(d.get("income") or 0)
-        emi_existing = float(d.get("emi") or 0)
-        credit = float(d.get("credit_score") or 0)
-        age = int(d.get("age") or 0)
-        emp = str(d.get("employment_type") or '').lower()
-        res = str(d.get("residence_type") or '').lower()
-
-        annual_rate = 0.14
-        r = annual_rate/12.0
-        emi_needed = int(round((amount*r*(1+r)**term)/(((1+r)**term-1) if term>0 else 1))) if term>0 and amount>0 else 0
-
-        capacity = max(0.0, income - emi_existing)
-        boost = 0.0
-        
-        # Age-based eligibility factors
-        if age < 21:
-            boost -= 0.10  # Penalty for very young applicants
-        elif age < 25:
-            boost -= 0.05  # Small penalty for young adults
-        elif age >= 21 and age <= 60:
-            if age >= 25 and age <= 45:
-                boost += 0.08  # Prime age bracket
-            elif age > 45 and age <= 55:
-                boost += 0.05  # Good age bracket
-            elif age > 55 and age <= 60:
-                boost += 0.02  # Acceptable age bracket
-        else:
-            boost -= 0.15  # Penalty for applicants over 60 (retirement risk)
-            
-        # Credit score factors
-        if credit >= 800: boost += 0.12
-        elif credit >= 750: boost += 0.08
-        elif credit >= 700: boost += 0.04
-        
-        # Employment factors
-        if emp == 'salaried': boost += 0.05
-        elif emp == 'self_employed': boost += 0.02
-        elif emp == 'student': boost -= 0.10
-        elif emp == 'retired': boost -= 0.05
-        
-        # Residence factors
-        if res == 'owned': boost += 0.03
-        elif res == 'parental': boost += 0.01
-        
-        boosted_capacity = int(round(capacity * (1 + boost)))
-
-        eligible = (boosted_capacity >= emi_needed and amount>0 and term>0 and age >= 21 and age <= 60)
-        loan.prediction = 'eligible' if eligible else 'ineligible'
-    except Exception:
-        # If parsing fails, leave prediction unchanged
-        pass
+    score = score_application(loan.data_json or {})
+    # If parsing fails, leave prediction unchanged
+    if score is not None:
+        loan.prediction = score["prediction"]
+        loan.policy_version = score["policy_version"]
+    if loan.prediction != previous or (is_new and loan.prediction == "eligible"):
+        eligible_queue.refresh_users([current_user.id])
+    if loan.prediction != previous:
+        db.session.flush()
+        events.publish("loan.prediction", {
+            "loan_id": loan.id, "user_id": current_user.id,
+            "prediction": loan.prediction, "previous": previous,
+        })
     db.session.commit()
+    if is_new:
+        # Banker lookups show the applicant's latest loan
+        kyc_lookup.invalidate(user_id=current_user.id)
+
+    return jsonify({"id": loan.id, "status": loan.status, "data": loan.data_json, "prediction": loan.prediction, "policy_version": loan.policy_version})
 
-    return jsonify({"id": loan.id, "status": loan.status, "data": loan.data_json, "prediction": loan.prediction})
+
+@bp.post("/eligibility/batch")
+@login_required
+@limiter.limit("30/minute")
+def eligibility_batch():
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get("rows")
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "rows must be a non-empty list"}), 400
+    if len(rows) > MAX_BATCH_ROWS:
+        return jsonify({"error": f"Too many rows. Maximum is {MAX_BATCH_ROWS}"}), 400
+
+    policy = get_policy()
+    items = []
+    for i, score in enumerate(score_batch(rows, policy)):
+        if score is None:
+            items.append({"index": i, "error": "Invalid input"})
+        else:
+            items.append({"index": i, **score})
+    return jsonify({"count": len(items), "policy_version": policy.version, "items": items})
 
 
 @bp.get("/my")
 @login_required
 def my_loans():
-    rows = db.session.execute(
-        db.select(LoanApplication)
+    limit = parse_limit(request.args.get("limit"))
+    q = (
+        db.select(
+            LoanApplication.id, LoanApplication.status, LoanApplication.created_at,
+            LoanApplication.amount, LoanApplication.term, LoanApplication.purpose,
+            LoanApplication.prediction, LoanApplication.policy_version,
+        )
         .filter_by(user_id=current_user.id)
-        .order_by(LoanApplication.created_at.desc())
-    ).scalars().all()
+        .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
+    )
+    cursor = (request.args.get("cursor") or "").strip()
+    if cursor:
+        try:
+            q = q.where(keyset_before(LoanApplication.created_at, LoanApplication.id, cursor))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(q.limit(limit + 1)).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
     out = []
     for a in rows:
         out.append({
             "id": a.id,
             "status": a.status,
             "created_at": a.created_at.isoformat() + "Z" if a.created_at else "",
-            "amount": (a.data_json or {}).get("amount"),
-            "term": (a.data_json or {}).get("term"),
-            "purpose": (a.data_json or {}).get("purpose"),
+            "amount": a.amount,
+            "term": a.term,
+            "purpose": a.purpose,
             "prediction": a.prediction,
+            "policy_version": a.policy_version,
         })
-    return jsonify({"items": out})
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if more else None
+    return jsonify({"items": out, "next_cursor": next_cursor})
+
+
+def _schedule_response(amount, term, annual_rate):
+    try:
+        amount = float(amount or 0)
+        term = int(term or 0)
+        annual_rate = float(annual_rate)
+    except (TypeError, ValueError, OverflowError):
+        return jsonify({"error": "Invalid amount, term or rate"}), 400
+    if not math.isfinite(amount) or amount <= 0 or term <= 0 or term > MAX_TERM or not (0 <= annual_rate < 1):
+        return jsonify({"error": f"amount must be a positive number, term between 1 and {MAX_TERM}, annual_rate between 0 and 1"}), 400
+
+    summary = summarize(amount, term, annual_rate)
+    fmt = (request.args.get("format") or "").strip().lower()
+    if fmt == "ndjson" or (fmt != "json" and term > SCHEDULE_STREAM_THRESHOLD):
+        def generate():
+            yield json.dumps({"summary": summary}) + "\n"
+            for row in iter_schedule(amount, term, annual_rate):
+                yield json.dumps(row) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    return jsonify({"summary": summary, "items": list(iter_schedule(amount, term, annual_rate))})
+
+
+@bp.post("/schedule")
+@login_required
+def schedule_preview():
+    payload = request.get_json(silent=True) or {}
+    return _schedule_response(payload.get("amount"), payload.get("term"), payload.get("annual_rate", get_policy().annual_rate))
+
+
+@bp.get("/<int:app_id>/schedule")
+@login_required
+def loan_schedule(app_id: int):
+    loan = db.session.get(LoanApplication, app_id)
+    if not loan or loan.user_id != current_user.id:
+        return jsonify({"error": "Not found"}), 404
+    return _schedule_response(loan.amount, loan.term, get_policy().annual_rate)
@@ -0,0 +1,532 @@
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, inspect, text, update
+
+from .extensions import db
+from .models import AnalyticsCounter, BankerEligibleQueue, DailyRollup, KycPdf, KycRecord, KycRenderJob, LoanApplication, User
+from .services import counters_service as counters
+from .services import eligible_queue_service as eligible_queue
+from .services import events_service as events
+from .services import export_service as exports
+from .services import kyc_document_service as documents
+from .services import kyc_lookup_service as kyc_lookup
+from .services import render_job_service as render_jobs
+from .services import rollup_service as rollups
+from .services import storage_service as storage
+from .services.eligibility_service import score_batch
+from .services.policy_service import get_policy
+
+
+def _load_checkpoint(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(path: str, state: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+@click.command("rescore-loans")
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows fetched and scored per batch.")
+@click.option("--dry-run", is_flag=True, help="Score and report differences without writing anything.")
+@click.option("--restart", is_flag=True, help="Ignore any saved checkpoint and start from the first row.")
+@click.option("--checkpoint", "checkpoint_path", default=None, help="Checkpoint file (default: instance/rescore_loans.json).")
+@with_appcontext
+def rescore_loans(chunk_size, dry_run, restart, checkpoint_path):
+    """Re-score stored loan applications against the current eligibility policy."""
+    policy = get_policy()
+    checkpoint_path = checkpoint_path or os.path.join(current_app.instance_path, "rescore_loans.json")
+
+    state = {} if (restart or dry_run) else _load_checkpoint(checkpoint_path)
+    if state and state.get("policy_version") != policy.version:
+        click.echo(f"Checkpoint was for policy {state.get('policy_version')}; starting over for {policy.version}")
+        state = {}
+    last_id = int(state.get("last_id") or 0)
+    stats = Counter(state.get("stats") or {})
+    if last_id:
+        click.echo(f"Resuming after id {last_id}")
+
+    started = time.monotonic()
+    scanned = 0
+    while True:
+        rows = db.session.execute(
+            db.select(LoanApplication.id, LoanApplication.user_id, LoanApplication.data_json,
+                      LoanApplication.prediction, LoanApplication.policy_version)
+            .where(LoanApplication.id > last_id)
+            .order_by(LoanApplication.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        changes = []
+        flipped_users = set()
+        flips = []
+        for row, score in zip(rows, score_batch([r.data_json or {} for r in rows], policy)):
+            stats["scanned"] += 1
+            if score is None:
+                stats["unparseable"] += 1
+                continue
+            if score["prediction"] == row.prediction:
+                stats["unchanged"] += 1
+            else:
+                stats[f"{row.prediction or 'none'}->{score['prediction']}"] += 1
+                flipped_users.add(row.user_id)
+                flips.append({"loan_id": row.id, "user_id": row.user_id,
+                              "prediction": score["prediction"], "previous": row.prediction})
+            if score["prediction"] != row.prediction or score["policy_version"] != row.policy_version:
+                changes.append({"id": row.id, "prediction": score["prediction"], "policy_version": score["policy_version"]})
+
+        last_id = rows[-1].id
+        scanned += len(rows)
+        stats["updated"] += len(changes)
+        if not dry_run:
+            if changes:
+                db.session.execute(update(LoanApplication), changes)
+                # Same transaction as the rows: the banker queue and live dashboards see the flips with them
+                eligible_queue.refresh_users(flipped_users)
+                events.publish_many("loan.prediction", flips)
+                counters.bump_version()
+            db.session.commit()
+            _save_checkpoint(checkpoint_path, {"policy_version": policy.version, "last_id": last_id, "stats": dict(stats)})
+        else:
+            db.session.rollback()
+
+        elapsed = time.monotonic() - started
+        click.echo(f"... id {last_id}: {scanned} rows this run ({scanned / elapsed if elapsed else 0:.0f} rows/s)")
+
+    label = "Would update" if dry_run else "Updated"
+    click.echo(f"Policy {policy.version}: scanned {stats['scanned']}, {label.lower()} {stats['updated']}")
+    for key in sorted(k for k in stats if k not in ("scanned", "updated")):
+        click.echo(f"  {key}: {stats[key]}")
+    if not dry_run and os.path.exists(checkpoint_path):
+        # Finished cleanly; the next run should start from the beginning
+        os.remove(checkpoint_path)
+
+
+@click.command("backfill-loan-columns")
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows updated per transaction.")
+@with_appcontext
+def backfill_loan_columns(chunk_size):
+    """Populate amount/term/purpose/full_name/email from data_json on existing loans."""
+    last_id = 0
+    updated = 0
+    while True:
+        rows = db.session.execute(
+            db.select(LoanApplication.id, LoanApplication.data_json)
+            .where(LoanApplication.id > last_id)
+            .order_by(LoanApplication.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        changes = [{"id": r.id, **LoanApplication.promoted_fields(r.data_json)} for r in rows]
+        db.session.execute(update(LoanApplication), changes)
+        counters.bump_version()
+        db.session.commit()
+        last_id = rows[-1].id
+        updated += len(changes)
+        click.echo(f"... backfilled through id {last_id}")
+    click.echo(f"Backfilled {updated} loan applications")
+
+
+@click.command("rebuild-eligible-queue")
+@with_appcontext
+def rebuild_eligible_queue():
+    """Recompute banker_eligible_queue from KYC, loan and PDF tables."""
+    count = eligible_queue.rebuild()
+    counters.bump_version()
+    db.session.commit()
+    click.echo(f"Eligible queue rebuilt with {count} entries")
+
+
+@click.command("recount-analytics")
+@click.option("--check-only", is_flag=True, help="Report drift without rewriting the counters.")
+@with_appcontext
+def recount_analytics(check_only):
+    """Rebuild analytics_counters from the source tables and report any drift."""
+    actual = counters.actual_counts()
+    stored = {
+        r.name: int(r.value) for r in db.session.execute(db.select(AnalyticsCounter)).scalars()
+        if r.name != counters.VERSION_KEY
+    }
+    drift = {k: actual.get(k, 0) - stored.get(k, 0) for k in set(actual) | set(stored)}
+    drift = {k: v for k, v in drift.items() if v}
+    for name in sorted(drift):
+        click.echo(f"  {name}: stored {stored.get(name, 0)}, actual {actual.get(name, 0)}")
+    if check_only:
+        if drift:
+            raise click.ClickException(f"{len(drift)} counters have drifted")
+        click.echo("Counters match source tables")
+        return
+    if drift:
+        counters.apply_deltas(db.session.connection(), drift)
+        counters.bump_version()
+    db.session.commit()
+    click.echo(f"Recounted {len(actual)} counters, corrected {len(drift)}")
+
+
+@click.command("finalize-rollups")
+@click.option("--days", default=2, show_default=True, help="How many closed days back to (re)compute.")
+@with_appcontext
+def finalize_rollups(days):
+    """Store daily KYC/loan counts for closed days; schedule this shortly after midnight UTC."""
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    n = rollups.finalize_days(yesterday - timedelta(days=days-1), yesterday)
+    db.session.commit()
+    click.echo(f"Finalized {n} daily rollups through {yesterday.isoformat()}")
+
+
+def _alembic_config():
+    from alembic.config import Config
+    root = os.path.dirname(current_app.root_path)
+    cfg = Config(os.path.join(root, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(root, "migrations"))
+    return cfg
+
+
+@click.command("db-upgrade")
+@click.option("--revision", default="head", show_default=True, help="Target revision.")
+@with_appcontext
+def db_upgrade(revision):
+    """Apply Alembic migrations; adopts databases created by the old create_all boot."""
+    from alembic import command
+    cfg = _alembic_config()
+    tables = set(inspect(db.engine).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        click.echo("Existing schema without migration history; stamping initial revision")
+        command.stamp(cfg, "0001")
+    command.upgrade(cfg, revision)
+
+
+def _hot_queries():
+    """Representative statements for each banker/loan/kyc hot path."""
+    some_dt = func.datetime("now")
+    return [
+        ("loan.my_loans", db.select(LoanApplication.id).where(LoanApplication.user_id == 1)
+            .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc()).limit(51)),
+        ("kyc.start latest loan", db.select(LoanApplication).filter_by(user_id=1)
+            .order_by(LoanApplication.created_at.desc()).limit(1)),
+        ("kyc by user", db.select(KycRecord).filter_by(user_id=1)),
+        ("banker.lookup", kyc_lookup.lookup_statement("X")),
+        ("banker.lookup numeric", kyc_lookup.lookup_statement("12")),
+        ("banker.eligible_kyc", db.select(BankerEligibleQueue)
+            .order_by(BankerEligibleQueue.kyc_created_at.desc(), BankerEligibleQueue.kyc_record_id.desc()).limit(201)),
+        ("eligible queue refresh", eligible_queue.eligible_rows([1])),
+        ("banker.recent_kyc", db.select(KycRecord).order_by(KycRecord.created_at.desc()).limit(10)),
+        ("banker.recent_loans", db.select(LoanApplication).order_by(LoanApplication.created_at.desc()).limit(10)),
+        ("banker.applications", db.select(LoanApplication.id, User.email).outerjoin(User, User.id == LoanApplication.user_id)
+            .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc()).limit(101)),
+        ("banker.applications status", db.select(LoanApplication.id, User.email).outerjoin(User, User.id == LoanApplication.user_id)
+            .where(LoanApplication.status == "draft")
+            .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc()).limit(101)),
+        ("banker.export", exports.export_statement()),
+        ("kyc-worker claim", db.select(KycRenderJob.id).where(render_jobs.runnable(datetime(2000, 1, 1)))
+            .order_by(KycRenderJob.id).limit(4)),
+        ("banker.validate checksums", db.select(KycPdf).where(KycPdf.pdf_checksum.in_(["abc", "def"])).order_by(KycPdf.id)),
+        ("banker.summary", db.select(AnalyticsCounter.name, AnalyticsCounter.value)
+            .where(AnalyticsCounter.name.in_(["kyc:total", "loan:total"]))),
+        ("banker.series kyc today", db.select(func.date(KycRecord.created_at), func.count())
+            .where(KycRecord.created_at >= some_dt).group_by(func.date(KycRecord.created_at))),
+        ("banker.series loans today", db.select(func.date(LoanApplication.created_at), func.count())
+            .where(LoanApplication.created_at >= some_dt).group_by(func.date(LoanApplication.created_at))),
+        ("banker.series rollups", db.select(DailyRollup).where(DailyRollup.day >= some_dt)),
+    ]
+
+
+def _full_scans(conn, sql: str) -> list:
+    if conn.dialect.name == "sqlite":
+        plan = [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        # Scans of materialized subqueries are fine; only base-table scans count
+        tables = set(db.metadata.tables)
+        return [p for p in plan if p.startswith("SCAN ") and "INDEX" not in p and p.split()[1] in tables]
+    plan = [row[0] for row in conn.execute(text("EXPLAIN " + sql))]
+    return [p.strip() for p in plan if "Seq Scan" in p]
+
+
+@click.command("check-query-plans")
+@click.option("--verbose", is_flag=True, help="Print the full plan for every query.")
+@with_appcontext
+def check_query_plans(verbose):
+    """EXPLAIN the hot queries and fail if any of them falls back to a full table scan."""
+    failures = 0
+    with db.engine.connect() as conn:
+        for label, stmt in _hot_queries():
+            sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+            scans = _full_scans(conn, sql)
+            click.echo(f"{'FULL SCAN' if scans else 'ok':9} {label}")
+            for line in scans:
+                click.echo(f"          {line}")
+            if verbose:
+                prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+                for row in conn.execute(text(prefix + sql)):
+                    click.echo(f"          | {row[-1] if conn.dialect.name == 'sqlite' else row[0]}")
+            failures += bool(scans)
+    if failures:
+        raise click.ClickException(f"{failures} hot queries use a full table scan")
+
+
+@click.command("kyc-worker")
+@click.option("--processes", default=os.cpu_count() or 1, show_default=True, help="Render processes.")
+@click.option("--poll-interval", default=1.0, show_default=True, help="Seconds between queue checks when idle.")
+@click.option("--once", is_flag=True, help="Exit once the queue is empty instead of polling forever.")
+@with_appcontext
+def kyc_worker(processes, poll_interval, once):
+    """Render queued KYC PDFs (KYC_RENDER_ASYNC mode) in a process pool."""
+    import multiprocessing
+    import socket
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+    from .services.pdf_service import generate_kyc_pdf
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    # spawn: children never inherit the parent's database connections
+    ctx = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(processes, mp_context=ctx)
+    running = {}
+    done_count = failed_count = 0
+    click.echo(f"kyc-worker {worker}: {processes} processes")
+    try:
+        while True:
+            if len(running) < processes:
+                for task in render_jobs.claim(worker, processes - len(running)):
+                    running[pool.submit(generate_kyc_pdf, task.fields, task.qr_text, task.selfie)] = task
+            if not running:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            finished, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            broken = False
+            for fut in finished:
+                task = running.pop(fut)
+                try:
+                    pdf_bytes, checksum = fut.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    render_jobs.fail(task, f"render process died: {e}")
+                    failed_count += 1
+                except Exception as e:
+                    render_jobs.fail(task, f"{type(e).__name__}: {e}")
+                    failed_count += 1
+                else:
+                    job = render_jobs.complete(task, pdf_bytes, checksum)
+                    done_count += 1
+                    click.echo(f"job {job.id} {job.status} ({job.kyc_id})")
+            if broken:
+                # Every outstanding future is lost with the pool; requeue them and start a fresh one
+                for task in running.values():
+                    render_jobs.fail(task, "render pool restarted")
+                running.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(processes, mp_context=ctx)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    click.echo(f"Rendered {done_count} jobs, {failed_count} failed attempts")
+
+
+@click.command("regenerate-kyc-pdfs")
+@click.option("--processes", default=os.cpu_count() or 1, show_default=True, help="Render processes.")
+@click.option("--batch-size", default=200, show_default=True, help="Documents per transaction.")
+@click.option("--status", "statuses", multiple=True, help="Only KYC records with this status (repeatable).")
+@click.option("--from", "d_from", type=click.DateTime(), default=None, help="Only records verified on or after this date.")
+@click.option("--to", "d_to", type=click.DateTime(), default=None, help="Only records verified on or before this date.")
+@click.option("--restart", is_flag=True, help="Ignore any saved checkpoint and start from the first record.")
+@click.option("--checkpoint", "checkpoint_path", default=None, help="Checkpoint file (default: instance/regenerate_kyc_pdfs.json).")
+@with_appcontext
+def regenerate_kyc_pdfs(processes, batch_size, statuses, d_from, d_to, restart, checkpoint_path):
+    """Re-render every stored KYC PDF with the current template, QR format and signing secret.
+
+    Each record gets a new kyc_pdf row (its latest document) with a fresh
+    signature; older rows are kept. Progress is checkpointed by kyc_id, along
+    with records whose render failed; a resumed run retries those first.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from .services.id_service import data_hash
+    from .services.pdf_service import generate_kyc_pdf
+
+    def submit(rows):
+        # Fields, selfie and signature are resolved here; render processes only draw
+        submitted = []
+        for kyc, pdf in rows:
+            fields, source = documents.stored_fields(kyc, pdf)
+            selfie = storage.read(kyc.selfie_ref)
+            dh, signature, qr_text = documents.sign_fields(kyc.kyc_id, fields, selfie, data_hash(fields, selfie))
+            meta = {"kyc_id": kyc.kyc_id, "user_id": kyc.user_id, "fields": fields, "source": source,
+                    "data_hash": dh, "signature": signature}
+            submitted.append((meta, pool.submit(generate_kyc_pdf, fields, qr_text, selfie)))
+        return submitted
+
+    checkpoint_path = checkpoint_path or os.path.join(current_app.instance_path, "regenerate_kyc_pdfs.json")
+    filters = {"statuses": sorted(statuses), "from": d_from.isoformat() if d_from else None,
+               "to": d_to.isoformat() if d_to else None}
+    state = {} if restart else _load_checkpoint(checkpoint_path)
+    if state and state.get("filters") != filters:
+        click.echo("Checkpoint was for different filters; starting over")
+        state = {}
+    last_kyc_id = state.get("last_kyc_id") or ""
+    failed = set(state.get("failed") or [])
+    stats = Counter(state.get("stats") or {})
+    if last_kyc_id:
+        click.echo(f"Resuming after kyc_id {last_kyc_id}, retrying {len(failed)} failed renders first")
+
+    latest_pdf = (
+        db.select(func.max(KycPdf.id))
+        .where(KycPdf.kyc_id == KycRecord.kyc_id)
+        .correlate(KycRecord)
+        .scalar_subquery()
+    )
+    stmt = db.select(KycRecord, KycPdf).join(KycPdf, KycPdf.id == latest_pdf).where(KycRecord.kyc_id.is_not(None))
+    if statuses:
+        stmt = stmt.where(KycRecord.status.in_(statuses))
+    if d_from:
+        stmt = stmt.where(KycRecord.verified_at >= d_from)
+    if d_to:
+        if d_to.time() == datetime.min.time():
+            # A bare date covers that whole day
+            stmt = stmt.where(KycRecord.verified_at < d_to + timedelta(days=1))
+        else:
+            stmt = stmt.where(KycRecord.verified_at <= d_to)
+    remaining = db.session.execute(
+        db.select(func.count()).select_from(stmt.where(KycRecord.kyc_id > last_kyc_id).subquery())
+    ).scalar() + len(failed)
+    click.echo(f"{remaining} documents to regenerate with {processes} processes")
+
+    def batches():
+        # Earlier failures first, then the records after the checkpoint
+        retry = sorted(failed)
+        for i in range(0, len(retry), batch_size):
+            chunk = retry[i:i + batch_size]
+            rows = db.session.execute(
+                stmt.where(KycRecord.kyc_id.in_(chunk)).order_by(KycRecord.kyc_id)
+            ).all()
+            # Records deleted or no longer matching since the failure are dropped
+            failed.difference_update(set(chunk) - {kyc.kyc_id for kyc, _ in rows})
+            if rows:
+                yield rows
+        cursor = last_kyc_id
+        while True:
+            rows = db.session.execute(
+                stmt.where(KycRecord.kyc_id > cursor).order_by(KycRecord.kyc_id).limit(batch_size)
+            ).all()
+            if not rows:
+                return
+            cursor = rows[-1][0].kyc_id
+            yield rows
+
+    # spawn: children never inherit the parent's database connections
+    pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"))
+    started = time.monotonic()
+    done = 0
+    pending = batches()
+    in_flight = None
+    try:
+        while True:
+            rows = next(pending, None)
+            # Queue the next batch before writing this one so the pool stays busy during commits
+            next_batch = submit(rows) if rows else None
+            if in_flight:
+                users = set()
+                for meta, fut in in_flight:
+                    try:
+                        pdf_bytes, checksum = fut.result()
+                    except Exception as e:
+                        failed.add(meta["kyc_id"])
+                        click.echo(f"  {meta['kyc_id']}: render failed: {type(e).__name__}: {e}")
+                        continue
+                    documents.add_pdf(meta["kyc_id"], pdf_bytes, checksum, meta["signature"], meta["data_hash"], meta["fields"])
+                    failed.discard(meta["kyc_id"])
+                    users.add(meta["user_id"])
+                    stats["regenerated"] += 1
+                    stats[f"fields_{meta['source']}"] += 1
+                eligible_queue.refresh_users(users)
+                counters.bump_version()
+                db.session.commit()
+                # Retried batches lie behind the checkpoint; it only ever moves forward
+                last_kyc_id = max(last_kyc_id, in_flight[-1][0]["kyc_id"])
+                _save_checkpoint(checkpoint_path, {"filters": filters, "last_kyc_id": last_kyc_id,
+                                                   "failed": sorted(failed), "stats": dict(stats)})
+                done += len(in_flight)
+                elapsed = time.monotonic() - started
+                rate = done / elapsed if elapsed else 0
+                eta = (remaining - done) / rate if rate else 0
+                click.echo(f"... kyc_id {last_kyc_id}: {done}/{remaining} ({rate:.1f} docs/s, ETA {int(eta // 60)}m{int(eta % 60):02d}s)")
+            in_flight = next_batch
+            if not in_flight:
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    click.echo(f"Regenerated {stats['regenerated']} documents, {len(failed)} failed")
+    for key in sorted(k for k in stats if k.startswith("fields_")):
+        click.echo(f"  {key}: {stats[key]}")
+    if failed:
+        # Kept so the next run retries just these
+        click.echo(f"Failed kyc_ids are kept in {checkpoint_path}; run again to retry them")
+    elif os.path.exists(checkpoint_path):
+        # Finished cleanly; the next run should start from the beginning
+        os.remove(checkpoint_path)
+
+
+@click.command("import-legacy-storage")
+@click.option("--chunk-size", default=200, show_default=True, help="Rows updated per transaction.")
+@with_appcontext
+def import_legacy_storage(chunk_size):
+    """Copy KYC PDFs and selfies stored as plain file paths into the blob store and repoint their rows.
+
+    The original files are left in place.
+    """
+    for model, column, default_type in ((KycPdf, KycPdf.pdf_url, "application/pdf"),
+                                        (KycRecord, KycRecord.selfie_ref, "image/jpeg")):
+        last_id = moved = missing = 0
+        while True:
+            rows = db.session.execute(
+                db.select(model.id, column.label("ref"))
+                .where(model.id > last_id, column.is_not(None), column != "", column.not_like(storage.REF_PREFIX + "%"))
+                .order_by(model.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            changes = []
+            for r in rows:
+                try:
+                    with open(os.path.abspath(r.ref), "rb") as f:
+                        # Older clients uploaded PNG and WebP selfies as-is
+                        content_type = storage.sniff_content_type(f.read(12), r.ref, default_type)
+                        changes.append({"id": r.id, column.key: storage.put(f, content_type)})
+                except FileNotFoundError:
+                    missing += 1
+            if changes:
+                db.session.execute(update(model), changes)
+            db.session.commit()
+            last_id = rows[-1].id
+            moved += len(changes)
+        click.echo(f"{model.__tablename__}.{column.key}: imported {moved}, missing files {missing}")
+
+
+def register_cli(app):
+    app.cli.add_command(rescore_loans)
+    app.cli.add_command(backfill_loan_columns)
+    app.cli.add_command(db_upgrade)
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(rebuild_eligible_queue)
+    app.cli.add_command(recount_analytics)
+    app.cli.add_command(finalize_rollups)
+    app.cli.add_command(kyc_worker)
+    app.cli.add_command(import_legacy_storage)
+    app.cli.add_command(regenerate_kyc_pdfs)
@@ -8,9 +8,29 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///instance/app.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     STORAGE_DIR = os.getenv("STORAGE_DIR", "storage")
+    # Where content-addressed blobs (KYC PDFs, selfies) live: "local" (STORAGE_DIR/blobs) or "s3"
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+    # S3/MinIO connection for STORAGE_BACKEND=s3; S3_ENDPOINT is host[:port]
+    S3_ENDPOINT = os.getenv("S3_ENDPOINT", "localhost:9000")
+    S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY", "")
+    S3_SECRET_KEY = os.getenv("S3_SECRET_KEY", "")
+    S3_BUCKET = os.getenv("S3_BUCKET", "dhansetu")
+    S3_PREFIX = os.getenv("S3_PREFIX", "blobs")
+    S3_REGION = os.getenv("S3_REGION", "")
+    S3_SECURE = os.getenv("S3_SECURE", "true").lower() in ("1", "true", "yes")
+    # "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd): the proxy sends blob bytes, not the worker
+    BLOB_OFFLOAD = os.getenv("BLOB_OFFLOAD", "").lower()
+    # Internal nginx location that maps onto the blob root, for BLOB_OFFLOAD=x-accel-redirect
+    BLOB_ACCEL_PREFIX = os.getenv("BLOB_ACCEL_PREFIX", "/_blobs/")
     SERVER_SALT = os.getenv("SERVER_SALT", "change-me")
     SERVER_SIGNING_SECRET = os.getenv("SERVER_SIGNING_SECRET", "change-me")
     WTF_CSRF_TIME_LIMIT = None
+    # Declarative eligibility rules; reloaded automatically when the file changes
+    ELIGIBILITY_POLICY_PATH = os.getenv("ELIGIBILITY_POLICY_PATH", "")
+    # Open /api/banker/stream connections per worker; each holds a thread, so keep it below gunicorn --threads
+    BANKER_STREAM_LIMIT = int(os.getenv("BANKER_STREAM_LIMIT", "8"))
+    # Queue KYC PDF renders for `flask kyc-worker` instead of rendering inside the request
+    KYC_RENDER_ASYNC = os.getenv("KYC_RENDER_ASYNC", "false").lower() in ("1", "true", "yes")
     # SMTP settings for email OTP
     SMTP_HOST = os.getenv("SMTP_HOST", "")
     SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
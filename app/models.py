@@ -1,3 +1,4 @@
+import math
 from datetime import datetime
 from flask_login import UserMixin
 from .extensions import db
@@ -16,41 +17,183 @@ class User(db.Model, UserMixin):
 
 class LoanApplication(db.Model):
     __tablename__ = "loan_applications"
+    __table_args__ = (
+        db.Index("ix_loan_applications_user_created", "user_id", "created_at"),
+        db.Index("ix_loan_applications_created", "created_at"),
+        db.Index("ix_loan_applications_status_created", "status", "created_at"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     data_json = db.Column(db.JSON)
-    status = db.Column(db.String(20), default="draft")
+    # Scalars promoted out of data_json so listings can read, filter and sort on them
+    amount = db.Column(db.Numeric(14, 2, asdecimal=False))
+    term = db.Column(db.Integer)
+    purpose = db.Column(db.String(120))
+    full_name = db.Column(db.String(120))
+    email = db.Column(db.String(255))
+    # active_history: the counters hook needs the old status even when the row was expired by a commit
+    status = db.column_property(db.Column(db.String(20), default="draft"), active_history=True)
     prediction = db.Column(db.String(20))
+    policy_version = db.Column(db.String(32))
     finalized_pdf_url = db.Column(db.String(512))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @staticmethod
+    def promoted_fields(data: dict) -> dict:
+        d = data if isinstance(data, dict) else {}
+
+        def _num(v, cast, limit):
+            # Anything the column can't hold (NaN, inf, too many digits) is stored as NULL
+            try:
+                n = cast(v) if v not in (None, "") else None
+            except (TypeError, ValueError, OverflowError):
+                return None
+            if n is None or not math.isfinite(n) or abs(n) >= limit:
+                return None
+            return n
+
+        def _str(v, size):
+            v = str(v or "").strip()
+            return v[:size] or None
+
+        return {
+            "amount": _num(d.get("amount"), float, 10**12),
+            "term": _num(d.get("term"), int, 2**31),
+            "purpose": _str(d.get("purpose"), 120),
+            "full_name": _str(d.get("full_name") or d.get("name"), 120),
+            "email": _str(d.get("email"), 255),
+        }
+
+    def set_data(self, data: dict):
+        self.data_json = data
+        for k, v in self.promoted_fields(data).items():
+            setattr(self, k, v)
+
 
 class KycRecord(db.Model):
     __tablename__ = "kyc_records"
+    __table_args__ = (
+        db.Index("ix_kyc_records_user_id", "user_id"),
+        db.Index("ix_kyc_records_status_created", "status", "created_at"),
+        db.Index("ix_kyc_records_created", "created_at"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     kyc_id = db.Column(db.String(64), unique=True)
-    status = db.Column(db.String(20), default="pending")
+    # active_history: the counters hook needs the old status even when the row was expired by a commit
+    status = db.column_property(db.Column(db.String(20), default="pending"), active_history=True)
     name = db.Column(db.String(120))
     dob = db.Column(db.String(20))
     gov_id_type = db.Column(db.String(30))
     gov_id_last4 = db.Column(db.String(8))
     address = db.Column(db.Text)
     selfie_ref = db.Column(db.String(512))
+    selfie_thumb_ref = db.Column(db.String(512))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     verified_at = db.Column(db.DateTime)
 
 
 class KycPdf(db.Model):
     __tablename__ = "kyc_pdf"
+    __table_args__ = (
+        db.Index("ix_kyc_pdf_kyc_id_id", "kyc_id", "id"),
+        db.Index("ix_kyc_pdf_checksum", "pdf_checksum"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     kyc_id = db.Column(db.String(64), db.ForeignKey("kyc_records.kyc_id"), nullable=False)
     pdf_url = db.Column(db.String(512))
     pdf_checksum = db.Column(db.String(128))
     qr_payload_hash = db.Column(db.String(128))
+    # id_service.data_hash of the printed fields; the QR signature covers it
+    data_hash = db.Column(db.String(64))
+    # The printed label -> value mapping, so the document can be re-rendered later
+    fields = db.Column(db.JSON)
     signed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class KycRenderJob(db.Model):
+    """A queued KYC PDF render; see ``services.render_job_service``.
+
+    One row per (KYC record, data hash), so resubmitting the same finalize
+    returns the existing job instead of rendering again.
+    """
+    __tablename__ = "kyc_render_jobs"
+    __table_args__ = (
+        db.UniqueConstraint("kyc_record_id", "data_hash", name="uq_kyc_render_jobs_record_hash"),
+        db.Index("ix_kyc_render_jobs_status_id", "status", "id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kyc_record_id = db.Column(db.Integer, db.ForeignKey("kyc_records.id"), nullable=False)
+    kyc_id = db.Column(db.String(64), nullable=False)
+    data_hash = db.Column(db.String(64), nullable=False)
+    fields = db.Column(db.JSON, nullable=False)
+    # queued | running | done | failed | superseded
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Running: lease expiry, after which another worker may retry. Queued: retry backoff.
+    lease_until = db.Column(db.DateTime)
+    worker = db.Column(db.String(128))
+    error = db.Column(db.Text)
+    pdf_id = db.Column(db.Integer, db.ForeignKey("kyc_pdf.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BankerEligibleQueue(db.Model):
+    """Denormalized banker work list: verified KYC + eligible loan + signed PDF.
+
+    Maintained by ``services.eligible_queue_service`` whenever a prediction or
+    KYC PDF changes, so the dashboard reads it with one indexed query.
+    """
+    __tablename__ = "banker_eligible_queue"
+    __table_args__ = (
+        db.Index("ix_banker_eligible_queue_created", "kyc_created_at", "kyc_record_id"),
+    )
+    kyc_record_id = db.Column(db.Integer, db.ForeignKey("kyc_records.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    kyc_id = db.Column(db.String(64), nullable=False)
+    name = db.Column(db.String(120))
+    email = db.Column(db.String(255))
+    kyc_status = db.Column(db.String(20))
+    loan_id = db.Column(db.Integer, nullable=False)
+    loan_prediction = db.Column(db.String(20))
+    pdf_id = db.Column(db.Integer, nullable=False)
+    kyc_created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class AnalyticsCounter(db.Model):
+    """Running totals kept in step with kyc_records/loan_applications writes.
+
+    Names look like ``kyc:total`` or ``loan:status:approved``; see
+    ``services.counters_service``.
+    """
+    __tablename__ = "analytics_counters"
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class DailyRollup(db.Model):
+    """Per-day KYC/loan creation counts for closed (past) UTC days."""
+    __tablename__ = "daily_rollup"
+    day = db.Column(db.Date, primary_key=True)
+    kyc_count = db.Column(db.Integer, nullable=False, default=0)
+    loan_count = db.Column(db.Integer, nullable=False, default=0)
+    finalized_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class BankerEvent(db.Model):
+    """Append-only feed behind ``/api/banker/stream``; ids double as SSE event ids."""
+    __tablename__ = "banker_events"
+    # Without AUTOINCREMENT SQLite reuses ids once pruning empties the table, behind every worker's cursor
+    __table_args__ = {"sqlite_autoincrement": True}
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    type = db.Column(db.String(40), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
 class BankerUser(db.Model):
     __tablename__ = "banker_users"
     id = db.Column(db.Integer, primary_key=True)
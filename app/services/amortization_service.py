@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+
+MAX_TERM = 480
+
+
+@lru_cache(maxsize=4096)
+def growth_factor(annual_rate: float, term: int) -> float:
+    """Memoized ``(1 + r) ** term`` for a monthly rate derived from ``annual_rate``."""
+    r = annual_rate/12.0
+    try:
+        return (1+r)**term
+    except OverflowError:
+        return float("inf")
+
+
+@lru_cache(maxsize=4096)
+def annuity_factor(annual_rate: float, term: int) -> float:
+    """EMI per unit of principal for ``term`` monthly instalments."""
+    if term <= 0:
+        return 0.0
+    r = annual_rate/12.0
+    if r == 0:
+        return 1.0/term
+    g = growth_factor(annual_rate, term)
+    return (r*g)/(g-1)
+
+
+def summarize(amount: float, term: int, annual_rate: float) -> dict:
+    emi = round(amount * annuity_factor(annual_rate, term), 2)
+    total = round(emi * term, 2)
+    return {
+        "amount": amount,
+        "term": term,
+        "annual_rate": annual_rate,
+        "emi": emi,
+        "total_payment": total,
+        "total_interest": round(total - amount, 2),
+    }
+
+
+def iter_schedule(amount: float, term: int, annual_rate: float):
+    """Yield one row per month; the final instalment absorbs rounding drift."""
+    r = annual_rate/12.0
+    emi = round(amount * annuity_factor(annual_rate, term), 2)
+    balance = amount
+    for month in range(1, term + 1):
+        interest = round(balance * r, 2)
+        principal = round(emi - interest, 2)
+        payment = emi
+        if month == term or principal > balance:
+            principal = round(balance, 2)
+            payment = round(principal + interest, 2)
+        balance = round(balance - principal, 2)
+        yield {
+            "month": month,
+            "payment": payment,
+            "principal": principal,
+            "interest": interest,
+            "balance": balance,
+        }
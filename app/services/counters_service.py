@@ -0,0 +1,116 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event, func, insert, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from . import events_service as events
+from ..models import AnalyticsCounter, KycPdf, KycRecord, LoanApplication
+
+# Counter prefix per tracked model
+TRACKED = {KycRecord: "kyc", LoanApplication: "loan"}
+# Bumped on any write that can change what the banker dashboard shows
+VERSION_KEY = "data:version"
+VERSIONED = (KycRecord, LoanApplication, KycPdf)
+
+
+def status_key(prefix: str, status) -> str:
+    return f"{prefix}:status:{status or 'none'}"
+
+
+def _deltas(session) -> Counter:
+    deltas = Counter()
+    if any(isinstance(o, VERSIONED) for o in session.new) or any(isinstance(o, VERSIONED) for o in session.deleted) \
+            or any(isinstance(o, VERSIONED) and session.is_modified(o) for o in session.dirty):
+        deltas[VERSION_KEY] += 1
+    for obj in session.new:
+        prefix = TRACKED.get(type(obj))
+        if prefix:
+            deltas[f"{prefix}:total"] += 1
+            deltas[status_key(prefix, obj.status)] += 1
+    for obj in session.deleted:
+        prefix = TRACKED.get(type(obj))
+        if prefix:
+            deltas[f"{prefix}:total"] -= 1
+            deltas[status_key(prefix, obj.status)] -= 1
+    for obj in session.dirty:
+        prefix = TRACKED.get(type(obj))
+        if not prefix:
+            continue
+        hist = inspect(obj).attrs.status.history
+        if hist.has_changes():
+            for old in hist.deleted:
+                deltas[status_key(prefix, old)] -= 1
+            for new in hist.added:
+                deltas[status_key(prefix, new)] += 1
+    return Counter({k: v for k, v in deltas.items() if v})
+
+
+def apply_deltas(conn, deltas: dict):
+    now = datetime.utcnow()
+    upsert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(conn.dialect.name)
+    for name, delta in sorted(deltas.items()):
+        if upsert is not None:
+            # One statement, so two first writers of a new name can't both try the INSERT
+            stmt = upsert(AnalyticsCounter).values(name=name, value=delta, updated_at=now)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[AnalyticsCounter.name],
+                set_={"value": AnalyticsCounter.value + delta, "updated_at": now},
+            ))
+        elif not _add(conn, name, delta, now):
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(AnalyticsCounter).values(name=name, value=delta, updated_at=now))
+            except IntegrityError:
+                # Another transaction created the row first
+                _add(conn, name, delta, now)
+
+
+def _add(conn, name: str, delta: int, now) -> bool:
+    res = conn.execute(
+        update(AnalyticsCounter)
+        .where(AnalyticsCounter.name == name)
+        .values(value=AnalyticsCounter.value + delta, updated_at=now)
+    )
+    return res.rowcount > 0
+
+
+def _after_flush(session, flush_context):
+    # Runs inside the flush's transaction, so counters commit or roll back with the rows
+    deltas = _deltas(session)
+    if deltas:
+        conn = session.connection()
+        apply_deltas(conn, deltas)
+        shown = {k: v for k, v in deltas.items() if k != VERSION_KEY}
+        if shown:
+            events.publish("counters", shown, conn)
+
+
+def bump_version(conn=None):
+    """Mark dashboard data as changed after writes that bypass the ORM flush."""
+    apply_deltas(conn or db.session.connection(), {VERSION_KEY: 1})
+
+
+def register():
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+
+
+def read(names) -> dict:
+    rows = db.session.execute(
+        db.select(AnalyticsCounter.name, AnalyticsCounter.value).where(AnalyticsCounter.name.in_(list(names)))
+    ).all()
+    out = dict.fromkeys(names, 0)
+    out.update({r.name: int(r.value) for r in rows})
+    return out
+
+
+def actual_counts() -> dict:
+    """Counts recomputed from the source tables with one GROUP BY per table."""
+    out = {}
+    for model, prefix in TRACKED.items():
+        rows = db.session.execute(db.select(model.status, func.count()).group_by(model.status)).all()
+        out[f"{prefix}:total"] = sum(n for _, n in rows)
+        for status, n in rows:
+            out[status_key(prefix, status)] = out.get(status_key(prefix, status), 0) + n
+    return out
@@ -0,0 +1,105 @@
+import numpy as np
+from .amortization_service import growth_factor
+from .policy_service import Policy, get_policy
+
+# Drafts beyond these are unparseable rather than scored; they would overflow the int64 columns
+MAX_TERM_MONTHS = 1200
+MAX_AGE = 150
+
+
+def parse_features(d: dict, policy: Policy) -> tuple:
+    """Coerce one loan draft into scoring inputs; raises on malformed values."""
+    amount = float(d.get("amount") or 0)
+    term = int(d.get("term") or 0)
+    income = float(d.get("income") or 0)
+    emi_existing = float(d.get("emi") or 0)
+    credit = float(d.get("credit_score") or 0)
+    age = int(d.get("age") or 0)
+    emp = str(d.get("employment_type") or '').lower()
+    res = str(d.get("residence_type") or '').lower()
+    if abs(term) > MAX_TERM_MONTHS or abs(age) > MAX_AGE:
+        raise ValueError("term or age out of range")
+    return (
+        amount, term, income, emi_existing, credit, age,
+        policy.employment.get(emp, 0.0), policy.residence.get(res, 0.0),
+    )
+
+
+def score_application(d: dict, policy: Policy | None = None) -> dict | None:
+    """Score a single loan draft; ``None`` if it can't be parsed.
+
+    Runs through :func:`score_batch` so both paths share one implementation,
+    including how NaN and infinite inputs are treated.
+    """
+    return score_batch([d], policy)[0]
+
+
+def score_batch(rows: list, policy: Policy | None = None) -> list:
+    """Score many loan drafts in one vectorized pass.
+
+    Returns one dict per input row (``prediction``, ``emi_needed``,
+    ``boosted_capacity``, ``policy_version``), or ``None`` for rows that
+    can't be scored: malformed fields, ``term`` beyond ``MAX_TERM_MONTHS``
+    or ``age`` beyond ``MAX_AGE``, and NaN/+inf ``income`` or NaN ``emi``
+    (the capacity is then not a number).
+
+    That ``None`` is a change from the scalar scorer this replaced, which
+    predicted ``ineligible`` for out-of-range age and NaN income or EMI, and
+    scored terms over 1200 months. Callers keep a stored prediction as it is
+    on ``None`` and the batch endpoint reports the row as invalid.
+    """
+    policy = policy or get_policy()
+    parsed = []
+    valid = []
+    for i, d in enumerate(rows):
+        try:
+            parsed.append(parse_features(d, policy))
+            valid.append(i)
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            continue
+
+    out = [None] * len(rows)
+    if not parsed:
+        return out
+
+    cols = list(zip(*parsed))
+    amount = np.array(cols[0], dtype=np.float64)
+    term = np.array(cols[1], dtype=np.int64)
+    income = np.array(cols[2], dtype=np.float64)
+    emi_existing = np.array(cols[3], dtype=np.float64)
+    # NaN never satisfies a >= threshold, so it must land in the lowest credit band
+    credit = np.nan_to_num(np.array(cols[4], dtype=np.float64), nan=0.0, posinf=np.inf, neginf=-np.inf)
+    age = np.array(cols[5], dtype=np.int64)
+    emp_boost = np.array(cols[6], dtype=np.float64)
+    res_boost = np.array(cols[7], dtype=np.float64)
+
+    r = policy.annual_rate/12.0
+    payable = (term > 0) & (amount > 0)
+    # Few distinct tenures per batch: look each up once in the memoized factor table
+    terms, inverse = np.unique(term, return_inverse=True)
+    growth = np.array([growth_factor(policy.annual_rate, t) for t in terms.tolist()], dtype=np.float64)[inverse]
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        emi_needed = np.where(payable, np.rint((amount*r*growth)/(growth-1)), 0.0)
+
+    capacity = np.maximum(0.0, income - emi_existing)
+    boost = policy.age.lookup_many(age)
+    boost = boost + policy.credit.lookup_many(credit)
+    boost = boost + emp_boost
+    boost = boost + res_boost
+    boosted_capacity = np.rint(capacity * (1 + boost))
+
+    eligible = (boosted_capacity >= emi_needed) & payable & (age >= policy.min_age) & (age <= policy.max_age)
+    finite = np.isfinite(emi_needed) & np.isfinite(boosted_capacity)
+
+    # Convert once to Python lists; per-element numpy scalar access is slow
+    rows_out = zip(valid, finite.tolist(), eligible.tolist(),
+                   emi_needed.tolist(), boosted_capacity.tolist())
+    for i, ok, elig, emi, cap in rows_out:
+        if ok:
+            out[i] = {
+                "prediction": "eligible" if elig else "ineligible",
+                "emi_needed": int(emi),
+                "boosted_capacity": int(cap),
+                "policy_version": policy.version,
+            }
+    return out
@@ -0,0 +1,75 @@
+from datetime import datetime
+from sqlalchemy import DateTime, delete, func, insert, literal
+from ..extensions import db
+from ..models import BankerEligibleQueue, KycPdf, KycRecord, LoanApplication, User
+
+
+def eligible_rows(user_ids=None):
+    """One set-based query for the banker work list.
+
+    Picks each user's latest eligible loan and each KYC's latest PDF with
+    ``row_number()`` windows instead of per-row lookups.
+    """
+    loan_q = db.select(
+        LoanApplication.user_id,
+        LoanApplication.id.label("loan_id"),
+        LoanApplication.prediction,
+        func.row_number().over(
+            partition_by=LoanApplication.user_id,
+            order_by=(LoanApplication.created_at.desc(), LoanApplication.id.desc()),
+        ).label("rn"),
+    ).where(LoanApplication.prediction == "eligible")
+    pdf_q = db.select(
+        KycPdf.kyc_id,
+        KycPdf.id.label("pdf_id"),
+        func.row_number().over(partition_by=KycPdf.kyc_id, order_by=KycPdf.id.desc()).label("rn"),
+    )
+    kyc_q = db.select(KycRecord).where(KycRecord.status == "verified")
+    if user_ids is not None:
+        loan_q = loan_q.where(LoanApplication.user_id.in_(user_ids))
+        kyc_q = kyc_q.where(KycRecord.user_id.in_(user_ids))
+        pdf_q = pdf_q.where(KycPdf.kyc_id.in_(db.select(KycRecord.kyc_id).where(KycRecord.user_id.in_(user_ids))))
+    loan = loan_q.subquery()
+    pdf = pdf_q.subquery()
+    kyc = kyc_q.subquery()
+
+    return (
+        db.select(
+            kyc.c.id.label("kyc_record_id"),
+            kyc.c.user_id,
+            kyc.c.kyc_id,
+            kyc.c.name,
+            User.email,
+            kyc.c.status.label("kyc_status"),
+            loan.c.loan_id,
+            loan.c.prediction.label("loan_prediction"),
+            pdf.c.pdf_id,
+            kyc.c.created_at.label("kyc_created_at"),
+        )
+        .join(loan, (loan.c.user_id == kyc.c.user_id) & (loan.c.rn == 1))
+        .join(pdf, (pdf.c.kyc_id == kyc.c.kyc_id) & (pdf.c.rn == 1))
+        .outerjoin(User, User.id == kyc.c.user_id)
+    )
+
+
+def refresh_users(user_ids):
+    """Recompute queue entries for ``user_ids`` inside the caller's transaction."""
+    user_ids = sorted({int(u) for u in user_ids if u is not None})
+    if not user_ids:
+        return
+    db.session.execute(delete(BankerEligibleQueue).where(BankerEligibleQueue.user_id.in_(user_ids)))
+    _insert_from(eligible_rows(user_ids))
+
+
+def rebuild():
+    """Repopulate the whole queue from source tables; returns the row count."""
+    db.session.execute(delete(BankerEligibleQueue))
+    _insert_from(eligible_rows())
+    return db.session.execute(db.select(func.count()).select_from(BankerEligibleQueue)).scalar() or 0
+
+
+def _insert_from(select_stmt):
+    # INSERT ... SELECT keeps the rows in the database instead of round-tripping them
+    select_stmt = select_stmt.add_columns(literal(datetime.utcnow(), DateTime).label("updated_at"))
+    cols = [c.name for c in select_stmt.selected_columns]
+    db.session.execute(insert(BankerEligibleQueue).from_select(cols, select_stmt))
@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert
+from ..extensions import db
+from ..models import BankerEvent
+
+# How often (seconds) a worker polls banker_events while it has listeners
+POLL_INTERVAL = 1.0
+# Comment frame sent on idle streams so proxies keep the connection open
+HEARTBEAT_INTERVAL = 15.0
+# A missing id is assumed rolled back (not just slow to commit) after this long
+GAP_GRACE = 5.0
+# Recent events kept in memory per worker for reconnecting clients
+BUFFER_SIZE = 1000
+RETENTION = timedelta(days=1)
+PRUNE_INTERVAL = 3600.0
+
+
+def publish(type_: str, payload: dict, conn=None):
+    """Queue an event in the caller's transaction; listeners see it after commit."""
+    (conn or db.session.connection()).execute(
+        insert(BankerEvent).values(type=type_, payload=payload, created_at=datetime.utcnow())
+    )
+
+
+def publish_many(type_: str, payloads: list, conn=None):
+    """:func:`publish` for a batch of events of one type, in one executemany."""
+    if not payloads:
+        return
+    now = datetime.utcnow()
+    (conn or db.session.connection()).execute(
+        insert(BankerEvent), [{"type": type_, "payload": p, "created_at": now} for p in payloads]
+    )
+
+
+def format_sse(event_id: int, type_: str, payload: dict) -> str:
+    return f"id: {event_id}\nevent: {type_}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+class EventBus:
+    """Per-worker fan-out of banker_events.
+
+    One daemon thread per worker polls the table by primary key and wakes every
+    open stream in that worker, so the database sees one cheap query per second
+    per worker no matter how many dashboards are connected. Workers share
+    nothing but the table.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._cond = threading.Condition()
+        self._buffer = deque(maxlen=BUFFER_SIZE)
+        self._cursor = None
+        # Oldest id the buffer can answer "what came after" for
+        self._floor = 0
+        self._gaps = {}
+        self._listeners = 0
+        self._thread = None
+        self._pruned = None
+
+    @property
+    def cursor(self) -> int:
+        with self._cond:
+            if self._cursor is None:
+                self._cursor = db.session.execute(db.select(func.coalesce(func.max(BankerEvent.id), 0))).scalar()
+                self._floor = self._cursor
+            return self._cursor
+
+    def subscribe(self, limit: int | None = None) -> bool:
+        """Register a stream; ``False`` (and nothing registered) if ``limit`` streams are already open."""
+        with self._cond:
+            if limit is not None and self._listeners >= limit:
+                return False
+            if self._listeners <= 0:
+                # Nothing was polled while idle, so the cursor and buffer are stale;
+                # start over from the table's head rather than replay old events
+                self._cursor = None
+                self._buffer.clear()
+                self._gaps = {}
+            self._listeners += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="banker-events", daemon=True)
+                self._thread.start()
+            return True
+
+    def unsubscribe(self):
+        with self._cond:
+            self._listeners -= 1
+
+    def since(self, after_id: int) -> list | None:
+        """Buffered events after ``after_id``, or ``None`` if the buffer no longer reaches back that far."""
+        with self._cond:
+            if after_id < self._floor:
+                return None
+            return [e for e in self._buffer if e[0] > after_id]
+
+    def replay(self, after_id: int) -> tuple[list, int, bool]:
+        """What a client resuming from ``after_id`` missed.
+
+        Returns ``(events, position, resync)``: the client should continue
+        waiting from ``position``. ``resync`` means the gap was pruned or is
+        longer than one buffer, and the client must reload instead.
+        """
+        cursor = self.cursor
+        events = self.since(after_id)
+        if events is None:
+            events = [e for e in load_since(after_id, BUFFER_SIZE + 1) if e[0] <= cursor]
+            oldest = db.session.execute(db.select(func.min(BankerEvent.id))).scalar()
+            if len(events) > BUFFER_SIZE or (oldest is not None and oldest > after_id + 1):
+                return [], cursor, True
+        position = max([after_id, cursor] + [e[0] for e in events[-1:]])
+        return events, position, False
+
+    def wait(self, after_id: int, timeout: float) -> list | None:
+        with self._cond:
+            if not (self._cursor or 0) > after_id:
+                self._cond.wait(timeout)
+        return self.since(after_id)
+
+    def _run(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            with self._cond:
+                idle = self._listeners <= 0
+            if idle:
+                continue
+            try:
+                with self.app.app_context():
+                    self._poll()
+                    self._maybe_prune()
+                    db.session.remove()
+            except Exception as e:
+                print(f"Events service: Poll failed: {e}")
+
+    def _poll(self):
+        cursor = self.cursor
+        rows = db.session.execute(
+            db.select(BankerEvent.id, BankerEvent.type, BankerEvent.payload)
+            .where(BankerEvent.id > cursor)
+            .order_by(BankerEvent.id)
+            .limit(500)
+        ).all()
+        if not rows:
+            return
+        now = time.monotonic()
+        fresh = []
+        expected = cursor + 1
+        for r in rows:
+            # Ids are handed out before commit, so a lower id can still appear;
+            # hold back until it does or the grace period says it never will
+            if r.id != expected and now - self._gaps.setdefault(expected, now) < GAP_GRACE:
+                break
+            fresh.append((r.id, r.type, r.payload))
+            expected = r.id + 1
+        if not fresh:
+            return
+        with self._cond:
+            # A first subscriber may have moved the cursor past this poll meanwhile
+            fresh = [e for e in fresh if self._cursor is None or e[0] > self._cursor]
+            if not fresh:
+                return
+            overflow = len(self._buffer) + len(fresh) - BUFFER_SIZE
+            if overflow > 0:
+                self._floor = (list(self._buffer) + fresh)[overflow - 1][0]
+            self._buffer.extend(fresh)
+            self._cursor = fresh[-1][0]
+            self._gaps = {k: v for k, v in self._gaps.items() if k > self._cursor}
+            self._cond.notify_all()
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if self._pruned is not None and now - self._pruned < PRUNE_INTERVAL:
+            return
+        self._pruned = now
+        # The newest row always survives, so ids can never restart below a worker's cursor
+        newest = db.select(func.max(BankerEvent.id)).scalar_subquery()
+        db.session.execute(
+            delete(BankerEvent)
+            .where(BankerEvent.created_at < datetime.utcnow() - RETENTION, BankerEvent.id < newest)
+        )
+        db.session.commit()
+
+
+def get_bus(app) -> EventBus:
+    bus = app.extensions.get("banker_events")
+    if bus is None:
+        bus = app.extensions.setdefault("banker_events", EventBus(app))
+    return bus
+
+
+def load_since(after_id: int, limit: int = BUFFER_SIZE) -> list:
+    """Events after ``after_id`` straight from the table, for resumes older than the buffer."""
+    rows = db.session.execute(
+        db.select(BankerEvent.id, BankerEvent.type, BankerEvent.payload)
+        .where(BankerEvent.id > after_id)
+        .order_by(BankerEvent.id)
+        .limit(limit)
+    ).all()
+    return [(r.id, r.type, r.payload) for r in rows]
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from sqlalchemy import exists, func
+from ..extensions import db
+from ..models import KycPdf, KycRecord, LoanApplication, User
+
+# Same header as dataset.csv, which the risk team's tooling reads
+EXPORT_COLUMNS = ("user_id", "email", "name", "loan_id", "amount", "term", "prediction",
+                  "kyc_id", "kyc_status", "pdf_url", "created_at")
+# Rows fetched per round trip; with a server-side cursor this bounds worker memory
+YIELD_PER = 1000
+# Rows per chunk handed to the WSGI server
+CHUNK_ROWS = 500
+
+
+def export_statement():
+    """One row per loan application joined to its user and KYC record, oldest first."""
+    has_pdf = exists().where(KycPdf.kyc_id == KycRecord.kyc_id)
+    return (
+        db.select(
+            LoanApplication.user_id,
+            func.coalesce(User.email, LoanApplication.email).label("email"),
+            func.coalesce(KycRecord.name, LoanApplication.full_name, User.name).label("name"),
+            LoanApplication.id.label("loan_id"),
+            LoanApplication.amount,
+            LoanApplication.term,
+            LoanApplication.prediction,
+            KycRecord.kyc_id,
+            KycRecord.status.label("kyc_status"),
+            has_pdf.label("has_pdf"),
+            LoanApplication.created_at,
+        )
+        .outerjoin(User, User.id == LoanApplication.user_id)
+        .outerjoin(KycRecord, KycRecord.user_id == LoanApplication.user_id)
+        .order_by(LoanApplication.created_at, LoanApplication.id)
+    )
+
+
+def _record(r) -> dict:
+    amount = r.amount
+    if amount is not None and float(amount).is_integer():
+        amount = int(amount)
+    return {
+        "user_id": r.user_id,
+        "email": r.email or "",
+        "name": r.name or "",
+        "loan_id": r.loan_id,
+        "amount": amount if amount is not None else "",
+        "term": r.term if r.term is not None else "",
+        "prediction": r.prediction or "",
+        "kyc_id": r.kyc_id or "",
+        "kyc_status": r.kyc_status or "",
+        "pdf_url": f"/api/banker/kyc/{r.kyc_id}/pdf" if r.has_pdf and r.kyc_id else "",
+        "created_at": r.created_at.strftime("%Y-%m-%dT%H:%M:%SZ") if r.created_at else "",
+    }
+
+
+def iter_records(stmt):
+    # yield_per streams from a server-side cursor where the driver supports one
+    for r in db.session.execute(stmt.execution_options(yield_per=YIELD_PER)):
+        yield _record(r)
+
+
+def iter_csv(records):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    n = 0
+    for rec in records:
+        writer.writerow(rec)
+        n += 1
+        if n % CHUNK_ROWS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def iter_ndjson(records):
+    lines = []
+    for rec in records:
+        lines.append(json.dumps(rec, separators=(",", ":")))
+        if len(lines) == CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -1,5 +1,7 @@
 import base64
 import hashlib
+import json
+import os
 from datetime import datetime
 from flask import current_app
 
@@ -11,15 +13,36 @@ def generate_kyc_id(name: str, dob_iso: str, gov_id: str) -> str:
     return base64.b32encode(digest)[:12].decode("ascii")
 
 
-def qr_payload(kyc_id: str, pdf_checksum: str) -> dict:
-    return {
+def data_hash(fields: dict, selfie: bytes | str | None = None) -> str:
+    """SHA-256 over the canonical JSON of the printed fields plus the selfie bytes.
+
+    ``selfie`` is the image bytes or a local path to them.
+    """
+    h = hashlib.sha256(json.dumps(fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    if isinstance(selfie, (bytes, bytearray)):
+        h.update(selfie)
+    elif selfie and os.path.exists(selfie):
+        with open(selfie, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def qr_payload(kyc_id: str, pdf_checksum: str, data_hash: str | None = None) -> dict:
+    payload = {
         "kyc_id": kyc_id,
         "issued_at": datetime.utcnow().isoformat() + "Z",
         "pdf_checksum": pdf_checksum,
     }
+    if data_hash:
+        payload["data_hash"] = data_hash
+    return payload
 
 
 def sign_payload(payload: dict) -> str:
     secret = current_app.config.get("SERVER_SIGNING_SECRET", "change-me").encode("utf-8")
-    body = (payload.get("kyc_id", "") + "|" + payload.get("issued_at", "") + "|" + payload.get("pdf_checksum", "")).encode("utf-8")
-    return hashlib.sha256(secret + body).hexdigest()
+    body = payload.get("kyc_id", "") + "|" + payload.get("issued_at", "") + "|" + payload.get("pdf_checksum", "")
+    # Appended only when present so signatures issued before data_hash still verify
+    if payload.get("data_hash"):
+        body += "|" + payload["data_hash"]
+    return hashlib.sha256(secret + body.encode("utf-8")).hexdigest()
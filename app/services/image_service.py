@@ -0,0 +1,57 @@
+import io
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Uploads larger than this are rejected before decoding
+MAX_SELFIE_BYTES = 8 * 1024 * 1024
+# Decoded frames larger than this are refused outright (decompression bombs, panoramas)
+MAX_SELFIE_PIXELS = 40_000_000
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+# The PDF draws the photo in a 170pt box; 720px is ~300 DPI there
+SELFIE_MAX_SIDE = 720
+THUMB_MAX_SIDE = 160
+JPEG_QUALITY = 85
+
+
+class ImageRejected(ValueError):
+    """The upload is not an image we accept; the message is safe to show the user."""
+
+
+def _encode(img: Image.Image, max_side: int, quality: int) -> bytes:
+    img = img.copy()
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def ingest_selfie(source) -> tuple[bytes, bytes]:
+    """Validate a selfie upload and return ``(jpeg_bytes, thumbnail_jpeg_bytes)``.
+
+    ``source`` is raw bytes or a readable binary file. The image is checked,
+    rotated upright per EXIF and downsampled to what the PDF can show.
+    """
+    fp = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    try:
+        with Image.open(fp) as probe:
+            if probe.format not in ALLOWED_FORMATS:
+                raise ImageRejected("Unsupported image format")
+            if probe.width * probe.height > MAX_SELFIE_PIXELS:
+                raise ImageRejected("Image dimensions too large")
+            probe.verify()
+        fp.seek(0)
+        with Image.open(fp) as img:
+            # Decode at a reduced scale where the codec allows (JPEG), then fix orientation
+            img.draft("RGB", (SELFIE_MAX_SIDE, SELFIE_MAX_SIDE))
+            img = ImageOps.exif_transpose(img)
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                # Flatten transparency onto white rather than JPEG's implicit black
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, "white")
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            return _encode(img, SELFIE_MAX_SIDE, JPEG_QUALITY), _encode(img, THUMB_MAX_SIDE, 80)
+    except ImageRejected:
+        raise
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError) as e:
+        raise ImageRejected("Invalid image data") from e
@@ -0,0 +1,80 @@
+import json
+from ..extensions import db
+from ..models import KycPdf, KycRecord
+from . import eligible_queue_service as eligible_queue
+from . import events_service as events
+from . import storage_service as storage
+from .id_service import data_hash, qr_payload, sign_payload
+from .pdf_service import read_printed_fields
+
+# Printed below the database-backed fields; not stored anywhere but the PDF
+EXTRA_FIELDS = (
+    ("Email", "email"), ("Phone", "phone"), ("Address 2", "address2"), ("City", "city"),
+    ("State", "state"), ("Pincode", "pincode"), ("ID Issuer", "id_issuer"), ("ID Expiry", "id_expiry"),
+)
+
+
+def printed_fields(kyc: KycRecord, extra: dict) -> dict:
+    """The ordered label -> value mapping drawn on the KYC document."""
+    extra = {key: (extra.get(key) or "").strip() for _, key in EXTRA_FIELDS}
+    return {
+        "KYC ID": kyc.kyc_id,
+        "Name": kyc.name,
+        "DOB": kyc.dob,
+        "Gov ID Type": kyc.gov_id_type,
+        "Gov ID (last4)": kyc.gov_id_last4,
+        "Email": extra["email"],
+        "Phone": extra["phone"],
+        "Address": kyc.address,
+        "Address 2": extra["address2"],
+        "City": extra["city"],
+        "State": extra["state"],
+        "Pincode": extra["pincode"],
+        "ID Issuer": extra["id_issuer"],
+        "ID Expiry": extra["id_expiry"],
+    }
+
+
+# Field labels in print order
+PRINTED_LABELS = tuple(printed_fields(KycRecord(), {}))
+
+
+def stored_fields(kyc: KycRecord, pdf: KycPdf) -> tuple[dict, str]:
+    """The fields printed on ``pdf``, for re-rendering it, and where they came from.
+
+    Documents stored before ``kyc_pdf.fields`` existed are read back from the
+    PDF text; if that fails only the database-backed fields survive.
+    """
+    if pdf.fields:
+        return dict(pdf.fields), "stored"
+    data = storage.read(pdf.pdf_url)
+    parsed = read_printed_fields(data, PRINTED_LABELS) if data else None
+    if parsed and parsed.get("KYC ID") == kyc.kyc_id:
+        return parsed, "parsed"
+    return printed_fields(kyc, {}), "rebuilt"
+
+
+def sign_fields(kyc_id: str, fields: dict, selfie: bytes | None, dh: str | None = None) -> tuple[str, str, str]:
+    """Return ``(data_hash, signature, qr_text)`` for a document about to be rendered."""
+    # Sign the field data rather than the PDF bytes, so the document renders once
+    dh = dh or data_hash(fields, selfie)
+    payload = qr_payload(kyc_id, "", dh)
+    signature = sign_payload(payload)
+    return dh, signature, json.dumps({"payload": payload, "sig": signature})
+
+
+def add_pdf(kyc_id: str, pdf_bytes: bytes, checksum: str, signature: str, dh: str, fields: dict) -> KycPdf:
+    """Store the rendered file and add its ``KycPdf`` row, nothing else."""
+    # The checksum is the blob's SHA-256, so the bytes aren't hashed twice
+    ref = storage.put(pdf_bytes, "application/pdf", digest=checksum)
+    pdf = KycPdf(kyc_id=kyc_id, pdf_url=ref, pdf_checksum=checksum, qr_payload_hash=signature, data_hash=dh, fields=fields)
+    db.session.add(pdf)
+    return pdf
+
+
+def store_pdf(kyc: KycRecord, pdf_bytes: bytes, checksum: str, signature: str, dh: str, fields: dict) -> KycPdf:
+    """Store a newly finalized document in the caller's transaction and announce it."""
+    pdf = add_pdf(kyc.kyc_id, pdf_bytes, checksum, signature, dh, fields)
+    eligible_queue.refresh_users([kyc.user_id])
+    events.publish("kyc.finalized", {"kyc_id": kyc.kyc_id, "user_id": kyc.user_id, "status": kyc.status})
+    return pdf
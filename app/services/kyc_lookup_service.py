@@ -0,0 +1,217 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import case, func, literal, or_
+from ..extensions import db
+from ..models import KycPdf, KycRecord, LoanApplication, User
+from .id_service import sign_payload
+
+# Entries are per worker; the TTL bounds how stale another worker's copy can get
+CACHE_SIZE = 1024
+CACHE_TTL = 30.0
+# Largest internal id a numeric input can name; anything longer can't be bound as an INTEGER
+MAX_RECORD_ID = 2**63 - 1
+
+
+@dataclass(frozen=True)
+class KycView:
+    """Everything banker lookups need about one KYC record, resolved in one query."""
+    record_id: int
+    kyc_id: str
+    user_id: int
+    name: str
+    dob: str
+    status: str
+    created_at: object
+    verified_at: object
+    email: str
+    phone: str
+    pdf_checksum: str
+    pdf_url: str
+    loan_id: int | None
+    signature: str
+    etag: str
+
+    def to_json(self) -> dict:
+        return {
+            "kyc_id": self.kyc_id,
+            "full_name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "dob": self.dob,
+            "status": self.status,
+            "verified": self.status == "verified",
+            "created_at": self.created_at.isoformat() + "Z" if self.created_at else "",
+            "pdf_checksum": self.pdf_checksum,
+            "verification_signature": self.signature,
+            "loan_id": self.loan_id,
+        }
+
+
+def normalize(raw: str) -> str:
+    return (raw or "").strip().replace(" ", "").replace("-", "").upper()
+
+
+def is_valid(norm_id: str) -> bool:
+    """Whether a normalized input can be looked up at all."""
+    return bool(norm_id) and not (norm_id.isdecimal() and int(norm_id) > MAX_RECORD_ID)
+
+
+def _record_id(norm_id: str) -> int | None:
+    return int(norm_id) if norm_id.isdecimal() and int(norm_id) <= MAX_RECORD_ID else None
+
+
+def _select():
+    latest_pdf = (
+        db.select(func.max(KycPdf.id))
+        .where(KycPdf.kyc_id == KycRecord.kyc_id)
+        .correlate(KycRecord)
+        .scalar_subquery()
+    )
+    latest_loan = (
+        db.select(LoanApplication.id)
+        .where(LoanApplication.user_id == KycRecord.user_id)
+        .order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
+        .limit(1)
+        .correlate(KycRecord)
+        .scalar_subquery()
+    )
+    return (
+        db.select(
+            KycRecord.id, KycRecord.kyc_id, KycRecord.user_id, KycRecord.name, KycRecord.dob,
+            KycRecord.status, KycRecord.created_at, KycRecord.verified_at,
+            User.email, User.phone, KycPdf.pdf_checksum, KycPdf.pdf_url,
+            latest_loan.label("loan_id"),
+        )
+        .outerjoin(User, User.id == KycRecord.user_id)
+        .outerjoin(KycPdf, KycPdf.id == latest_pdf)
+    )
+
+
+def _view(row) -> KycView:
+    checksum = row.pdf_checksum or ""
+    sig = sign_payload({
+        "kyc_id": row.kyc_id,
+        "issued_at": row.verified_at.isoformat() + "Z" if row.verified_at else "",
+        "pdf_checksum": checksum,
+    })
+    # The PDF checksum pins the document; status and loan are the other fields that move
+    tag = hashlib.sha256(f"{checksum}|{row.status}|{row.loan_id}|{row.email}|{row.phone}".encode("utf-8")).hexdigest()
+    return KycView(
+        record_id=row.id, kyc_id=row.kyc_id, user_id=row.user_id, name=row.name, dob=row.dob,
+        status=row.status, created_at=row.created_at, verified_at=row.verified_at,
+        email=row.email or "", phone=row.phone or "", pdf_checksum=checksum,
+        pdf_url=row.pdf_url or "", loan_id=row.loan_id, signature=sig,
+        etag=f"{checksum[:16] or 'nopdf'}-{tag[:16]}",
+    )
+
+
+def lookup_statement(norm_id: str):
+    q = _select()
+    record_id = _record_id(norm_id)
+    if record_id is not None:
+        # A numeric input is an internal id first, a KYC ID only if no such row exists
+        q = q.where(or_(KycRecord.id == record_id, KycRecord.kyc_id == norm_id)).order_by(
+            case((KycRecord.id == record_id, literal(0)), else_=literal(1))
+        )
+    else:
+        q = q.where(KycRecord.kyc_id == norm_id)
+    return q.limit(1)
+
+
+class _LookupCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            if time.monotonic() - hit[0] > CACHE_TTL:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return hit[1]
+
+    def put(self, key, view: KycView):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), view)
+            self._entries.move_to_end(key)
+            while len(self._entries) > CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def drop(self, kyc_id: str | None = None, user_id: int | None = None):
+        with self._lock:
+            stale = [k for k, (_, v) in self._entries.items()
+                     if (kyc_id is not None and v.kyc_id == kyc_id) or (user_id is not None and v.user_id == user_id)]
+            for k in stale:
+                del self._entries[k]
+
+
+_cache = _LookupCache()
+
+
+def resolve(raw: str) -> KycView | None:
+    """Resolve a KYC ID or numeric internal id (as typed by a banker) to a :class:`KycView`."""
+    norm_id = normalize(raw)
+    if not is_valid(norm_id):
+        return None
+    view = _cache.get(norm_id)
+    if view is None:
+        row = db.session.execute(lookup_statement(norm_id)).first()
+        if row is None:
+            return None
+        view = _view(row)
+        # PDFs may be written by the render worker, which can't reach this cache
+        if view.pdf_url:
+            _cache.put(norm_id, view)
+    return view
+
+
+def resolve_many(raws) -> dict:
+    """Resolve many inputs at once: ``{normalized_id: KycView | None}``.
+
+    Cache misses are fetched with a single ``IN (...)`` query; numeric inputs
+    prefer an internal id match over a KYC ID match, as in :func:`resolve`.
+    """
+    out = {}
+    missing = []
+    for raw in raws:
+        norm_id = normalize(raw)
+        if not is_valid(norm_id) or norm_id in out:
+            continue
+        out[norm_id] = _cache.get(norm_id)
+        if out[norm_id] is None:
+            missing.append(norm_id)
+    if not missing:
+        return out
+
+    nums = [i for i in map(_record_id, missing) if i is not None]
+    cond = KycRecord.kyc_id.in_(missing)
+    if nums:
+        cond = or_(cond, KycRecord.id.in_(nums))
+    by_id, by_kyc_id = {}, {}
+    for row in db.session.execute(_select().where(cond)):
+        view = _view(row)
+        by_id[view.record_id] = view
+        by_kyc_id[view.kyc_id] = view
+    for norm_id in missing:
+        view = by_id.get(_record_id(norm_id)) or by_kyc_id.get(norm_id)
+        out[norm_id] = view
+        if view is not None and view.pdf_url:
+            _cache.put(norm_id, view)
+    return out
+
+
+def invalidate(kyc_id: str | None = None, user_id: int | None = None):
+    """Forget cached lookups for a KYC ID or for every KYC of a user.
+
+    Only this worker's cache is cleared. Other workers keep serving their
+    copy until it expires, so they may show a stale view for up to
+    ``CACHE_TTL`` seconds.
+    """
+    _cache.drop(kyc_id=kyc_id, user_id=user_id)
@@ -0,0 +1,214 @@
+import hashlib
+import hmac
+import json
+import tempfile
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from ..extensions import db
+from ..models import KycPdf
+from .id_service import sign_payload
+from .pdf_service import read_embedded_payload
+
+MAX_PDF_BYTES = 10 * 1024 * 1024
+MIN_PDF_BYTES = 1024
+# validate-batch: total upload (zip or all parts together) and file count
+MAX_BATCH_BYTES = 512 * 1024 * 1024
+MAX_BATCH_FILES = 1000
+# Hashing and metadata reads run in this many threads per request
+HASH_WORKERS = 4
+# A progress line is streamed after this many files are inspected
+PROGRESS_EVERY = 25
+# File lines go out once this many consecutive files (in upload order) are inspected, one query per run
+RESOLVE_EVERY = 50
+CHUNK_SIZE = 64 * 1024
+# Payload fields covered by the signature; each must be a string when present
+SIGNED_FIELDS = ("kyc_id", "issued_at", "pdf_checksum", "data_hash")
+
+# ``error`` is set when the file can't be a KYC PDF at all; the other fields are then unreliable
+Inspected = namedtuple("Inspected", "index filename size checksum embedded error")
+
+
+def inspect_pdf(index: int, filename: str, fp, size: int | None = None, checksum: str | None = None) -> Inspected:
+    """Hash a candidate PDF and read its embedded payload.
+
+    ``fp`` must be seekable when ``checksum`` is given (an already-hashed
+    spool file). Otherwise it is read once, hashed and copied to a capped
+    temp file so the payload can be read without keeping it in memory.
+    """
+    spool = None
+    try:
+        if checksum is None:
+            spool = tempfile.TemporaryFile()
+            h = hashlib.sha256()
+            size = 0
+            for block in iter(lambda: fp.read(CHUNK_SIZE), b""):
+                size += len(block)
+                if size > MAX_PDF_BYTES:
+                    return Inspected(index, filename, size, "", None, f"File too large. Maximum size is {MAX_PDF_BYTES // (1024 * 1024)}MB")
+                h.update(block)
+                spool.write(block)
+            checksum = h.hexdigest()
+            fp = spool
+        if size > MAX_PDF_BYTES:
+            return Inspected(index, filename, size, checksum, None, f"File too large. Maximum size is {MAX_PDF_BYTES // (1024 * 1024)}MB")
+        if size < MIN_PDF_BYTES:
+            return Inspected(index, filename, size, checksum, None, "File too small. May be corrupted")
+        fp.seek(0)
+        if fp.read(4) != b"%PDF":
+            return Inspected(index, filename, size, checksum, None, "Invalid PDF format")
+        fp.seek(0)
+        return Inspected(index, filename, size, checksum, read_embedded_payload(fp), None)
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+def _well_formed(embedded: dict) -> bool:
+    """Whether an embedded QR object has the shape :func:`sign_payload` signs; the PDF is untrusted input."""
+    payload = embedded["payload"]
+    return isinstance(embedded["sig"], str) and all(
+        isinstance(payload.get(k, ""), str) for k in SIGNED_FIELDS
+    )
+
+
+def verdict(item: Inspected, pdf: KycPdf | None) -> dict:
+    """The validate-pdf result for one inspected file and the stored document with its checksum."""
+    if item.error:
+        return {"filename": item.filename, "file_size": item.size, "valid": False, "error": item.error,
+                "checksum": item.checksum, "issues": [item.error]}
+    issues = []
+    if not pdf:
+        issues.append("PDF not found in database")
+    extracted_kyc_id = ""
+    signature_valid = None
+    id_matches = True
+    if item.embedded is None:
+        # Documents rendered before the payload was embedded are judged on the checksum alone
+        issues.append("No embedded KYC payload")
+    else:
+        payload = item.embedded["payload"]
+        extracted_kyc_id = str(payload.get("kyc_id") or "")
+        if not _well_formed(item.embedded):
+            signature_valid = False
+            issues.append("Malformed embedded KYC payload")
+        else:
+            signature_valid = hmac.compare_digest(sign_payload(payload).encode(), item.embedded["sig"].encode("utf-8"))
+            if not signature_valid:
+                issues.append("Signature mismatch")
+        id_matches = pdf is None or pdf.kyc_id == extracted_kyc_id
+        if not id_matches:
+            issues.append("Embedded KYC ID does not match the stored document")
+    return {
+        "valid": pdf is not None and signature_valid is not False and id_matches,
+        "filename": item.filename,
+        "file_size": item.size,
+        "document_type": "KYC Document",
+        "extracted_kyc_id": extracted_kyc_id,
+        "signature_valid": signature_valid,
+        "checksum": item.checksum,
+        "checksum_valid": pdf is not None,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "issues": issues,
+    }
+
+
+def stored_pdfs(checksums) -> dict:
+    """checksum -> latest ``KycPdf`` with it, in one ``IN`` query."""
+    checksums = {c for c in checksums if c}
+    if not checksums:
+        return {}
+    rows = db.session.execute(
+        db.select(KycPdf).where(KycPdf.pdf_checksum.in_(checksums)).order_by(KycPdf.id)
+    ).scalars()
+    return {pdf.pdf_checksum: pdf for pdf in rows}
+
+
+def _is_zip(upload) -> bool:
+    if (upload.filename or "").lower().endswith(".zip"):
+        return True
+    upload.seek(0)
+    head = upload.read(4)
+    upload.seek(0)
+    return head == b"PK\x03\x04"
+
+
+def batch_sources(uploads) -> tuple[list, list]:
+    """Expand uploaded files into ``(jobs, archives)``.
+
+    Each job is a ``(filename, source)`` pair, where ``source`` is a spooled
+    upload or a ``(ZipFile, ZipInfo)`` member read straight from the spooled
+    archive.
+    Raises ``ValueError`` on a bad archive or too many files.
+    """
+    jobs, archives = [], []
+    for upload in uploads:
+        if not _is_zip(upload):
+            jobs.append((upload.filename or f"file{len(jobs) + 1}", upload))
+            continue
+        try:
+            zf = zipfile.ZipFile(upload)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"{upload.filename or 'upload'} is not a valid zip archive") from e
+        archives.append(zf)
+        for info in zf.infolist():
+            if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                continue
+            jobs.append((info.filename, (zf, info)))
+    if len(jobs) > MAX_BATCH_FILES:
+        raise ValueError(f"Too many files. Maximum is {MAX_BATCH_FILES}")
+    return jobs, archives
+
+
+def _inspect_job(index: int, name: str, source) -> Inspected:
+    if isinstance(source, tuple):
+        zf, info = source
+        if info.file_size > MAX_PDF_BYTES:
+            # Declared size is checked first; inspect_pdf() still caps what is actually inflated
+            return Inspected(index, name, info.file_size, "", None, f"File too large. Maximum size is {MAX_PDF_BYTES // (1024 * 1024)}MB")
+        with zf.open(info) as member:
+            return inspect_pdf(index, name, member)
+    # A multipart part: already hashed while it was spooled
+    return inspect_pdf(index, name, source, size=source.size, checksum=source.sha256)
+
+
+def _file_lines(chunk: list):
+    pdfs = stored_pdfs(r.checksum for r in chunk if not r.error)
+    for r in chunk:
+        yield {"type": "file", "index": r.index, **verdict(r, pdfs.get(r.checksum))}
+
+
+def iter_batch(jobs):
+    """Inspect ``jobs`` on a bounded thread pool and yield NDJSON lines.
+
+    Progress lines stream while files are hashed. File lines follow in
+    upload order: as soon as the next :data:`RESOLVE_EVERY` files are
+    inspected, their checksums are resolved in one query and their lines
+    are sent, so nothing waits for the slowest file of the whole batch.
+    A ``summary`` closes the stream.
+    """
+    total = len(jobs)
+    yield json.dumps({"type": "started", "files": total}) + "\n"
+    done = {}
+    emitted = valid = 0
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        futures = {pool.submit(_inspect_job, i, name, source): i for i, (name, source) in enumerate(jobs)}
+        for n, fut in enumerate(as_completed(futures), 1):
+            i = futures[fut]
+            try:
+                done[i] = fut.result()
+            except Exception as e:
+                done[i] = Inspected(i, jobs[i][0], 0, "", None, f"Unreadable file: {e}")
+            if n % PROGRESS_EVERY == 0 and n < total:
+                yield json.dumps({"type": "progress", "inspected": n, "files": total}) + "\n"
+            ready = 0
+            while emitted + ready in done:
+                ready += 1
+            if ready >= RESOLVE_EVERY or emitted + ready == total:
+                chunk = [done.pop(j) for j in range(emitted, emitted + ready)]
+                emitted += ready
+                for out in _file_lines(chunk):
+                    valid += bool(out["valid"])
+                    yield json.dumps(out) + "\n"
+    yield json.dumps({"type": "summary", "files": total, "valid": valid, "invalid": total - valid}) + "\n"
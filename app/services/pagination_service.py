@@ -0,0 +1,39 @@
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+# Ids past this can't be bound as a 64-bit INTEGER
+MAX_ROW_ID = 2**63 - 1
+
+
+def parse_limit(raw, default: int = 50, maximum: int = 200) -> int:
+    try:
+        n = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(n, maximum))
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for ``ORDER BY created_at DESC, id DESC`` listings."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, row_id = raw.rsplit("|", 1)
+        created_at, row_id = datetime.fromisoformat(ts), int(row_id)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+    if not 0 <= row_id <= MAX_ROW_ID:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def keyset_before(created_col, id_col, cursor: str):
+    """WHERE clause selecting rows strictly after ``cursor`` in newest-first order."""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(created_col < created_at, and_(created_col == created_at, id_col < row_id))
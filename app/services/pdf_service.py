@@ -1,62 +1,206 @@
 import io
 import os
 import hashlib
+import json
+import threading
+from contextlib import contextmanager
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from flask import current_app
 import qrcode
 from reportlab.lib.utils import ImageReader
 from qrcode.constants import ERROR_CORRECT_H
+from reportlab import rl_config
+from reportlab.pdfbase.pdfdoc import PDFDate, PDFDictionary, PDFInfo, PDFName, PDFString
+import pikepdf
 
+# Renders in this process take turns while rl_config is overridden; see _binary_streams
+_rl_lock = threading.Lock()
 
-def generate_kyc_pdf(kyc_data: dict, qr_text: str, selfie_path: str | None = None) -> tuple[bytes, str]:
-    buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
-    width, height = A4
+# Document-info key holding the signed QR text, so validation can read it without decoding the QR
+PAYLOAD_INFO_KEY = "KycPayload"
+
+
+class _KycInfo(PDFInfo):
+    """ReportLab's document info plus the signed QR payload under ``PAYLOAD_INFO_KEY``.
+
+    ReportLab has no public hook for extra info keys, so :func:`_set_info`
+    swaps this in for the canvas's own ``PDFInfo``. ``format`` mirrors
+    ReportLab 4.0's; tests read the key back so an upgrade that breaks this
+    fails loudly.
+    """
+
+    def __init__(self, qr_text: str):
+        super().__init__()
+        self.qr_text = qr_text
+
+    def format(self, document):
+        D = {
+            "Title": PDFString(self.title),
+            "Author": PDFString(self.author),
+            "Producer": PDFString(self.producer),
+            "Creator": PDFString(self.creator),
+            "Subject": PDFString(self.subject),
+            "Keywords": PDFString(self.keywords),
+            "Trapped": PDFName(self.trapped),
+            PAYLOAD_INFO_KEY: PDFString(self.qr_text),
+        }
+        D["ModDate"] = D["CreationDate"] = PDFDate(ts=document._timeStamp, dateFormatter=self._dateFormatter)
+        return PDFDictionary(D).format(document)
+
+
+def _set_info(c, info: PDFInfo):
+    # The one place that reaches into the canvas's private document
+    doc = getattr(c, "_doc", None)
+    if doc is None or not isinstance(getattr(doc, "info", None), PDFInfo):
+        raise RuntimeError("Unsupported ReportLab version: canvas document info not found")
+    doc.info = info
 
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, height - 50, "KYC Verification Document")
 
-    c.setFont("Helvetica", 11)
-    y = height - 100
-    for k, v in kyc_data.items():
-        c.drawString(50, y, f"{k}: {v}")
-        y -= 18
+@contextmanager
+def _binary_streams():
+    """Have ReportLab write binary rather than ASCII85 streams inside the block.
 
-    # Optional selfie in top-right
-    if selfie_path and os.path.exists(selfie_path):
+    The pure-Python ASCII85 encoder dominated render time, and binary streams
+    are 20% smaller. ReportLab has no per-canvas switch: it reads the global
+    ``rl_config.useA85`` whenever it encodes a stream (images in ``drawImage``,
+    page content in ``showPage``/``save``), so the whole render runs with the
+    global flipped and restored, under a lock.
+    """
+    with _rl_lock:
+        saved, rl_config.useA85 = rl_config.useA85, 0
         try:
-            print(f"PDF service: Adding selfie from path: {selfie_path}")
-            selfie_reader = ImageReader(selfie_path)
-            c.drawImage(selfie_reader, width - 220, height - 260, 170, 170, preserveAspectRatio=True, mask='auto')
-            c.setFont("Helvetica", 9)
-            c.drawString(width - 220, height - 270, "Photo")
-        except Exception as e:
-            print(f"PDF service: Error adding selfie: {e}")
-            pass
-    else:
-        if selfie_path:
-            print(f"PDF service: Selfie path provided but file not found: {selfie_path}")
-        else:
-            print("PDF service: No selfie path provided")
-
-    qr = qrcode.QRCode(
-        version=None,
-        error_correction=ERROR_CORRECT_H,
-        box_size=8,
-        border=2,
-    )
-    qr.add_data(qr_text)
+            yield
+        finally:
+            rl_config.useA85 = saved
+
+
+def read_embedded_payload(source) -> dict | None:
+    """The ``{"payload", "sig"}`` QR object embedded in a KYC PDF, or ``None``.
+
+    ``source`` is a path or seekable binary file. Only the trailer and the
+    info dictionary are parsed; no page content is read.
+    """
+    try:
+        with pikepdf.open(source) as pdf:
+            raw = pdf.trailer.get("/Info", {}).get("/" + PAYLOAD_INFO_KEY)
+            text = str(raw) if raw is not None else ""
+    except (pikepdf.PdfError, OSError, ValueError):
+        return None
+    try:
+        obj = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict) or not isinstance(obj.get("payload"), dict) or not obj.get("sig"):
+        return None
+    return obj
+
+
+def read_printed_fields(pdf_bytes: bytes, labels) -> dict | None:
+    """Recover the ``label -> value`` mapping drawn by :func:`generate_kyc_pdf` from its first page.
+
+    Labels missing from the page come back empty; returns ``None`` if the
+    PDF can't be parsed or none of ``labels`` appear.
+    """
+    found = {}
+    try:
+        with pikepdf.open(io.BytesIO(pdf_bytes)) as pdf:
+            for operands, operator in pikepdf.parse_content_stream(pdf.pages[0]):
+                if str(operator) != "Tj" or not operands:
+                    continue
+                label, sep, value = str(operands[0]).partition(": ")
+                if sep and label in labels and label not in found:
+                    found[label] = value
+    except (pikepdf.PdfError, IndexError, ValueError):
+        return None
+    if not found:
+        return None
+    return {label: found.get(label, "") for label in labels}
+
+
+def qr_matrix(text: str) -> list:
+    """QR modules (quiet zone included) for ``text``, one row of booleans per line."""
+    qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECT_H, border=2)
+    qr.add_data(text)
     qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    img_buf = io.BytesIO()
-    img.save(img_buf, format="PNG")
-    img_buf.seek(0)
-    qr_image = ImageReader(img_buf)
-    c.drawImage(qr_image, width - 220, 50, 170, 170, mask='auto')
-
-    c.showPage()
-    c.save()
+    return qr.get_matrix()
+
+
+def draw_qr(c, text: str, x: float, y: float, size: float):
+    """Draw the QR as one filled vector path, one rectangle per horizontal run of dark modules.
+
+    Scales without blur and skips the PNG encode/decode an image XObject needs.
+    """
+    matrix = qr_matrix(text)
+    cell = size / len(matrix)
+    path = c.beginPath()
+    for r, row in enumerate(matrix):
+        top = y + size - (r + 1) * cell
+        col = 0
+        n = len(row)
+        while col < n:
+            if not row[col]:
+                col += 1
+                continue
+            start = col
+            while col < n and row[col]:
+                col += 1
+            path.rect(x + start * cell, top, (col - start) * cell, cell)
+    c.saveState()
+    c.setFillColorRGB(1, 1, 1)
+    c.rect(x, y, size, size, stroke=0, fill=1)
+    c.setFillColorRGB(0, 0, 0)
+    c.drawPath(path, stroke=0, fill=1)
+    c.restoreState()
+
+
+def generate_kyc_pdf(kyc_data: dict, qr_text: str, selfie: bytes | str | None = None) -> tuple[bytes, str]:
+    """Render the KYC document in a single pass.
+
+    ``selfie`` is the photo as bytes or a local path.
+
+    The QR carries a signature over the field data (see
+    ``id_service.data_hash``), not over these bytes, so nothing here depends
+    on the output checksum and one render is enough.
+    """
+    buf = io.BytesIO()
+    with _binary_streams():
+        c = canvas.Canvas(buf, pagesize=A4)
+        width, height = A4
+        _set_info(c, _KycInfo(qr_text))
+        c.setTitle("KYC Verification Document")
+
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(50, height - 50, "KYC Verification Document")
+
+        c.setFont("Helvetica", 11)
+        y = height - 100
+        for k, v in kyc_data.items():
+            c.drawString(50, y, f"{k}: {v}")
+            y -= 18
+
+        # Optional selfie in top-right
+        is_bytes = isinstance(selfie, (bytes, bytearray))
+        if is_bytes or (selfie and os.path.exists(selfie)):
+            try:
+                print(f"PDF service: Adding selfie ({len(selfie)} bytes)" if is_bytes else f"PDF service: Adding selfie from path: {selfie}")
+                selfie_reader = ImageReader(io.BytesIO(selfie) if is_bytes else selfie)
+                c.drawImage(selfie_reader, width - 220, height - 260, 170, 170, preserveAspectRatio=True, mask='auto')
+                c.setFont("Helvetica", 9)
+                c.drawString(width - 220, height - 270, "Photo")
+            except Exception as e:
+                print(f"PDF service: Error adding selfie: {e}")
+                pass
+        else:
+            if selfie:
+                print(f"PDF service: Selfie path provided but file not found: {selfie}")
+            else:
+                print("PDF service: No selfie path provided")
+
+        draw_qr(c, qr_text, width - 220, 50, 170)
+
+        c.showPage()
+        c.save()
 
     pdf_bytes = buf.getvalue()
     checksum = hashlib.sha256(pdf_bytes).hexdigest()
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from flask import current_app
+
+
+DEFAULT_POLICY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "policies", "eligibility.json")
+# How often (seconds) a worker stats the policy file for changes
+RELOAD_INTERVAL = 2.0
+
+
+@dataclass(frozen=True)
+class Bands:
+    """Lower-inclusive bands: values below the first edge get ``base``."""
+    edges: np.ndarray
+    boosts: np.ndarray
+
+    @classmethod
+    def compile(cls, spec: dict) -> "Bands":
+        bands = sorted(spec.get("bands") or [], key=lambda b: b["from"])
+        edges = [float(b["from"]) for b in bands]
+        boosts = [float(spec.get("base_boost") or 0.0)] + [float(b["boost"]) for b in bands]
+        return cls(np.array(edges, dtype=np.float64), np.array(boosts, dtype=np.float64))
+
+    def lookup_many(self, values: np.ndarray) -> np.ndarray:
+        return self.boosts[np.searchsorted(self.edges, values, side="right")]
+
+
+@dataclass(frozen=True)
+class Policy:
+    version: str
+    annual_rate: float
+    min_age: int
+    max_age: int
+    age: Bands
+    credit: Bands
+    employment: dict
+    residence: dict
+
+
+def compile_policy(raw: bytes) -> Policy:
+    spec = json.loads(raw)
+    version = str(spec.get("version") or hashlib.sha256(raw).hexdigest()[:12])
+    return Policy(
+        version=version,
+        annual_rate=float(spec["annual_rate"]),
+        min_age=int(spec["min_age"]),
+        max_age=int(spec["max_age"]),
+        age=Bands.compile(spec.get("age") or {}),
+        credit=Bands.compile(spec.get("credit_score") or {}),
+        employment={str(k).lower(): float(v) for k, v in (spec.get("employment_type") or {}).items()},
+        residence={str(k).lower(): float(v) for k, v in (spec.get("residence_type") or {}).items()},
+    )
+
+
+class _PolicyCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = None
+        self._mtime = None
+        self._checked = 0.0
+        self._policy = None
+
+    def get(self, path: str) -> Policy:
+        now = time.monotonic()
+        if self._policy is not None and path == self._path and now - self._checked < RELOAD_INTERVAL:
+            return self._policy
+        with self._lock:
+            self._checked = now
+            mtime = os.stat(path).st_mtime_ns
+            if self._policy is None or path != self._path or mtime != self._mtime:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                try:
+                    policy = compile_policy(raw)
+                except (KeyError, TypeError, ValueError) as e:
+                    if self._policy is None or path != self._path:
+                        raise
+                    # Keep serving the last good policy if an edit is broken
+                    current_app.logger.warning("Policy service: failed to reload %s, keeping version %s: %s",
+                                               path, self._policy.version, e)
+                    self._mtime = mtime
+                    return self._policy
+                self._policy, self._path, self._mtime = policy, path, mtime
+            return self._policy
+
+
+_cache = _PolicyCache()
+
+
+def get_policy() -> Policy:
+    path = current_app.config.get("ELIGIBILITY_POLICY_PATH") or DEFAULT_POLICY_PATH
+    return _cache.get(path)
@@ -0,0 +1,180 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models import KycPdf, KycRecord, KycRenderJob
+from . import kyc_document_service as documents
+from . import storage_service as storage
+
+# A running job whose worker hasn't finished by then is assumed dead and retried
+LEASE = timedelta(minutes=2)
+MAX_ATTEMPTS = 5
+# Delay before retry n is RETRY_BACKOFF * 2 ** (n - 1)
+RETRY_BACKOFF = timedelta(seconds=5)
+
+# ``worker`` and ``attempt`` identify the lease; complete() and fail() only act while it is still held
+RenderTask = namedtuple("RenderTask", "job_id fields qr_text selfie signature data_hash worker attempt")
+
+
+def _leased(task: "RenderTask"):
+    """The job is still running under the lease ``task`` was claimed with."""
+    return and_(KycRenderJob.id == task.job_id, KycRenderJob.status == "running",
+                KycRenderJob.worker == task.worker, KycRenderJob.attempts == task.attempt)
+
+
+def _latest_pdf_id(kyc_id: str):
+    return db.session.execute(db.select(func.max(KycPdf.id)).where(KycPdf.kyc_id == kyc_id)).scalar()
+
+
+def _pending_after(job: KycRenderJob) -> bool:
+    """Whether a later submission for the same KYC record is still waiting to render."""
+    return db.session.execute(
+        db.select(KycRenderJob.id)
+        .where(KycRenderJob.kyc_record_id == job.kyc_record_id, KycRenderJob.id > job.id,
+               KycRenderJob.status.in_(("queued", "running")))
+        .limit(1)
+    ).first() is not None
+
+
+def enqueue(kyc: KycRecord, fields: dict, dh: str) -> KycRenderJob:
+    """Queue a render, or return the job already covering this exact document.
+
+    Commits. Job ids follow submission order: a resubmission that can't reuse
+    its old row replaces it, and queued jobs for older data are superseded.
+    """
+    job = db.session.execute(db.select(KycRenderJob).filter_by(kyc_record_id=kyc.id, data_hash=dh)).scalar_one_or_none()
+    if job is not None:
+        pending = job.status in ("queued", "running")
+        current = (job.status == "done" and job.pdf_id is not None and job.pdf_id == _latest_pdf_id(kyc.kyc_id)
+                   and not _pending_after(job))
+        if pending or current:
+            return job
+        db.session.delete(job)
+        db.session.flush()
+    job = KycRenderJob(kyc_record_id=kyc.id, kyc_id=kyc.kyc_id, data_hash=dh, fields=fields, status="queued", attempts=0)
+    db.session.add(job)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Lost a race with an identical submission
+        db.session.rollback()
+        return db.session.execute(db.select(KycRenderJob).filter_by(kyc_record_id=kyc.id, data_hash=dh)).scalar_one()
+    db.session.execute(
+        update(KycRenderJob)
+        .where(KycRenderJob.kyc_record_id == kyc.id, KycRenderJob.id != job.id, KycRenderJob.status == "queued")
+        .values(status="superseded", updated_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return job
+
+
+def runnable(now):
+    """Jobs a worker may take at ``now``: queued past their backoff, or running past their lease."""
+    return or_(
+        and_(KycRenderJob.status == "queued", or_(KycRenderJob.lease_until.is_(None), KycRenderJob.lease_until <= now)),
+        and_(KycRenderJob.status == "running", KycRenderJob.lease_until <= now),
+    )
+
+
+def claim(worker: str, limit: int) -> list:
+    """Lease up to ``limit`` runnable jobs to ``worker`` and return their :class:`RenderTask`."""
+    now = datetime.utcnow()
+    # Jobs whose workers died too often are given up on
+    db.session.execute(
+        update(KycRenderJob)
+        .where(runnable(now), KycRenderJob.attempts >= MAX_ATTEMPTS)
+        .values(status="failed", lease_until=None, updated_at=now)
+    )
+    ids = db.session.execute(
+        db.select(KycRenderJob.id).where(runnable(now)).order_by(KycRenderJob.id).limit(limit)
+    ).scalars().all()
+    tasks = []
+    for job_id in ids:
+        # Conditional update: only one worker wins each job
+        won = db.session.execute(
+            update(KycRenderJob)
+            .where(KycRenderJob.id == job_id, runnable(now))
+            .values(status="running", attempts=KycRenderJob.attempts + 1, lease_until=now + LEASE,
+                    worker=worker, updated_at=now)
+        ).rowcount
+        if not won:
+            continue
+        job = db.session.get(KycRenderJob, job_id)
+        kyc = db.session.get(KycRecord, job.kyc_record_id)
+        if kyc is None or kyc.kyc_id != job.kyc_id:
+            job.status, job.error = "superseded", "KYC record changed before render"
+            continue
+        # Read here so render processes don't need storage credentials
+        selfie = storage.read(kyc.selfie_ref)
+        dh, signature, qr_text = documents.sign_fields(job.kyc_id, job.fields, selfie, job.data_hash)
+        tasks.append(RenderTask(job.id, job.fields, qr_text, selfie, signature, dh, worker, job.attempts))
+    db.session.commit()
+    return tasks
+
+
+def complete(task: RenderTask, pdf_bytes: bytes, checksum: str) -> KycRenderJob:
+    """Store a finished render if ``task`` still holds the job's lease.
+
+    A worker whose lease expired (and was taken over) gets a no-op, so a job
+    never adds a second PDF row.
+    """
+    now = datetime.utcnow()
+    # Conditional update: taking the job out of "running" is what makes this worker the one that stores it
+    owned = db.session.execute(
+        update(KycRenderJob).where(_leased(task)).values(status="done", lease_until=None, updated_at=now)
+    ).rowcount
+    if not owned:
+        db.session.rollback()
+        return db.session.get(KycRenderJob, task.job_id)
+    job = db.session.get(KycRenderJob, task.job_id)
+    newer = db.session.execute(
+        db.select(KycRenderJob.id)
+        .where(KycRenderJob.kyc_record_id == job.kyc_record_id, KycRenderJob.id > job.id,
+               KycRenderJob.status != "superseded")
+        .limit(1)
+    ).first()
+    kyc = db.session.get(KycRecord, job.kyc_record_id)
+    if newer is not None or kyc is None or kyc.kyc_id != job.kyc_id:
+        # A later finalize owns the record now; don't let this older document become "latest"
+        job.status = "superseded"
+        db.session.commit()
+        return job
+    pdf = documents.store_pdf(kyc, pdf_bytes, checksum, task.signature, task.data_hash, task.fields)
+    db.session.flush()
+    job.pdf_id, job.error = pdf.id, None
+    db.session.commit()
+    return job
+
+
+def fail(task: RenderTask, error: str):
+    """Record a failed attempt; requeue with backoff until ``MAX_ATTEMPTS``.
+
+    A no-op once the lease has passed to another worker.
+    """
+    db.session.rollback()
+    now = datetime.utcnow()
+    if task.attempt >= MAX_ATTEMPTS:
+        values = {"status": "failed", "lease_until": None}
+    else:
+        values = {"status": "queued", "lease_until": now + RETRY_BACKOFF * 2 ** (task.attempt - 1)}
+    db.session.execute(
+        update(KycRenderJob).where(_leased(task)).values(error=error[:2000], updated_at=now, **values)
+    )
+    db.session.commit()
+
+
+def to_json(job: KycRenderJob) -> dict:
+    out = {
+        "job_id": job.id,
+        "kyc_id": job.kyc_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() + "Z" if job.created_at else "",
+        "updated_at": job.updated_at.isoformat() + "Z" if job.updated_at else "",
+    }
+    if job.status == "failed":
+        out["error"] = job.error or "unknown"
+    if job.status == "done":
+        out["pdf_url"] = "/api/kyc/me/pdf"
+    return out
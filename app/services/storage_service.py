@@ -0,0 +1,292 @@
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+from flask import Response, current_app, request, send_file
+
+# Stored references look like "sha256:<hex>"; anything else is a legacy absolute path
+REF_PREFIX = "sha256:"
+CHUNK_SIZE = 64 * 1024
+# S3 error codes meaning "no such object"
+_MISSING = ("NoSuchKey", "NoSuchObject", "ResourceNotFound")
+# Leading bytes of the formats we store; WebP (RIFF....WEBP) is checked separately
+_MAGIC = ((b"\x89PNG", "image/png"), (b"\xff\xd8", "image/jpeg"), (b"%PDF-", "application/pdf"))
+
+
+def make_ref(digest: str) -> str:
+    return REF_PREFIX + digest
+
+
+def digest_of(ref: str) -> str | None:
+    """The blob digest of a content-addressed ref, or ``None`` for a legacy path."""
+    if ref and ref.startswith(REF_PREFIX):
+        return ref[len(REF_PREFIX):]
+    return None
+
+
+def sniff_content_type(head: bytes, name: str = "", default: str = "application/octet-stream") -> str:
+    """MIME type of a blob from its first 12 bytes, falling back to ``name``'s extension."""
+    for magic, content_type in _MAGIC:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return mimetypes.guess_type(name)[0] or default
+
+
+def shard(digest: str) -> str:
+    # Two levels of 256 fan-out keep any one directory small
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+class LocalStorage:
+    """Blobs under ``root/ab/cd/<sha256>`` on the local filesystem."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def local_path(self, digest: str) -> str:
+        return os.path.join(self.root, *shard(digest).split("/"))
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.local_path(digest))
+
+    def put(self, digest: str, fp, size: int, content_type: str):
+        path = self.local_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".blob-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for block in iter(lambda: fp.read(CHUNK_SIZE), b""):
+                    f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+            # Same content, same name: a concurrent writer of this blob is harmless
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def open(self, digest: str):
+        return open(self.local_path(digest), "rb")
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self.local_path(digest))
+
+
+class _ObjectReader(io.RawIOBase):
+    """Seekable file-like view of an S3 object.
+
+    Nothing is fetched until the first read; a seek drops the current GET and
+    the next read starts a ranged one, so serving a byte range never
+    downloads the bytes before it.
+    """
+
+    def __init__(self, client, bucket: str, key: str, size: int):
+        self._client, self._bucket, self._key, self._size = client, bucket, key, size
+        self._pos = 0
+        self._resp = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        pos = {io.SEEK_SET: offset, io.SEEK_CUR: self._pos + offset, io.SEEK_END: self._size + offset}[whence]
+        if pos != self._pos:
+            self._release()
+            self._pos = pos
+        return pos
+
+    def readinto(self, b):
+        if self._pos >= self._size:
+            return 0
+        if self._resp is None:
+            self._resp = self._client.get_object(self._bucket, self._key, offset=self._pos)
+        data = self._resp.read(len(b))
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def _release(self):
+        if self._resp is not None:
+            self._resp.close()
+            self._resp.release_conn()
+            self._resp = None
+
+    def close(self):
+        self._release()
+        super().close()
+
+
+class S3Storage:
+    """Blobs as ``<prefix>/ab/cd/<sha256>`` objects in an S3-compatible bucket (MinIO, AWS, ...)."""
+
+    def __init__(self, client, bucket: str, prefix: str = "blobs"):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _key(self, digest: str) -> str:
+        return f"{self.prefix}/{shard(digest)}" if self.prefix else shard(digest)
+
+    def local_path(self, digest: str):
+        return None
+
+    def exists(self, digest: str) -> bool:
+        from minio.error import S3Error
+        try:
+            self.client.stat_object(self.bucket, self._key(digest))
+            return True
+        except S3Error as e:
+            if e.code in _MISSING:
+                return False
+            raise
+
+    def put(self, digest: str, fp, size: int, content_type: str):
+        self.client.put_object(self.bucket, self._key(digest), fp, size, content_type=content_type)
+
+    def open(self, digest: str):
+        from minio.error import S3Error
+        key = self._key(digest)
+        try:
+            size = self.client.stat_object(self.bucket, key).size
+        except S3Error as e:
+            if e.code in _MISSING:
+                raise FileNotFoundError(key) from e
+            raise
+        return io.BufferedReader(_ObjectReader(self.client, self.bucket, key, size), CHUNK_SIZE)
+
+    def size(self, digest: str) -> int:
+        return self.client.stat_object(self.bucket, self._key(digest)).size
+
+
+def _create(app):
+    backend = app.config.get("STORAGE_BACKEND", "local")
+    if backend == "s3":
+        try:
+            from minio import Minio
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the 'minio' package") from e
+        client = Minio(
+            app.config["S3_ENDPOINT"],
+            access_key=app.config.get("S3_ACCESS_KEY") or None,
+            secret_key=app.config.get("S3_SECRET_KEY") or None,
+            secure=app.config.get("S3_SECURE", True),
+            region=app.config.get("S3_REGION") or None,
+        )
+        bucket = app.config.get("S3_BUCKET", "dhansetu")
+        if not client.bucket_exists(bucket):
+            client.make_bucket(bucket)
+        return S3Storage(client, bucket, app.config.get("S3_PREFIX", "blobs"))
+    if backend != "local":
+        raise RuntimeError(f"Unknown STORAGE_BACKEND {backend!r}")
+    return LocalStorage(os.path.join(app.config.get("STORAGE_DIR", "storage"), "blobs"))
+
+
+def get_storage(app=None):
+    """The configured driver, created once per app."""
+    app = app or current_app._get_current_object()
+    store = app.extensions.get("storage")
+    if store is None:
+        store = app.extensions["storage"] = _create(app)
+    return store
+
+
+def put(source, content_type: str = "application/octet-stream", digest: str | None = None) -> str:
+    """Store ``source`` (bytes or a seekable binary file) and return its ``sha256:`` ref.
+
+    Identical content is stored once. Pass ``digest`` when the SHA-256 is
+    already known (e.g. a PDF checksum) to skip re-hashing.
+    """
+    fp = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    fp.seek(0)
+    if digest is None:
+        h = hashlib.sha256()
+        for block in iter(lambda: fp.read(CHUNK_SIZE), b""):
+            h.update(block)
+        digest = h.hexdigest()
+    size = fp.seek(0, os.SEEK_END)
+    fp.seek(0)
+    store = get_storage()
+    if not store.exists(digest):
+        store.put(digest, fp, size, content_type)
+    return make_ref(digest)
+
+
+def open_ref(ref: str):
+    """Open a stored blob (or a legacy path) for streaming reads."""
+    digest = digest_of(ref)
+    if digest is None:
+        return open(ref, "rb")
+    return get_storage().open(digest)
+
+
+def read(ref: str | None) -> bytes | None:
+    """Whole blob contents, or ``None`` if ``ref`` is empty or missing."""
+    if not ref:
+        return None
+    try:
+        with open_ref(ref) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def local_path(ref: str) -> str | None:
+    """A filesystem path for ``ref`` when the driver has one."""
+    digest = digest_of(ref)
+    if digest is None:
+        return os.path.abspath(ref)
+    return get_storage().local_path(digest)
+
+
+def send(ref: str, download_name: str, mimetype: str = "application/pdf", etag: str | None = None):
+    """Serve a stored blob as a private, revalidated download.
+
+    ``etag`` (the blob checksum) is sent as a strong ETag; a matching
+    ``If-None-Match`` gets a 304 before storage is touched, and ``Range``
+    requests are honored. With ``BLOB_OFFLOAD`` set to ``x-accel-redirect``
+    or ``x-sendfile`` the front proxy sends the bytes and the worker only
+    authorizes the request.
+    """
+    if etag and request.if_none_match.contains(etag):
+        rv = Response(status=304)
+    else:
+        digest = digest_of(ref)
+        path = local_path(ref)
+        offload = current_app.config.get("BLOB_OFFLOAD", "")
+        if offload == "x-accel-redirect" and digest is not None:
+            # nginx maps the internal location onto the blob root (or bucket) and handles Range itself
+            rv = Response(mimetype=mimetype)
+            rv.headers["X-Accel-Redirect"] = current_app.config.get("BLOB_ACCEL_PREFIX", "/_blobs/").rstrip("/") + "/" + shard(digest)
+            rv.headers.set("Content-Disposition", "attachment", filename=download_name)
+        elif offload == "x-sendfile" and path:
+            rv = Response(mimetype=mimetype)
+            rv.headers["X-Sendfile"] = path
+            rv.headers.set("Content-Disposition", "attachment", filename=download_name)
+        elif path:
+            rv = send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name,
+                           etag=etag or False, conditional=True)
+        else:
+            f = open_ref(ref)
+            size = f.seek(0, io.SEEK_END)
+            f.seek(0)
+            rv = send_file(f, mimetype=mimetype, as_attachment=True, download_name=download_name,
+                           etag=etag or False, conditional=False)
+            rv.content_length = size
+            rv.make_conditional(request, accept_ranges=True, complete_length=size)
+    if etag:
+        rv.set_etag(etag)
+    # Per-user documents: browsers may keep a copy but must revalidate, shared caches must not store
+    rv.headers["Cache-Control"] = "private, no-cache"
+    return rv
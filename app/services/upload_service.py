@@ -0,0 +1,91 @@
+import hashlib
+import tempfile
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.formparser import parse_form_data
+
+CHUNK_SIZE = 64 * 1024
+# Room for multipart boundaries and part headers on top of the file cap
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class HashingTempFile:
+    """Temp file that hashes and counts bytes as they are written, refusing to grow past ``limit``.
+
+    With ``magic``, the first bytes must match it or the write raises
+    ``UnsupportedMediaType`` as soon as they arrive.
+    """
+
+    def __init__(self, limit: int, dir: str | None = None, magic: bytes | None = None):
+        self.limit = limit
+        self.size = 0
+        self.magic = magic
+        # Set by receive_multipart from the part headers
+        self.filename = None
+        self._head = b""
+        self._sha = hashlib.sha256()
+        self._file = tempfile.TemporaryFile(dir=dir)
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise RequestEntityTooLarge()
+        if self.magic and len(self._head) < len(self.magic):
+            self._head += data[:len(self.magic) - len(self._head)]
+            if self.magic[:len(self._head)] != self._head:
+                raise UnsupportedMediaType()
+        self._sha.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._sha.hexdigest()
+
+    def __getattr__(self, name):
+        # read/seek/tell/close/flush go to the underlying file
+        return getattr(self._file, name)
+
+
+def receive_raw(stream, limit: int, content_length: int | None = None) -> HashingTempFile:
+    """Copy a raw request body to a temp file in chunks; nothing larger than ``CHUNK_SIZE`` is held in memory."""
+    if content_length is not None and content_length > limit:
+        raise RequestEntityTooLarge()
+    out = HashingTempFile(limit)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        out.write(chunk)
+    out.seek(0)
+    return out
+
+
+def _parse_files(environ, limit: int, magic: bytes | None):
+    def factory(total_content_length, content_type, filename, content_length=None):
+        return HashingTempFile(limit, magic=magic)
+
+    _, _, files = parse_form_data(environ, stream_factory=factory, max_content_length=limit + MULTIPART_OVERHEAD)
+    return files
+
+
+def _spooled(upload) -> HashingTempFile:
+    upload.stream.seek(0)
+    upload.stream.filename = upload.filename
+    return upload.stream
+
+
+def receive_multipart(environ, field: str, limit: int, magic: bytes | None = None) -> HashingTempFile | None:
+    """Parse a multipart body, spooling ``field`` straight into a :class:`HashingTempFile`.
+
+    Returns ``None`` if the form has no such file field.
+    """
+    upload = _parse_files(environ, limit, magic).get(field)
+    return _spooled(upload) if upload is not None else None
+
+
+def receive_multipart_files(environ, limit: int) -> list:
+    """Every file part of a multipart body, in order, each spooled into a :class:`HashingTempFile`.
+
+    ``limit`` caps each part and, with a little overhead, the whole body.
+    """
+    return [_spooled(upload) for _, upload in _parse_files(environ, limit, None).items(multi=True)]
+
@@ -126,6 +126,21 @@ document.addEventListener('DOMContentLoaded', ()=>{
       e.preventDefault();
       const data = serializeForm(kycForm);
       const r = await postJSON((window.KYCUI||{}).finalize || '/api/kyc/finalize', data);
+      if(r.status === 202){
+        // Queued render: poll the job until the PDF is ready
+        show(kycResult, `KYC submitted. ID: <b>${r.data.kyc_id}</b><br/>Generating your PDF...`);
+        let job = r.data;
+        while(job.status === 'queued' || job.status === 'running'){
+          await new Promise(res=>setTimeout(res, 1500));
+          const jr = await fetch(r.data.status_url, {credentials:'include'});
+          if(!jr.ok) break;
+          job = await jr.json();
+        }
+        if(job.status !== 'done'){
+          show(kycResult, `KYC submitted, but the PDF could not be generated (${job.error||job.status}). Please retry.`, true);
+          return;
+        }
+      }
       if(r.ok){
         const pdfUrl = (window.KYCUI||{}).myPdf || '/api/kyc/me/pdf';
         show(kycResult, `KYC finalized. ID: <b>${r.data.kyc_id}</b><br/><a href="${pdfUrl}" target="_blank">Download PDF</a>`);
@@ -0,0 +1,113 @@
+"""Time the PDF part of KYC finalize: the old two-pass render vs the single pass.
+
+Run from the repository root::
+
+    python -m bench.kyc_pdf --iterations 20
+
+The old renderer lives here rather than in the app, so nothing in production
+can call it.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import click
+import qrcode
+from PIL import Image
+from qrcode.constants import ERROR_CORRECT_H
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from app import create_app
+from app.services.id_service import data_hash, qr_payload, sign_payload
+from app.services.pdf_service import generate_kyc_pdf
+
+SAMPLE_FIELDS = {
+    "KYC ID": "BENCH0000001", "Name": "Asha Rao", "DOB": "1990-01-01", "Gov ID Type": "generic",
+    "Gov ID (last4)": "1234", "Email": "asha@example.com", "Phone": "9000000000",
+    "Address": "1 Main St", "Address 2": "", "City": "Pune", "State": "MH", "Pincode": "411001",
+    "ID Issuer": "", "ID Expiry": "",
+}
+
+
+def baseline_kyc_pdf(kyc_data: dict, qr_text: str, selfie_path: str) -> tuple[bytes, str]:
+    """The renderer KYC finalize used before the single pass: QR as a PNG image, ASCII85 streams."""
+    use_a85, rl_config.useA85 = rl_config.useA85, 1
+    try:
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=A4)
+        width, height = A4
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(50, height - 50, "KYC Verification Document")
+        c.setFont("Helvetica", 11)
+        y = height - 100
+        for k, v in kyc_data.items():
+            c.drawString(50, y, f"{k}: {v}")
+            y -= 18
+        c.drawImage(ImageReader(selfie_path), width - 220, height - 260, 170, 170, preserveAspectRatio=True, mask='auto')
+        c.setFont("Helvetica", 9)
+        c.drawString(width - 220, height - 270, "Photo")
+        qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECT_H, box_size=8, border=2)
+        qr.add_data(qr_text)
+        qr.make(fit=True)
+        img_buf = io.BytesIO()
+        qr.make_image(fill_color="black", back_color="white").save(img_buf, format="PNG")
+        img_buf.seek(0)
+        c.drawImage(ImageReader(img_buf), width - 220, 50, 170, 170, mask='auto')
+        c.showPage()
+        c.save()
+    finally:
+        rl_config.useA85 = use_a85
+    pdf_bytes = buf.getvalue()
+    return pdf_bytes, hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _timed(fn, iterations: int) -> list:
+    out = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return sorted(out)
+
+
+@click.command()
+@click.option("--iterations", default=20, show_default=True, help="Renders timed per variant.")
+@click.option("--selfie", "selfie_path", default=None, help="Selfie image to embed (default: a generated 640x640 JPEG).")
+def main(iterations, selfie_path):
+    fields = SAMPLE_FIELDS
+    # Signing reads the app's secret key
+    with create_app().app_context(), tempfile.TemporaryDirectory() as tmp:
+        if not selfie_path:
+            selfie_path = os.path.join(tmp, "selfie.jpg")
+            Image.effect_noise((640, 640), 64).convert("RGB").save(selfie_path, "JPEG", quality=85)
+
+        def two_pass():
+            # What finalize did before: a provisional render for a checksum, then the real one
+            payload = qr_payload(fields["KYC ID"], "")
+            payload["pdf_checksum"] = baseline_kyc_pdf(fields, json.dumps({"note": "provisional"}), selfie_path)[1]
+            qr_text = json.dumps({"payload": payload, "sig": sign_payload(payload)})
+            baseline_kyc_pdf(fields, qr_text, selfie_path)
+
+        def single_pass():
+            payload = qr_payload(fields["KYC ID"], "", data_hash(fields, selfie_path))
+            qr_text = json.dumps({"payload": payload, "sig": sign_payload(payload)})
+            generate_kyc_pdf(fields, qr_text, selfie=selfie_path)
+
+        two_pass()  # warm imports and fonts
+        single_pass()
+        results = [("two-pass", _timed(two_pass, iterations)), ("single-pass", _timed(single_pass, iterations))]
+
+    for label, ms in results:
+        click.echo(f"{label:12} p50 {ms[len(ms)//2]:8.1f} ms   mean {sum(ms)/len(ms):8.1f} ms   max {ms[-1]:8.1f} ms")
+    before, after = results[0][1][iterations//2], results[1][1][iterations//2]
+    click.echo(f"speedup      {before/after:.2f}x at p50")
+
+
+if __name__ == "__main__":
+    main()
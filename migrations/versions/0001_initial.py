@@ -0,0 +1,105 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-11-20 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=120), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('email_verified_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+    )
+    op.create_table(
+        'banker_users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.String(length=30), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+    )
+    op.create_table(
+        'access_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('actor', sa.String(length=20), nullable=True),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('resource_type', sa.String(length=20), nullable=True),
+        sa.Column('resource_id', sa.String(length=64), nullable=True),
+        sa.Column('action', sa.String(length=20), nullable=True),
+        sa.Column('ip', sa.String(length=64), nullable=True),
+        sa.Column('ts', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'loan_applications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('data_json', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('prediction', sa.String(length=20), nullable=True),
+        sa.Column('finalized_pdf_url', sa.String(length=512), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'kyc_records',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kyc_id', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('name', sa.String(length=120), nullable=True),
+        sa.Column('dob', sa.String(length=20), nullable=True),
+        sa.Column('gov_id_type', sa.String(length=30), nullable=True),
+        sa.Column('gov_id_last4', sa.String(length=8), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('selfie_ref', sa.String(length=512), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('verified_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kyc_id'),
+    )
+    op.create_table(
+        'kyc_pdf',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kyc_id', sa.String(length=64), nullable=False),
+        sa.Column('pdf_url', sa.String(length=512), nullable=True),
+        sa.Column('pdf_checksum', sa.String(length=128), nullable=True),
+        sa.Column('qr_payload_hash', sa.String(length=128), nullable=True),
+        sa.Column('signed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['kyc_id'], ['kyc_records.kyc_id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('kyc_pdf')
+    op.drop_table('kyc_records')
+    op.drop_table('loan_applications')
+    op.drop_table('access_logs')
+    op.drop_table('banker_users')
+    op.drop_table('users')
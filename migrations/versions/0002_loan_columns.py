@@ -0,0 +1,42 @@
+"""loan policy version and promoted data_json columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-11-20 10:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    sa.Column('policy_version', sa.String(length=32), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=14, scale=2, asdecimal=False), nullable=True),
+    sa.Column('term', sa.Integer(), nullable=True),
+    sa.Column('purpose', sa.String(length=120), nullable=True),
+    sa.Column('full_name', sa.String(length=120), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+]
+
+
+def upgrade() -> None:
+    # Databases booted before migrations existed may already have some of these
+    present = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('loan_applications')}
+    with op.batch_alter_table('loan_applications') as batch_op:
+        for column in COLUMNS:
+            if column.name not in present:
+                batch_op.add_column(column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('loan_applications') as batch_op:
+        for column in reversed(COLUMNS):
+            batch_op.drop_column(column.name)
@@ -0,0 +1,38 @@
+"""composite indexes for hot banker/loan/kyc queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-11-20 10:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_loan_applications_user_created', 'loan_applications', ['user_id', 'created_at']),
+    ('ix_loan_applications_created', 'loan_applications', ['created_at']),
+    ('ix_loan_applications_status_created', 'loan_applications', ['status', 'created_at']),
+    ('ix_kyc_records_user_id', 'kyc_records', ['user_id']),
+    ('ix_kyc_records_status_created', 'kyc_records', ['status', 'created_at']),
+    ('ix_kyc_records_created', 'kyc_records', ['created_at']),
+    ('ix_kyc_pdf_kyc_id_id', 'kyc_pdf', ['kyc_id', 'id']),
+    ('ix_kyc_pdf_checksum', 'kyc_pdf', ['pdf_checksum']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
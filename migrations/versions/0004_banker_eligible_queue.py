@@ -0,0 +1,65 @@
+"""banker eligible queue
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-11-24 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'banker_eligible_queue',
+        sa.Column('kyc_record_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kyc_id', sa.String(length=64), nullable=False),
+        sa.Column('name', sa.String(length=120), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('kyc_status', sa.String(length=20), nullable=True),
+        sa.Column('loan_id', sa.Integer(), nullable=False),
+        sa.Column('loan_prediction', sa.String(length=20), nullable=True),
+        sa.Column('pdf_id', sa.Integer(), nullable=False),
+        sa.Column('kyc_created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['kyc_record_id'], ['kyc_records.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('kyc_record_id'),
+    )
+    op.create_index('ix_banker_eligible_queue_created', 'banker_eligible_queue', ['kyc_created_at', 'kyc_record_id'])
+    op.create_index(op.f('ix_banker_eligible_queue_user_id'), 'banker_eligible_queue', ['user_id'])
+
+    # Seed from existing data: latest eligible loan per user, latest PDF per KYC
+    op.execute("""
+        INSERT INTO banker_eligible_queue
+            (kyc_record_id, user_id, kyc_id, name, email, kyc_status, loan_id, loan_prediction, pdf_id, kyc_created_at, updated_at)
+        SELECT k.id, k.user_id, k.kyc_id, k.name, u.email, k.status, l.id, l.prediction, p.id, k.created_at, CURRENT_TIMESTAMP
+        FROM kyc_records k
+        JOIN (
+            SELECT id, user_id, prediction,
+                   ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at DESC, id DESC) AS rn
+            FROM loan_applications WHERE prediction = 'eligible'
+        ) l ON l.user_id = k.user_id AND l.rn = 1
+        JOIN (
+            SELECT id, kyc_id, ROW_NUMBER() OVER (PARTITION BY kyc_id ORDER BY id DESC) AS rn
+            FROM kyc_pdf
+        ) p ON p.kyc_id = k.kyc_id AND p.rn = 1
+        LEFT JOIN users u ON u.id = k.user_id
+        WHERE k.status = 'verified'
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_banker_eligible_queue_user_id'), table_name='banker_eligible_queue')
+    op.drop_index('ix_banker_eligible_queue_created', table_name='banker_eligible_queue')
+    op.drop_table('banker_eligible_queue')
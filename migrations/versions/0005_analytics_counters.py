@@ -0,0 +1,43 @@
+"""analytics counters
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-11-26 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analytics_counters',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    # Seed from current data; afterwards counters move with each write
+    for prefix, table in (('kyc', 'kyc_records'), ('loan', 'loan_applications')):
+        op.execute(f"""
+            INSERT INTO analytics_counters (name, value, updated_at)
+            SELECT '{prefix}:total', COUNT(*), CURRENT_TIMESTAMP FROM {table}
+        """)
+        op.execute(f"""
+            INSERT INTO analytics_counters (name, value, updated_at)
+            SELECT '{prefix}:status:' || COALESCE(status, 'none'), COUNT(*), CURRENT_TIMESTAMP
+            FROM {table} GROUP BY COALESCE(status, 'none')
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_counters')
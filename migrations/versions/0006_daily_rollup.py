@@ -0,0 +1,33 @@
+"""daily rollup
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-11-27 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('kyc_count', sa.Integer(), nullable=False),
+        sa.Column('loan_count', sa.Integer(), nullable=False),
+        sa.Column('finalized_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_rollup')
@@ -0,0 +1,35 @@
+"""banker events
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-12-02 10:15:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'banker_events',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('type', sa.String(length=40), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_banker_events_created_at', 'banker_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_banker_events_created_at', table_name='banker_events')
+    op.drop_table('banker_events')
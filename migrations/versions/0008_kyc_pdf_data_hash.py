@@ -0,0 +1,28 @@
+"""kyc pdf data hash
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-12-04 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('kyc_pdf') as batch_op:
+        batch_op.add_column(sa.Column('data_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('kyc_pdf') as batch_op:
+        batch_op.drop_column('data_hash')
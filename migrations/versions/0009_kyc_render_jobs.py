@@ -0,0 +1,47 @@
+"""kyc render jobs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-12-08 14:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'kyc_render_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kyc_record_id', sa.Integer(), nullable=False),
+        sa.Column('kyc_id', sa.String(length=64), nullable=False),
+        sa.Column('data_hash', sa.String(length=64), nullable=False),
+        sa.Column('fields', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('lease_until', sa.DateTime(), nullable=True),
+        sa.Column('worker', sa.String(length=128), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('pdf_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['kyc_record_id'], ['kyc_records.id']),
+        sa.ForeignKeyConstraint(['pdf_id'], ['kyc_pdf.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kyc_record_id', 'data_hash', name='uq_kyc_render_jobs_record_hash'),
+    )
+    op.create_index('ix_kyc_render_jobs_status_id', 'kyc_render_jobs', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_kyc_render_jobs_status_id', table_name='kyc_render_jobs')
+    op.drop_table('kyc_render_jobs')
@@ -0,0 +1,28 @@
+"""kyc pdf printed fields
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-12-12 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('kyc_pdf') as batch_op:
+        batch_op.add_column(sa.Column('fields', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('kyc_pdf') as batch_op:
+        batch_op.drop_column('fields')
@@ -0,0 +1,33 @@
+"""banker events autoincrement
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-12-13 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 0007 created the table without AUTOINCREMENT, so SQLite could hand out a pruned
+    # row's id again; rebuild it so ids only ever grow
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('banker_events', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('banker_events', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
@@ -0,0 +1,28 @@
+"""kyc selfie thumbnail ref
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-12-13 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('kyc_records') as batch_op:
+        batch_op.add_column(sa.Column('selfie_thumb_ref', sa.String(length=512), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('kyc_records') as batch_op:
+        batch_op.drop_column('selfie_thumb_ref')
@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time, so point it at scratch paths first
+_tmp = tempfile.mkdtemp(prefix="dhansetu-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/app.db"
+os.environ["STORAGE_DIR"] = os.path.join(_tmp, "storage")
+
+from app import create_app  # noqa: E402
+from app.extensions import limiter  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    limiter.enabled = False
+    result = app.test_cli_runner().invoke(args=["db-upgrade"])
+    assert result.exit_code == 0, result.output
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def login(client):
+    """Register (if needed) and sign in an applicant on ``client``."""
+    def login(email):
+        client.post("/api/auth/register", json={"email": email, "password": "password123", "name": "Test User"})
+        r = client.post("/api/auth/login", json={"email": email, "password": "password123"})
+        assert r.status_code == 200, r.get_json()
+        return client
+    return login
+
+
+@pytest.fixture
+def banker(app):
+    client = app.test_client()
+    client.post("/api/auth/banker/register", json={"email": "banker@example.com", "password": "password123"})
+    r = client.post("/api/auth/banker/login", json={"email": "banker@example.com", "password": "password123"})
+    assert r.status_code == 200, r.get_json()
+    return client
+
+
+ELIGIBLE_DRAFT = {"amount": "200000", "term": "36", "income": "90000", "emi": "0", "credit_score": "780", "age": "30",
+                  "employment_type": "salaried", "residence_type": "owned", "purpose": "home"}
+
+
+@pytest.fixture
+def applicant(client, login):
+    """Sign in, save an eligible loan draft and start KYC, which is what every KYC step requires."""
+    def applicant(email):
+        login(email)
+        client.post("/api/loan/save-draft", json={"data": ELIGIBLE_DRAFT})
+        r = client.post("/api/kyc/start", json={})
+        assert r.status_code in (200, 201), r.get_json()
+        return client
+    return applicant
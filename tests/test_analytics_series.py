@@ -0,0 +1,85 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import DailyRollup, KycRecord, LoanApplication, User
+
+
+def _per_row(model, days):
+    start = datetime.utcnow().date() - timedelta(days=days - 1)
+    created = db.session.execute(db.select(model.created_at)).scalars()
+    return Counter(c.date().isoformat() for c in created if c and c.date() >= start)
+
+
+def _expected(app, days):
+    with app.app_context():
+        kyc, loans = _per_row(KycRecord, days), _per_row(LoanApplication, days)
+    return kyc, loans
+
+
+@pytest.fixture(scope="module")
+def history(app):
+    """KYC and loan rows spread over the last ten days, including both edges of a day."""
+    with app.app_context():
+        user = User(email="series@example.com", password_hash="!")
+        db.session.add(user)
+        db.session.flush()
+        midnight = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        stamps = [midnight - timedelta(days=d) for d in range(10)]
+        stamps += [midnight - timedelta(days=d, seconds=1) for d in (1, 3, 3, 9)]
+        stamps += [datetime.utcnow()]
+        for i, ts in enumerate(stamps):
+            db.session.add(LoanApplication(user_id=user.id, status="draft", created_at=ts))
+            if i % 2:
+                db.session.add(KycRecord(user_id=user.id, created_at=ts))
+        db.session.commit()
+
+
+def _series(banker, days):
+    r = banker.get("/api/banker/analytics/series", query_string={"days": days})
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["series"]
+
+
+def _check(app, banker, days):
+    series = _series(banker, days)
+    kyc, loans = _expected(app, days)
+    assert len(series) == days
+    assert {p["date"]: p["kyc"] for p in series} == {p["date"]: kyc.get(p["date"], 0) for p in series}
+    assert {p["date"]: p["loans"] for p in series} == {p["date"]: loans.get(p["date"], 0) for p in series}
+    assert sum(p["loans"] for p in series) == sum(loans.values())
+
+
+def test_stored_rollups_match_per_row_counts(app, banker, history):
+    result = app.test_cli_runner().invoke(args=["finalize-rollups", "--days", "30"])
+    assert result.exit_code == 0, result.output
+    _check(app, banker, 14)
+
+
+def test_missing_rollups_are_filled_on_read(app, banker, history):
+    with app.app_context():
+        db.session.execute(db.delete(DailyRollup))
+        db.session.commit()
+    _check(app, banker, 30)
+    with app.app_context():
+        assert db.session.execute(db.select(db.func.count()).select_from(DailyRollup)).scalar() == 29
+
+
+def test_today_is_counted_live(app, banker, history):
+    before = _series(banker, 7)[-1]
+    with app.app_context():
+        user_id = db.session.execute(db.select(User.id).filter_by(email="series@example.com")).scalar_one()
+        db.session.add(LoanApplication(user_id=user_id, status="draft"))
+        db.session.commit()
+    after = _series(banker, 7)[-1]
+    assert after["date"] == before["date"]
+    assert after["loans"] == before["loans"] + 1
+
+
+@pytest.mark.parametrize("days", ["0", "1", "15", "366", "-7", "abc", "7.0"])
+def test_unsupported_windows_are_rejected(banker, days):
+    r = banker.get("/api/banker/analytics/series", query_string={"days": days})
+    assert r.status_code == 400
+    assert "7, 14, 30, 90, 365" in r.get_json()["error"]
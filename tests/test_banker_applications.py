@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+
+from app.extensions import db
+from app.models import LoanApplication, User
+
+# Nothing else in the suite is created in 2001, so this window holds only these rows
+WINDOW = {"from": "2001-01-01", "to": "2001-01-03"}
+TIE = datetime(2001, 1, 1, 10, 0)
+
+
+@pytest.fixture(scope="module")
+def loans(app):
+    """Four applications, three of them created at the same instant; ids newest first."""
+    with app.app_context():
+        user = User(email="tracker@example.com", name="Tracker", password_hash="!")
+        db.session.add(user)
+        db.session.flush()
+        rows = [
+            LoanApplication(user_id=user.id, status="draft", amount=1000, full_name="Trk Alpha", created_at=TIE),
+            LoanApplication(user_id=user.id, status="submitted", amount=5000, full_name="Trk Beta", created_at=TIE),
+            LoanApplication(user_id=user.id, status="draft", amount=9000, full_name="Trk Gamma", created_at=TIE),
+            LoanApplication(user_id=user.id, status="submitted", amount=20000, full_name="Zed Delta",
+                            created_at=datetime(2001, 1, 2, 9, 0)),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return {r.full_name.split()[1]: r.id for r in rows}
+
+
+def _ids(banker, **params):
+    r = banker.get("/api/banker/applications", query_string={**WINDOW, **params})
+    assert r.status_code == 200, r.get_json()
+    return [item["id"] for item in r.get_json()["items"]]
+
+
+def test_pages_split_tied_created_at(banker, loans):
+    seen, cursor, pages = [], None, 0
+    while True:
+        r = banker.get("/api/banker/applications", query_string={**WINDOW, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        body = r.get_json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        pages += 1
+        if not cursor:
+            break
+    # The first page ends inside the tie; the second must pick up exactly where it stopped
+    assert pages == 2
+    assert seen == [loans["Delta"], loans["Gamma"], loans["Beta"], loans["Alpha"]]
+
+
+def test_bad_cursor_is_rejected(banker, loans):
+    assert banker.get("/api/banker/applications", query_string={"cursor": "!!!"}).status_code == 400
+    assert banker.get("/api/banker/applications", query_string={"from": "yesterday"}).status_code == 400
+    assert banker.get("/api/banker/applications", query_string={"min_amount": "lots"}).status_code == 400
+
+
+def test_status_filter(banker, loans):
+    assert _ids(banker, status="Submitted") == [loans["Delta"], loans["Beta"]]
+
+
+def test_date_filters(banker, loans):
+    # A bare ``to`` date covers that whole day
+    assert _ids(banker, to="2001-01-01") == [loans["Gamma"], loans["Beta"], loans["Alpha"]]
+    assert _ids(banker, **{"from": "2001-01-02"}) == [loans["Delta"]]
+    assert _ids(banker, to="2001-01-01T09:59:59") == []
+
+
+def test_amount_filters(banker, loans):
+    assert _ids(banker, min_amount="5000", max_amount="9000") == [loans["Gamma"], loans["Beta"]]
+    assert _ids(banker, min_amount="10000") == [loans["Delta"]]
+    assert _ids(banker, max_amount="1000") == [loans["Alpha"]]
+
+
+def test_search_is_a_case_insensitive_prefix(banker, loans):
+    assert _ids(banker, q="trk") == [loans["Gamma"], loans["Beta"], loans["Alpha"]]
+    assert _ids(banker, q="Trk B") == [loans["Beta"]]
+    assert _ids(banker, q="Alpha") == []
+    assert _ids(banker, q="Trk%") == []
+    # The applicant's account email matches too
+    assert len(_ids(banker, q="tracker@")) == 4
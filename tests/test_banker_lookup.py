@@ -0,0 +1,84 @@
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import User
+from app.services import kyc_lookup_service as kyc_lookup
+
+from conftest import ELIGIBLE_DRAFT
+
+HUGE = "9" * 30
+
+
+def test_lookup_batch_lists_oversized_ids_as_invalid(banker):
+    r = banker.post("/api/banker/kyc/lookup-batch", json={"ids": [HUGE, "KYCNOSUCH", 10**30, 123]})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["invalid"] == [HUGE, 10**30]
+    assert body["not_found"] == ["KYCNOSUCH", 123]
+
+
+def test_oversized_numeric_id_is_not_found(banker):
+    assert banker.get(f"/api/banker/kyc/{HUGE}").status_code == 404
+    assert banker.get(f"/api/banker/kyc/{HUGE}/pdf").status_code == 404
+
+
+def _finalize(client, applicant, email, name="Asha Rao"):
+    applicant(email)
+    r = client.post("/api/kyc/finalize", json={"name": name, "dob": "1990-01-01", "gov_id": "ID-" + email,
+                                               "address": "1 Main St", "email": email})
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["kyc_id"]
+
+
+def _set_phone(app, email, phone):
+    # Straight to the table, like another worker would: nothing here invalidates the cache
+    with app.app_context():
+        db.session.execute(update(User).where(User.email == email).values(phone=phone))
+        db.session.commit()
+
+
+def test_lookup_is_cached_until_ttl(app, client, applicant, banker, monkeypatch):
+    kyc_id = _finalize(client, applicant, "lookup-ttl@example.com")
+    first = banker.get(f"/api/banker/kyc/{kyc_id}")
+    assert first.status_code == 200 and first.get_json()["phone"] == ""
+
+    _set_phone(app, "lookup-ttl@example.com", "5550100")
+    cached = banker.get(f"/api/banker/kyc/{kyc_id}")
+    assert cached.get_json()["phone"] == ""
+    assert cached.headers["ETag"] == first.headers["ETag"]
+
+    now = time.monotonic()
+    monkeypatch.setattr(kyc_lookup, "time", SimpleNamespace(monotonic=lambda: now + kyc_lookup.CACHE_TTL + 1))
+    fresh = banker.get(f"/api/banker/kyc/{kyc_id}")
+    assert fresh.get_json()["phone"] == "5550100"
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+
+
+def test_finalize_and_save_draft_invalidate_lookup(app, client, applicant, banker):
+    kyc_id = _finalize(client, applicant, "lookup-inval@example.com")
+    before = banker.get(f"/api/banker/kyc/{kyc_id}").get_json()
+
+    loan_id = client.post("/api/loan/save-draft", json={"data": ELIGIBLE_DRAFT}).get_json()["id"]
+    assert loan_id != before["loan_id"]
+    assert banker.get(f"/api/banker/kyc/{kyc_id}").get_json()["loan_id"] == loan_id
+
+    _set_phone(app, "lookup-inval@example.com", "5550101")
+    assert banker.get(f"/api/banker/kyc/{kyc_id}").get_json()["phone"] == ""
+    assert _finalize(client, applicant, "lookup-inval@example.com") == kyc_id
+    assert banker.get(f"/api/banker/kyc/{kyc_id}").get_json()["phone"] == "5550101"
+
+
+def test_lookup_etag_and_304(client, applicant, banker):
+    kyc_id = _finalize(client, applicant, "lookup-etag@example.com")
+    r = banker.get(f"/api/banker/kyc/{kyc_id}")
+    assert r.status_code == 200 and r.headers["ETag"]
+    same = banker.get(f"/api/banker/kyc/{kyc_id}", headers={"If-None-Match": r.headers["ETag"]})
+    assert same.status_code == 304 and not same.data
+    assert same.headers["ETag"] == r.headers["ETag"]
+    # A new PDF changes the tag
+    _finalize(client, applicant, "lookup-etag@example.com")
+    again = banker.get(f"/api/banker/kyc/{kyc_id}", headers={"If-None-Match": r.headers["ETag"]})
+    assert again.status_code == 200
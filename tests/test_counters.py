@@ -0,0 +1,118 @@
+from app.extensions import db
+from app.models import AnalyticsCounter, KycPdf, KycRecord, LoanApplication, User
+from app.services import counters_service as counters
+
+NAMES = ["loan:total", "loan:status:draft", "loan:status:approved", counters.VERSION_KEY]
+
+
+def _user_id(email):
+    return db.session.execute(db.select(User.id).filter_by(email=email)).scalar_one()
+
+
+def test_counters_follow_orm_writes_in_the_same_transaction(app, login):
+    login("counters@example.com")
+    with app.app_context():
+        user_id = _user_id("counters@example.com")
+        before = counters.read(NAMES)
+
+        loan = LoanApplication(user_id=user_id, status="draft")
+        db.session.add(loan)
+        db.session.commit()
+        after_insert = counters.read(NAMES)
+        assert after_insert["loan:total"] == before["loan:total"] + 1
+        assert after_insert["loan:status:draft"] == before["loan:status:draft"] + 1
+        assert after_insert[counters.VERSION_KEY] > before[counters.VERSION_KEY]
+
+        loan.status = "approved"
+        db.session.commit()
+        after_update = counters.read(NAMES)
+        assert after_update["loan:total"] == after_insert["loan:total"]
+        assert after_update["loan:status:draft"] == before["loan:status:draft"]
+        assert after_update["loan:status:approved"] == before["loan:status:approved"] + 1
+
+        # Rolled-back writes leave no trace in the counters
+        db.session.add(LoanApplication(user_id=user_id, status="draft"))
+        db.session.flush()
+        db.session.rollback()
+        assert counters.read(NAMES)["loan:total"] == after_update["loan:total"]
+
+        db.session.delete(db.session.get(LoanApplication, loan.id))
+        db.session.commit()
+        after_delete = counters.read(NAMES)
+        assert after_delete["loan:total"] == before["loan:total"]
+        assert after_delete["loan:status:approved"] == before["loan:status:approved"]
+
+
+def test_counters_match_source_tables(app, ctx):
+    actual = counters.actual_counts()
+    assert counters.read(actual) == actual
+
+
+def _version():
+    return counters.read([counters.VERSION_KEY])[counters.VERSION_KEY]
+
+
+def test_data_version_moves_with_dashboard_writes_only(app, login):
+    login("version@example.com")
+    with app.app_context():
+        user_id = _user_id("version@example.com")
+
+        v = _version()
+        kyc = KycRecord(user_id=user_id, kyc_id="KYCVERSIONTEST")
+        db.session.add(kyc)
+        db.session.commit()
+        assert _version() > v
+
+        v = _version()
+        loan = LoanApplication(user_id=user_id, status="draft")
+        db.session.add(loan)
+        db.session.commit()
+        assert _version() > v
+
+        v = _version()
+        db.session.add(KycPdf(kyc_id="KYCVERSIONTEST", pdf_url="x", pdf_checksum="x"))
+        db.session.commit()
+        assert _version() > v
+
+        v = _version()
+        kyc.name = "Renamed"
+        db.session.commit()
+        assert _version() > v
+
+        # Nothing changed: re-assigning a loaded value, an empty flush, or a non-dashboard table
+        v = _version()
+        loan.status = loan.status
+        db.session.flush()
+        db.session.flush()
+        db.session.get(User, user_id).name = "Someone Else"
+        db.session.commit()
+        assert _version() == v
+
+
+def test_apply_deltas_creates_missing_rows(app, ctx):
+    name = "test:upsert"
+    conn = db.session.connection()
+    counters.apply_deltas(conn, {name: 2})
+    counters.apply_deltas(conn, {name: 3})
+    assert counters.read([name])[name] == 5
+    db.session.rollback()
+    assert db.session.get(AnalyticsCounter, name) is None
+
+
+def test_dashboard_etag_and_304(app, banker, login):
+    r = banker.get("/api/banker/dashboard")
+    assert r.status_code == 200
+    etag = r.headers["ETag"].strip('"')
+    with app.app_context():
+        assert etag == f"dash-{_version()}"
+
+    same = banker.get("/api/banker/dashboard", headers={"If-None-Match": r.headers["ETag"]})
+    assert same.status_code == 304
+    assert same.headers["ETag"] == r.headers["ETag"]
+    assert not same.data
+
+    # Any dashboard write makes the old tag stale
+    login("etag@example.com").post("/api/loan/save-draft", json={"data": {"amount": "1000"}})
+    changed = banker.get("/api/banker/dashboard", headers={"If-None-Match": r.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != r.headers["ETag"]
@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+
+import pytest
+
+from app.services.eligibility_service import score_application, score_batch
+from app.services.policy_service import DEFAULT_POLICY_PATH, _PolicyCache, get_policy
+
+GOOD = {"amount": "200000", "term": "36", "income": "90000", "emi": "0", "credit_score": "780",
+        "age": "30", "employment_type": "salaried", "residence_type": "owned"}
+
+
+def test_batch_scores_good_row(ctx):
+    (score,) = score_batch([GOOD])
+    assert score["prediction"] == "eligible"
+    assert score["policy_version"] == get_policy().version
+
+
+def test_batch_out_of_range_term_and_age_are_unparseable(ctx):
+    rows = [GOOD, dict(GOOD, term=10**30), dict(GOOD, age=10**30), dict(GOOD, term="abc")]
+    scores = score_batch(rows)
+    assert scores[0]["prediction"] == "eligible"
+    assert scores[1:] == [None, None, None]
+
+
+@pytest.mark.parametrize("change", [
+    {"income": "nan"}, {"income": "inf"}, {"emi": "nan"},
+    {"term": "1201"}, {"term": "-1201"}, {"age": "151"}, {"age": "-151"},
+])
+def test_unscorable_inputs_score_none(ctx, change):
+    assert score_batch([dict(GOOD, **change)]) == [None]
+    assert score_application(dict(GOOD, **change)) is None
+
+
+@pytest.mark.parametrize("change, prediction", [
+    ({"term": "1200"}, "eligible"), ({"age": "150"}, "ineligible"),
+    ({"emi": "inf"}, "ineligible"), ({"income": "-inf"}, "ineligible"),
+])
+def test_limits_and_infinite_debt_still_score(ctx, change, prediction):
+    assert score_application(dict(GOOD, **change))["prediction"] == prediction
+
+
+def test_save_draft_keeps_prediction_when_unscorable(client, login):
+    login("unscorable@example.com")
+    loan_id = client.post("/api/loan/save-draft", json={"data": GOOD}).get_json()["id"]
+    r = client.post("/api/loan/save-draft", json={"id": loan_id, "data": dict(GOOD, income="nan")})
+    assert r.status_code == 200
+    assert r.get_json()["prediction"] == "eligible"
+
+
+def test_eligibility_batch_endpoint_survives_huge_term(client, login):
+    login("score@example.com")
+    r = client.post("/api/loan/eligibility/batch", json={"rows": [GOOD, dict(GOOD, term=10**30)]})
+    assert r.status_code == 200
+    items = r.get_json()["items"]
+    assert items[0]["prediction"] == "eligible"
+    assert items[1] == {"index": 1, "error": "Invalid input"}
+
+
+def test_single_and_batch_agree_on_non_finite_inputs(ctx):
+    rows = [GOOD, dict(GOOD, income="nan"), dict(GOOD, emi="nan"), dict(GOOD, income="inf"),
+            dict(GOOD, credit_score="nan"), dict(GOOD, term="0"), dict(GOOD, age="70")]
+    assert [score_application(d) for d in rows] == score_batch(rows)
+    assert score_application(dict(GOOD, income="nan")) is None
+
+
+def test_broken_policy_edit_keeps_last_good_version(ctx, tmp_path, caplog, monkeypatch):
+    with open(DEFAULT_POLICY_PATH, encoding="utf-8") as f:
+        spec = json.load(f)
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps(dict(spec, version="good")), encoding="utf-8")
+    cache = _PolicyCache()
+    assert cache.get(str(path)).version == "good"
+
+    path.write_text(json.dumps(dict(spec, version="broken", annual_rate="lots")), encoding="utf-8")
+    os.utime(path, ns=(0, 0))  # a distinct mtime even on coarse filesystem clocks
+    monkeypatch.setattr("app.services.policy_service.RELOAD_INTERVAL", 0.0)
+    with caplog.at_level(logging.WARNING):
+        assert cache.get(str(path)).version == "good"
+    assert "failed to reload" in caplog.text
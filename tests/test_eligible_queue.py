@@ -0,0 +1,110 @@
+import json
+
+from app.extensions import db
+from app.models import BankerEligibleQueue, KycPdf, LoanApplication, User
+from app.services.policy_service import DEFAULT_POLICY_PATH
+
+from conftest import ELIGIBLE_DRAFT
+
+INELIGIBLE_DRAFT = dict(ELIGIBLE_DRAFT, age="18")
+
+
+def _finalize(client, applicant, email):
+    applicant(email)
+    r = client.post("/api/kyc/finalize", json={"name": "Asha Rao", "dob": "1990-01-01", "gov_id": "ID-" + email,
+                                               "address": "1 Main St", "email": email})
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["kyc_id"]
+
+
+def _user_id(email):
+    return db.session.execute(db.select(User.id).where(User.email == email)).scalar_one()
+
+
+def _queue_row(app, email):
+    with app.app_context():
+        return db.session.execute(
+            db.select(BankerEligibleQueue).where(BankerEligibleQueue.user_id == _user_id(email))
+        ).scalar_one_or_none()
+
+
+def _latest_loan_id(app, email):
+    with app.app_context():
+        return db.session.execute(
+            db.select(db.func.max(LoanApplication.id)).where(LoanApplication.user_id == _user_id(email))
+        ).scalar()
+
+
+def _snapshot(app):
+    cols = [c for c in BankerEligibleQueue.__table__.c if c.name != "updated_at"]
+    with app.app_context():
+        return sorted(tuple(r) for r in db.session.execute(db.select(*cols)).all())
+
+
+def _rescore(app, tmp_path, **overrides):
+    with open(DEFAULT_POLICY_PATH, encoding="utf-8") as f:
+        spec = json.load(f)
+    spec.update(overrides)
+    path = tmp_path / f"policy-{spec['version']}.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    old_path = app.config["ELIGIBILITY_POLICY_PATH"]
+    app.config["ELIGIBILITY_POLICY_PATH"] = str(path)
+    try:
+        result = app.test_cli_runner().invoke(
+            args=["rescore-loans", "--restart", "--checkpoint", str(tmp_path / f"{spec['version']}.json")])
+    finally:
+        app.config["ELIGIBILITY_POLICY_PATH"] = old_path
+    assert result.exit_code == 0, result.output
+
+
+def test_store_pdf_adds_verified_kyc_to_queue(app, client, applicant):
+    applicant("queue-pdf@example.com")
+    assert _queue_row(app, "queue-pdf@example.com") is None
+
+    kyc_id = _finalize(client, applicant, "queue-pdf@example.com")
+    row = _queue_row(app, "queue-pdf@example.com")
+    with app.app_context():
+        pdf_id = db.session.execute(db.select(db.func.max(KycPdf.id)).where(KycPdf.kyc_id == kyc_id)).scalar()
+    assert (row.kyc_id, row.kyc_status, row.pdf_id) == (kyc_id, "verified", pdf_id)
+    assert row.loan_id == _latest_loan_id(app, "queue-pdf@example.com")
+
+
+def test_saving_an_eligible_draft_points_queue_at_it(app, client, applicant):
+    _finalize(client, applicant, "queue-draft@example.com")
+    loan_id = client.post("/api/loan/save-draft", json={"data": ELIGIBLE_DRAFT}).get_json()["id"]
+    assert _queue_row(app, "queue-draft@example.com").loan_id == loan_id
+
+
+def test_prediction_flip_drops_and_restores_queue_row(app, client, applicant):
+    _finalize(client, applicant, "queue-flip@example.com")
+    loan_id = _latest_loan_id(app, "queue-flip@example.com")
+
+    r = client.post("/api/loan/save-draft", json={"id": loan_id, "data": INELIGIBLE_DRAFT})
+    assert r.get_json()["prediction"] == "ineligible"
+    assert _queue_row(app, "queue-flip@example.com") is None
+
+    r = client.post("/api/loan/save-draft", json={"id": loan_id, "data": ELIGIBLE_DRAFT})
+    assert r.get_json()["prediction"] == "eligible"
+    assert _queue_row(app, "queue-flip@example.com").loan_id == loan_id
+
+
+def test_rescore_maintains_queue(app, client, applicant, tmp_path):
+    _finalize(client, applicant, "queue-rescore@example.com")
+    assert _queue_row(app, "queue-rescore@example.com") is not None
+
+    _rescore(app, tmp_path, version="test-queue-strict", min_age=40)
+    assert _queue_row(app, "queue-rescore@example.com") is None
+
+    _rescore(app, tmp_path)
+    assert _queue_row(app, "queue-rescore@example.com") is not None
+
+
+def test_rebuild_matches_incremental_queue(app, client, applicant):
+    _finalize(client, applicant, "queue-rebuild@example.com")
+    client.post("/api/loan/save-draft", json={"data": INELIGIBLE_DRAFT})
+    incremental = _snapshot(app)
+    assert incremental
+
+    result = app.test_cli_runner().invoke(args=["rebuild-eligible-queue"])
+    assert result.exit_code == 0, result.output
+    assert _snapshot(app) == incremental
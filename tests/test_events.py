@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+import threading
+
+from app.extensions import db
+from app.models import BankerEvent
+from app.services import events_service as events
+
+
+def _publish(n, type_="test.event"):
+    for i in range(n):
+        events.publish(type_, {"n": i})
+    db.session.commit()
+
+
+def test_poll_fans_out_committed_events(app, ctx):
+    bus = events.EventBus(app)
+    start = bus.cursor
+    _publish(3)
+    bus._poll()
+    got = bus.since(start)
+    assert [e[2] for e in got] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert bus.cursor == got[-1][0]
+
+
+def test_ids_keep_growing_after_prune(app, ctx):
+    bus = events.EventBus(app)
+    _publish(2)
+    bus._poll()
+    cursor = bus.cursor
+    db.session.execute(db.update(BankerEvent).values(created_at=datetime.utcnow() - events.RETENTION - timedelta(hours=1)))
+    db.session.commit()
+
+    bus._maybe_prune()
+    # The newest row is kept even when it is past retention
+    assert db.session.execute(db.select(BankerEvent.id)).scalars().all() == [cursor]
+
+    db.session.execute(db.delete(BankerEvent))
+    db.session.commit()
+    _publish(1, "after.prune")
+    bus._poll()
+    assert [e[1] for e in bus.since(cursor)] == ["after.prune"]
+
+
+def test_replay_resyncs_when_gap_was_pruned(app, ctx):
+    bus = events.EventBus(app)
+    _publish(1)
+    bus._poll()
+    _, position, resync = bus.replay(0)
+    assert resync and position == bus.cursor
+
+
+def test_stream_limit_per_worker(app, banker):
+    limit, app.config["BANKER_STREAM_LIMIT"] = app.config["BANKER_STREAM_LIMIT"], 1
+    try:
+        first = banker.get("/api/banker/stream", buffered=False)
+        assert first.status_code == 200
+        assert next(first.response).startswith(b"retry:")
+        second = banker.get("/api/banker/stream", buffered=False)
+        assert second.status_code == 503
+        assert second.headers["Retry-After"]
+        first.close()
+        third = banker.get("/api/banker/stream", buffered=False)
+        assert third.status_code == 200
+        third.close()
+    finally:
+        app.config["BANKER_STREAM_LIMIT"] = limit
+
+
+def test_first_subscriber_starts_at_head(app, ctx):
+    bus = events.EventBus(app)
+    bus._thread = threading.current_thread()  # no poller; drive it by hand
+    assert bus.subscribe()
+    bus._poll()
+    bus.unsubscribe()
+    # Written while nobody was listening, so never polled
+    _publish(3, "while.idle")
+    head = db.session.execute(db.select(db.func.max(BankerEvent.id))).scalar()
+    assert bus.subscribe()
+    after = bus.cursor
+    assert after == head
+    bus._poll()
+    assert bus.since(after) == []
+    bus.unsubscribe()
+
+
+def test_stream_after_idle_writes_does_not_replay(app, banker):
+    bus = events.get_bus(app)
+    first = banker.get("/api/banker/stream", buffered=False)
+    next(first.response)
+    first.close()
+    with app.app_context():
+        _publish(3, "while.idle")
+        head = db.session.execute(db.select(db.func.max(BankerEvent.id))).scalar()
+    second = banker.get("/api/banker/stream", buffered=False)
+    assert next(second.response).startswith(b"retry:")
+    assert bus.cursor == head
+    assert bus.since(head) == []
+    second.close()
@@ -0,0 +1,41 @@
+import io
+
+from PIL import Image
+
+from app.extensions import db
+from app.models import KycRecord, User
+from app.services import storage_service as storage
+from app.services import upload_service as uploads
+
+
+def _png(size=(900, 600)):
+    out = io.BytesIO()
+    Image.new("RGB", size, "teal").save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_selfie_thumbnail_ref_is_persisted(app, client, applicant):
+    applicant("selfie@example.com")
+    r = client.post("/api/kyc/upload-selfie", data=_png(), content_type="image/png")
+    assert r.status_code == 200, r.get_json()
+    body = r.get_json()
+    with app.app_context():
+        user = db.session.execute(db.select(User).filter_by(email="selfie@example.com")).scalar_one()
+        kyc = db.session.execute(db.select(KycRecord).filter_by(user_id=user.id)).scalar_one()
+        assert kyc.selfie_thumb_ref == body["thumbnail"]
+        with Image.open(io.BytesIO(storage.read(kyc.selfie_thumb_ref))) as thumb:
+            assert max(thumb.size) == 160
+
+
+def test_rejected_uploads_release_their_temp_file(client, applicant, monkeypatch):
+    applicant("selfie-empty@example.com")
+    received = []
+    receive_raw = uploads.receive_raw
+    monkeypatch.setattr(uploads, "receive_raw", lambda *a: received.append(receive_raw(*a)) or received[-1])
+
+    r = client.post("/api/kyc/upload-selfie", data=b"", content_type="image/png")
+    assert r.status_code == 400 and r.get_json()["error"] == "No image data"
+    r = client.post("/api/kyc/upload-selfie", data=_png(), content_type="image/png", headers={"X-Content-SHA256": "0" * 64})
+    assert r.status_code == 400 and r.get_json()["error"] == "Checksum mismatch"
+    assert len(received) == 2
+    assert all(u._file.closed for u in received)
@@ -0,0 +1,29 @@
+import math
+
+from app.models import LoanApplication
+
+
+def test_promoted_fields_drop_values_the_columns_cannot_hold():
+    f = LoanApplication.promoted_fields({"amount": "nan", "term": 10**30, "purpose": "home"})
+    assert f["amount"] is None and f["term"] is None and f["purpose"] == "home"
+    assert LoanApplication.promoted_fields({"amount": "inf"})["amount"] is None
+    f = LoanApplication.promoted_fields({"amount": "250000.5", "term": "36"})
+    assert math.isclose(f["amount"], 250000.5) and f["term"] == 36
+
+
+def test_save_draft_with_huge_term(client, login):
+    login("draft@example.com")
+    r = client.post("/api/loan/save-draft", json={"data": {"amount": "1e400", "term": 10**30}})
+    assert r.status_code == 200
+    assert r.get_json()["data"]["term"] == 10**30
+
+
+def test_schedule_rejects_non_finite_inputs(client, login):
+    login("schedule@example.com")
+    for body in ({"amount": "nan", "term": 12}, {"amount": "inf", "term": 12},
+                 {"amount": 1000, "term": 12, "annual_rate": "nan"}, {"amount": 1000, "term": 1e400}):
+        r = client.post("/api/loan/schedule", json=body)
+        assert r.status_code == 400, body
+    r = client.post("/api/loan/schedule", json={"amount": 120000, "term": 12, "annual_rate": 0.12})
+    assert r.status_code == 200
+    assert len(r.get_json()["items"]) == 12
@@ -0,0 +1,47 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.services.pagination_service import decode_cursor, encode_cursor, parse_limit
+
+
+def _raw_cursor(text):
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    ts = datetime(2025, 3, 4, 5, 6, 7, 890)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", _raw_cursor("no-separator"), _raw_cursor("2025-01-01T00:00:00|x"),
+                                    _raw_cursor("yesterday|5"), _raw_cursor("2025-01-01T00:00:00|" + "9" * 30)])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_parse_limit():
+    assert parse_limit(None) == 50
+    assert parse_limit("abc") == 50
+    assert parse_limit("0") == 1
+    assert parse_limit("10000") == 200
+    assert parse_limit("25") == 25
+
+
+def test_my_loans_pages_newest_first(client, login):
+    login("pages@example.com")
+    ids = [client.post("/api/loan/save-draft", json={"data": {"amount": str(1000 + i)}}).get_json()["id"] for i in range(5)]
+    seen, cursor = [], None
+    while True:
+        r = client.get("/api/loan/my", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        body = r.get_json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ids[::-1]
+    bad = client.get("/api/loan/my", query_string={"cursor": _raw_cursor("2025-01-01T00:00:00|" + "9" * 30)})
+    assert bad.status_code == 400
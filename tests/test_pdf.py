@@ -0,0 +1,64 @@
+import io
+import json
+
+import pikepdf
+from PIL import Image
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+
+from app.services.pdf_service import generate_kyc_pdf, qr_matrix, read_embedded_payload, read_printed_fields
+
+FIELDS = {"KYC ID": "KYC42", "Name": "Asha Rao", "DOB": "1990-01-01"}
+
+
+def test_rendered_pdf_carries_payload_and_fields():
+    qr_text = json.dumps({"payload": {"kyc_id": "KYC42"}, "sig": "abc"})
+    pdf_bytes, checksum = generate_kyc_pdf(FIELDS, qr_text)
+    assert pdf_bytes.startswith(b"%PDF") and len(checksum) == 64
+    assert read_embedded_payload(io.BytesIO(pdf_bytes)) == json.loads(qr_text)
+    assert read_printed_fields(pdf_bytes, tuple(FIELDS)) == FIELDS
+
+
+def test_streams_are_binary_without_changing_reportlab_defaults():
+    selfie = io.BytesIO()
+    Image.new("RGB", (64, 64), "teal").save(selfie, "JPEG")
+    default = rl_config.useA85
+    pdf_bytes, _ = generate_kyc_pdf(FIELDS, json.dumps({"payload": {}, "sig": ""}), selfie=selfie.getvalue())
+    assert rl_config.useA85 == default
+    filters = []
+    with pikepdf.open(io.BytesIO(pdf_bytes)) as pdf:
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Stream):
+                f = obj.get("/Filter")
+                filters += [str(f)] if isinstance(f, pikepdf.Name) else [str(x) for x in (f or [])]
+    assert "/DCTDecode" in filters
+    assert "/ASCII85Decode" not in filters
+
+
+def _drawn_qr(pdf_bytes, x, y, size, modules):
+    """Rebuild the QR matrix from the rectangles ``draw_qr`` left in the page content."""
+    cell = size / modules
+    matrix = [[False] * modules for _ in range(modules)]
+    with pikepdf.open(io.BytesIO(pdf_bytes)) as pdf:
+        for operands, op in pikepdf.parse_content_stream(pdf.pages[0]):
+            if str(op) != "re":
+                continue
+            rx, ry, w, h = (float(v) for v in operands)
+            inside = x <= rx < x + size and y <= ry < y + size
+            if not inside or (round(w / cell) == modules and round(h / cell) == modules):
+                continue
+            r = round((y + size - ry) / cell) - 1
+            start = round((rx - x) / cell)
+            for col in range(start, start + round(w / cell)):
+                matrix[r][col] = True
+    return matrix
+
+
+def test_drawn_qr_encodes_the_embedded_payload():
+    qr_text = json.dumps({"payload": {"kyc_id": "KYC42", "data_hash": "ab" * 32}, "sig": "c" * 64})
+    pdf_bytes, _ = generate_kyc_pdf(FIELDS, qr_text)
+    embedded = json.dumps(read_embedded_payload(io.BytesIO(pdf_bytes)))
+    assert embedded == qr_text
+    expected = qr_matrix(embedded)
+    width, _ = A4
+    assert _drawn_qr(pdf_bytes, width - 220, 50, 170, len(expected)) == expected
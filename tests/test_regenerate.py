@@ -0,0 +1,53 @@
+import concurrent.futures
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.extensions import db
+from app.models import KycPdf
+from app.services import pdf_service
+
+
+class _ThreadPool(ThreadPoolExecutor):
+    # Renders in threads so the monkeypatched renderer is the one that runs
+    def __init__(self, max_workers, mp_context=None):
+        super().__init__(max_workers)
+
+
+def _finalize(client, applicant, email):
+    applicant(email)
+    r = client.post("/api/kyc/finalize", json={"name": "Asha Rao", "dob": "1990-01-01", "gov_id": "ID-" + email,
+                                               "address": "1 Main St", "email": email})
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["kyc_id"]
+
+
+def test_failed_renders_are_retried_on_resume(app, client, applicant, monkeypatch, tmp_path):
+    target = _finalize(client, applicant, "regen@example.com")
+    checkpoint = str(tmp_path / "regen.json")
+    render = pdf_service.generate_kyc_pdf
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", _ThreadPool)
+
+    def flaky(fields, qr_text, selfie=None):
+        if fields["KYC ID"] == target:
+            raise RuntimeError("renderer crashed")
+        return render(fields, qr_text, selfie)
+
+    def pdf_rows():
+        with app.app_context():
+            return db.session.execute(db.select(db.func.count()).where(KycPdf.kyc_id == target)).scalar()
+
+    before = pdf_rows()
+    monkeypatch.setattr(pdf_service, "generate_kyc_pdf", flaky)
+    result = app.test_cli_runner().invoke(args=["regenerate-kyc-pdfs", "--processes", "1", "--checkpoint", checkpoint])
+    assert result.exit_code == 0, result.output
+    with open(checkpoint, encoding="utf-8") as f:
+        assert json.load(f)["failed"] == [target]
+    assert pdf_rows() == before
+
+    monkeypatch.setattr(pdf_service, "generate_kyc_pdf", render)
+    result = app.test_cli_runner().invoke(args=["regenerate-kyc-pdfs", "--processes", "1", "--checkpoint", checkpoint])
+    assert result.exit_code == 0, result.output
+    assert "retrying 1 failed renders" in result.output
+    assert pdf_rows() == before + 1
+    assert not os.path.exists(checkpoint)
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import KycPdf, KycRenderJob
+from app.services import render_job_service as render_jobs
+from app.services.pdf_service import generate_kyc_pdf
+
+def _queue_job(app, client, applicant, email):
+    applicant(email)
+    app.config["KYC_RENDER_ASYNC"] = True
+    try:
+        r = client.post("/api/kyc/finalize", json={"name": "Asha Rao", "dob": "1990-01-01", "gov_id": "ID-" + email,
+                                                   "address": "1 Main St", "email": email})
+    finally:
+        app.config["KYC_RENDER_ASYNC"] = False
+    assert r.status_code == 202, r.get_json()
+    return r.get_json()["job_id"]
+
+
+def _pdf_rows(kyc_id):
+    return db.session.execute(db.select(db.func.count()).where(KycPdf.kyc_id == kyc_id)).scalar()
+
+
+def test_expired_lease_holder_cannot_complete_or_fail(app, client, applicant):
+    job_id = _queue_job(app, client, applicant, "lease@example.com")
+    with app.app_context():
+        (stale,) = render_jobs.claim("worker-a", 1)
+        # worker-a stalls past its lease and worker-b takes the job over
+        db.session.execute(db.update(KycRenderJob).where(KycRenderJob.id == job_id)
+                           .values(lease_until=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+        (current,) = render_jobs.claim("worker-b", 1)
+        assert current.job_id == stale.job_id == job_id and current.attempt == 2
+        kyc_id = db.session.get(KycRenderJob, job_id).kyc_id
+
+        render_jobs.fail(stale, "late failure")
+        job = render_jobs.complete(stale, *generate_kyc_pdf(stale.fields, stale.qr_text, stale.selfie))
+        assert job.status == "running" and job.worker == "worker-b" and job.error is None
+        assert _pdf_rows(kyc_id) == 0
+
+        job = render_jobs.complete(current, *generate_kyc_pdf(current.fields, current.qr_text, current.selfie))
+        assert job.status == "done" and job.pdf_id is not None
+        # A repeated completion (e.g. a retried message) is a no-op too
+        render_jobs.complete(current, *generate_kyc_pdf(current.fields, current.qr_text, current.selfie))
+        assert _pdf_rows(kyc_id) == 1
+
+
+def test_fail_requeues_with_backoff(app, client, applicant):
+    job_id = _queue_job(app, client, applicant, "backoff@example.com")
+    with app.app_context():
+        (task,) = render_jobs.claim("worker-a", 1)
+        render_jobs.fail(task, "boom")
+        job = db.session.get(KycRenderJob, job_id)
+        assert job.status == "queued" and job.error == "boom" and job.lease_until > datetime.utcnow()
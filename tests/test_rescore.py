@@ -0,0 +1,33 @@
+import json
+
+from app.extensions import db
+from app.models import BankerEvent, LoanApplication
+from app.services.policy_service import DEFAULT_POLICY_PATH
+
+
+def test_rescore_publishes_prediction_flips(app, client, login, tmp_path):
+    login("rescore@example.com")
+    draft = {"amount": "200000", "term": "36", "income": "90000", "emi": "0", "credit_score": "780", "age": "30"}
+    loan_id = client.post("/api/loan/save-draft", json={"data": draft}).get_json()["id"]
+
+    with open(DEFAULT_POLICY_PATH, encoding="utf-8") as f:
+        spec = json.load(f)
+    spec.update(version="test-strict", min_age=40)
+    strict = tmp_path / "strict.json"
+    strict.write_text(json.dumps(spec), encoding="utf-8")
+
+    old_path = app.config["ELIGIBILITY_POLICY_PATH"]
+    app.config["ELIGIBILITY_POLICY_PATH"] = str(strict)
+    try:
+        result = app.test_cli_runner().invoke(args=["rescore-loans", "--restart", "--checkpoint", str(tmp_path / "c.json")])
+    finally:
+        app.config["ELIGIBILITY_POLICY_PATH"] = old_path
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        loan = db.session.get(LoanApplication, loan_id)
+        assert (loan.prediction, loan.policy_version) == ("ineligible", "test-strict")
+        payloads = db.session.execute(
+            db.select(BankerEvent.payload).where(BankerEvent.type == "loan.prediction").order_by(BankerEvent.id)
+        ).scalars().all()
+        assert {"loan_id": loan_id, "user_id": loan.user_id, "prediction": "ineligible", "previous": "eligible"} in payloads
@@ -0,0 +1,117 @@
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+from minio.error import S3Error
+
+from app.services import storage_service as storage
+
+
+def _error(code):
+    return S3Error(code, code, "/bucket/key", "req", "host", None)
+
+
+class _Object:
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self.closed = self.released = False
+
+    def read(self, n=-1):
+        return self._data.read(n)
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeMinio:
+    """The slice of ``minio.Minio`` that S3Storage uses, over a dict."""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = []
+        self.gets = []
+        self.stat_error = None
+
+    def stat_object(self, bucket, key):
+        if self.stat_error:
+            raise _error(self.stat_error)
+        if (bucket, key) not in self.objects:
+            raise _error("NoSuchKey")
+        return SimpleNamespace(size=len(self.objects[bucket, key][0]))
+
+    def put_object(self, bucket, key, data, length, content_type="application/octet-stream"):
+        body = data.read(length)
+        assert len(body) == length
+        self.objects[bucket, key] = (body, content_type)
+        self.puts.append(key)
+
+    def get_object(self, bucket, key, offset=0):
+        if (bucket, key) not in self.objects:
+            raise _error("NoSuchKey")
+        obj = _Object(self.objects[bucket, key][0][offset:])
+        self.gets.append((key, offset, obj))
+        return obj
+
+
+@pytest.fixture
+def s3(app, ctx, monkeypatch):
+    client = FakeMinio()
+    monkeypatch.setitem(app.extensions, "storage", storage.S3Storage(client, "bucket", "blobs"))
+    return client
+
+
+def test_put_is_keyed_by_digest_and_stored_once(s3):
+    ref = storage.put(b"pdf bytes", "application/pdf")
+    assert storage.put(io.BytesIO(b"pdf bytes"), "application/pdf") == ref
+    digest = storage.digest_of(ref)
+    key = "blobs/" + storage.shard(digest)
+    assert s3.puts == [key]
+    assert s3.objects["bucket", key] == (b"pdf bytes", "application/pdf")
+    assert storage.local_path(ref) is None
+
+
+def test_read_and_missing_objects(s3):
+    ref = storage.put(b"hello world", "text/plain")
+    assert storage.read(ref) == b"hello world"
+    assert storage.read(storage.make_ref("0" * 64)) is None
+    with pytest.raises(FileNotFoundError):
+        storage.open_ref(storage.make_ref("0" * 64))
+
+
+def test_other_s3_errors_propagate(s3):
+    s3.stat_error = "AccessDenied"
+    with pytest.raises(S3Error):
+        storage.put(b"secret", "text/plain")
+
+
+def test_seek_starts_a_ranged_get_and_releases_the_old_one(s3):
+    data = os.urandom(3 * storage.CHUNK_SIZE)
+    ref = storage.put(data, "application/octet-stream")
+    with storage.open_ref(ref) as f:
+        assert f.read(10) == data[:10]
+        f.seek(2 * storage.CHUNK_SIZE + 5)
+        assert f.read(4) == data[2 * storage.CHUNK_SIZE + 5:2 * storage.CHUNK_SIZE + 9]
+    offsets = [offset for _, offset, _ in s3.gets]
+    assert offsets == [0, 2 * storage.CHUNK_SIZE + 5]
+    assert all(obj.closed and obj.released for _, _, obj in s3.gets)
+
+
+def test_send_serves_ranges_from_the_bucket(app, s3):
+    ref = storage.put(b"%PDF-1.4 body", "application/pdf")
+    digest = storage.digest_of(ref)
+    with app.test_request_context(headers={"Range": "bytes=0-3"}):
+        rv = storage.send(ref, "doc.pdf", etag=digest)
+        try:
+            assert rv.status_code == 206
+            assert b"".join(rv.response) == b"%PDF"
+            assert rv.headers["Content-Range"] == "bytes 0-3/13"
+        finally:
+            rv.close()
+    with app.test_request_context(headers={"If-None-Match": f'"{digest}"'}):
+        gets = len(s3.gets)
+        assert storage.send(ref, "doc.pdf", etag=digest).status_code == 304
+        assert len(s3.gets) == gets
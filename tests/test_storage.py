@@ -0,0 +1,93 @@
+import os
+
+from PIL import Image
+
+from app.extensions import db
+from app.models import KycRecord, User
+from app.services import storage_service as storage
+
+
+def _finalize(client, applicant, email):
+    applicant(email)
+    r = client.post("/api/kyc/finalize", json={"name": "Asha Rao", "dob": "1990-01-01", "gov_id": "ID-" + email,
+                                               "address": "1 Main St", "email": email})
+    assert r.status_code == 200, r.get_json()
+    return r.get_json()["kyc_id"]
+
+
+def test_put_is_content_addressed(app, ctx):
+    ref = storage.put(b"same bytes", "text/plain")
+    assert ref == storage.put(b"same bytes", "text/plain")
+    assert storage.digest_of(ref) and storage.read(ref) == b"same bytes"
+    assert storage.read(storage.make_ref("0" * 64)) is None
+
+
+def test_pdf_download_etag_and_ranges(app, client, applicant, banker):
+    kyc_id = _finalize(client, applicant, "send@example.com")
+    url = f"/api/banker/kyc/{kyc_id}/pdf"
+
+    full = banker.get(url)
+    assert full.status_code == 200 and full.data.startswith(b"%PDF")
+    etag = full.headers["ETag"]
+    assert full.headers["Cache-Control"] == "private, no-cache"
+    assert full.headers["Accept-Ranges"] == "bytes"
+
+    assert banker.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    part = banker.get(url, headers={"Range": "bytes=0-3"})
+    assert part.status_code == 206 and part.data == b"%PDF"
+    assert part.headers["Content-Range"] == f"bytes 0-3/{len(full.data)}"
+
+    assert banker.get(url, headers={"Range": f"bytes={len(full.data) + 10}-"}).status_code == 416
+
+    # The applicant's own copy is the same document
+    mine = client.get("/api/kyc/me/pdf")
+    assert mine.status_code == 200 and mine.headers["ETag"] == etag and mine.data == full.data
+
+
+def test_pdf_download_offload_headers(app, client, applicant, banker):
+    kyc_id = _finalize(client, applicant, "offload@example.com")
+    try:
+        app.config["BLOB_OFFLOAD"] = "x-accel-redirect"
+        r = banker.get(f"/api/banker/kyc/{kyc_id}/pdf")
+        assert r.status_code == 200 and not r.data
+        digest = r.headers["ETag"].strip('"')
+        assert r.headers["X-Accel-Redirect"] == "/_blobs/" + storage.shard(digest)
+
+        app.config["BLOB_OFFLOAD"] = "x-sendfile"
+        r = banker.get(f"/api/banker/kyc/{kyc_id}/pdf")
+        assert os.path.exists(r.headers["X-Sendfile"]) and not r.data
+    finally:
+        app.config["BLOB_OFFLOAD"] = ""
+
+
+def test_sniff_content_type():
+    assert storage.sniff_content_type(b"\x89PNG\r\n\x1a\n\0\0\0\r") == "image/png"
+    assert storage.sniff_content_type(b"\xff\xd8\xff\xe0\0\x10JFIF\0\x01") == "image/jpeg"
+    assert storage.sniff_content_type(b"RIFF\x24\0\0\0WEBP") == "image/webp"
+    assert storage.sniff_content_type(b"%PDF-1.4\n%") == "application/pdf"
+    assert storage.sniff_content_type(b"", "/old/selfie.png") == "image/png"
+    assert storage.sniff_content_type(b"garbage", "/old/selfie", "image/jpeg") == "image/jpeg"
+
+
+def test_import_legacy_storage_keeps_selfie_types(app, tmp_path, monkeypatch):
+    png, webp = tmp_path / "selfie", tmp_path / "selfie2.bin"
+    Image.new("RGB", (8, 8), "teal").save(png, "PNG")
+    Image.new("RGB", (8, 8), "teal").save(webp, "WEBP")
+    with app.app_context():
+        user = User(email="legacy@example.com", password_hash="!")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all([KycRecord(user_id=user.id, selfie_ref=str(png)),
+                            KycRecord(user_id=user.id, selfie_ref=str(webp), kyc_id="KYCLEGACYWEBP")])
+        db.session.commit()
+
+    stored = {}
+    put = storage.put
+    monkeypatch.setattr(storage, "put", lambda src, content_type, **kw: stored.setdefault(content_type, put(src, content_type, **kw)))
+    result = app.test_cli_runner().invoke(args=["import-legacy-storage"])
+    assert result.exit_code == 0, result.output
+    assert {"image/png", "image/webp"} <= set(stored)
+    with app.app_context():
+        refs = db.session.execute(db.select(KycRecord.selfie_ref).join(User).where(User.email == "legacy@example.com")).scalars()
+        assert sorted(refs) == sorted([stored["image/png"], stored["image/webp"]])
@@ -0,0 +1,87 @@
+import io
+import json
+import zipfile
+
+import pikepdf
+
+from app.services import kyc_validation_service as validation
+from app.services.id_service import sign_payload
+from app.services.pdf_service import PAYLOAD_INFO_KEY
+
+CHECKSUM = "ab" * 32
+
+
+def _item(payload, sig=None):
+    embedded = {"payload": payload, "sig": sig if sig is not None else "0" * 64}
+    return validation.Inspected(0, "doc.pdf", 2048, CHECKSUM, embedded, None)
+
+
+def _payload(**extra):
+    return dict({"kyc_id": "KYC123", "issued_at": "2025-01-01T00:00:00Z", "pdf_checksum": ""}, **extra)
+
+
+def test_verdict_accepts_a_correct_signature(ctx):
+    payload = _payload()
+    out = validation.verdict(_item(payload, sign_payload(payload)), None)
+    assert out["signature_valid"] is True
+    assert out["extracted_kyc_id"] == "KYC123"
+    # Not stored: the checksum doesn't match any document
+    assert out["valid"] is False and out["issues"] == ["PDF not found in database"]
+
+
+def test_verdict_flags_a_wrong_signature(ctx):
+    out = validation.verdict(_item(_payload(), "f" * 64), None)
+    assert out["signature_valid"] is False
+    assert "Signature mismatch" in out["issues"]
+
+
+def test_verdict_reports_malformed_payloads(ctx):
+    for item in (_item(_payload(kyc_id=5)), _item(_payload(data_hash={"x": 1})),
+                 _item(_payload(issued_at=["x"])), _item(_payload(), sig=123), _item(_payload(), sig="é" * 64)):
+        out = validation.verdict(item, None)
+        assert out["signature_valid"] is False
+        assert out["valid"] is False
+        assert "Malformed embedded KYC payload" in out["issues"] or "Signature mismatch" in out["issues"]
+
+
+def test_verdict_for_unreadable_file():
+    item = validation.Inspected(3, "bad.pdf", 10, "", None, "File too small. May be corrupted")
+    out = validation.verdict(item, None)
+    assert out["valid"] is False and out["issues"] == ["File too small. May be corrupted"]
+
+
+def _crafted_pdf(embedded: dict) -> bytes:
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    pdf.docinfo["/" + PAYLOAD_INFO_KEY] = json.dumps(embedded)
+    out = io.BytesIO()
+    pdf.save(out)
+    # Pad past MIN_PDF_BYTES; readers ignore bytes after %%EOF
+    return out.getvalue() + b"\n%" + b"x" * validation.MIN_PDF_BYTES
+
+
+def test_validate_pdf_with_hostile_payload(banker):
+    body = _crafted_pdf({"payload": {"kyc_id": 5, "issued_at": {"a": 1}}, "sig": "abc"})
+    r = banker.post("/api/banker/kyc/validate-pdf", data={"pdf_document": (io.BytesIO(body), "evil.pdf")},
+                    content_type="multipart/form-data")
+    assert r.status_code == 200, r.get_json()
+    out = r.get_json()
+    assert out["signature_valid"] is False
+    assert "Malformed embedded KYC payload" in out["issues"]
+
+
+def test_iter_batch_streams_file_lines_in_upload_order(ctx, monkeypatch):
+    monkeypatch.setattr(validation, "RESOLVE_EVERY", 3)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for i in range(7):
+            zf.writestr(f"doc{i}.pdf", _crafted_pdf({"payload": _payload(kyc_id=f"KYC{i}"), "sig": "x"}) if i % 2 else b"junk")
+    buf.seek(0)
+    buf.filename = "batch.zip"
+    jobs, _ = validation.batch_sources([buf])
+    lines = [json.loads(line) for line in validation.iter_batch(jobs)]
+    assert lines[0] == {"type": "started", "files": 7}
+    files = [line for line in lines if line["type"] == "file"]
+    assert [f["index"] for f in files] == list(range(7))
+    assert [f["extracted_kyc_id"] for f in files[1::2]] == ["KYC1", "KYC3", "KYC5"]
+    assert lines[-1] == {"type": "summary", "files": 7, "valid": 0, "invalid": 7}